@@ -8,13 +8,23 @@ Want the following:
 --> Compute the vapour pressure (in mmHg, soon to be other pressures/temperatures)
 
 '''
-import base64
-import io
+import hashlib
+import os
 import openpyxl
-from bokeh.plotting import figure 
 import streamlit as st
 import numpy as np
 import pandas as pd
+from vapour_pressure.batch import evaluate_batch
+from vapour_pressure.cache import LRUCache
+from vapour_pressure.correlations import CORRELATIONS
+from vapour_pressure.database import CompoundDatabase
+from vapour_pressure.export import EXPORTERS, export_bytes
+from vapour_pressure.fitting import fit_many, read_measurements
+from vapour_pressure.instrument import METRICS, Timings
+from vapour_pressure.mixture import binary_txy
+from vapour_pressure.pipeline import compute_correlation_curve, convert_curve, default_title, saturation_temperature, table_columns
+from vapour_pressure.plotting import txy_figure, unit_switching_figure
+from vapour_pressure.units import PRESSURE_UNITS, TEMPERATURE_UNITS, Pressures, Temperature
 
 
 st.set_page_config(
@@ -33,525 +43,266 @@ units of pressure and temperature are provided towards the bottom.
 
 '''
 st.info("As of now, the default values of the A, B, and C values are set to 1 to avoid the error of division by zero.")
-st.info("Additionally, the calculator currently only takes °C as units for temperature inputs which can be converted via the options below. ")
+st.info("Additionally, the calculator currently only takes °C as units for temperature inputs which can be converted with the unit buttons above the graph and the options below it. ")
 
 
 temp_lower = st.number_input("Temperature Lower Bound (°C): ")
 temp_upper = st.number_input("Temperature Upper Bound (°C): ")
-
-Coeff_A = st.number_input("A Value: ", value=1e0, step=1e-5, format="%.5f")
-Coeff_B = st.number_input("B Value: ", value=1e0, step=1e-5, format="%.3f")
-Coeff_C = st.number_input("C Value: ", value=1e0, step=1e-5, format="%.3f")
-
-#### Radio buttons ####
-
-options_pressure = st.radio(
-    'Pressure Units:',
-    ('mmHg','atm','Bar','kPa'))
-
-options_temperature = st.radio(
-    'Temperature Units:',
-    ('°C','K','°F'))
-
-temps_array = [temp_a for temp_a in np.arange(temp_lower, temp_upper +1)] #array of temperatures in deg. celsius
+adaptive_sampling = st.checkbox("Adaptive sampling", help="Place points where the curve bends instead of at a fixed step")
+if adaptive_sampling:
+    sampling_tolerance = st.number_input("Maximum interpolation error (%): ", value=1e-1, min_value=1e-4, step=1e-2, format="%.4f")
+    sampling_points = int(st.number_input("Maximum number of points: ", value=2000, min_value=2, step=100))
+    temp_step = None
+else:
+    temp_step = st.number_input("Temperature Step (°C): ", value=1e0, min_value=1e-3, step=1e-2, format="%.3f")
+
+correlation = st.selectbox("Correlation", tuple(CORRELATIONS), format_func=lambda name: CORRELATIONS[name].label,
+    help="Antoine's equation, or another vapour pressure correlation with its own parameters")
+if correlation == 'antoine':
+    fitted_A, fitted_B, fitted_C = st.session_state.get('fitted_coefficients', (1e0, 1e0, 1e0)) #set from the fitting section below
+    Coeff_A = st.number_input("A Value: ", value=fitted_A, step=1e-5, format="%.5f")
+    Coeff_B = st.number_input("B Value: ", value=fitted_B, step=1e-5, format="%.3f")
+    Coeff_C = st.number_input("C Value: ", value=fitted_C, step=1e-5, format="%.3f")
+    parameters = (Coeff_A, Coeff_B, Coeff_C)
+else:
+    st.write(f"{CORRELATIONS[correlation].equation}, valid for {CORRELATIONS[correlation].domain}. P is in Pa here, graphs and tables use the units chosen below.")
+    parameters = tuple(st.number_input(f"{name} Value: ", value=0.0, format="%g", key=f"{correlation}_{name}")
+        for name in CORRELATIONS[correlation].parameters)
+    Coeff_A = Coeff_B = Coeff_C = None #the sections that only work with Antoine's equation check for this
+
+#### Result cache ####
+
+@st.cache(allow_output_mutation=True)
+def result_cache():
+    # One cache shared by every rerun and session on this server
+    return LRUCache(maxsize=256, max_bytes=256 * 2**20)
+
+results = result_cache()
+
+#### Instrumentation ####
+
+show_timings = st.sidebar.checkbox("Show performance breakdown", help="Time every stage of this rerun and trace its memory use")
+timings = Timings(trace_memory=show_timings)
+curve_key = (correlation,) + parameters + (temp_lower, temp_upper, temp_step) #everything the curve depends on
+if adaptive_sampling:
+    curve_key += (sampling_tolerance, sampling_points)
 
 #### Calculations ####
 
-mmhg_array = [] #initialize empty list
-for temp in range(len(temps_array)): 
-    Value = 10**(Coeff_A-(Coeff_B/(temps_array[temp]+Coeff_C))) #Computes the vapour pressure in mmHg and °C
-    rounded_mmhg = round(Value, 4) #rounds values to 4 decimal places 
-    mmhg_array.append(rounded_mmhg)
-
-mmhg_array = [temp for temp in range(len(temps_array))]
-
-#### unit conversions and classes ####
-
-class Pressures:
-    def __init__ (self, pressure_input):
-        self.pressure = pressure_input
-    
-    def mmhg(self):
-        return self.pressure
-    
-    def atm(self):
-        atm_array = [(pressure / 760) for pressure in self.pressure]
-        return atm_array
-
-    def bar(self):
-        bar_array = [(pressure * (1.01325/760)) for pressure in self.pressure]
-        return bar_array
-    
-    def kpa(self):
-        kpa_array = [(pressure * (101.325/760)) for pressure in self.pressure]
-        return kpa_array
-
-pressure = Pressures(mmhg_array)
-
-class Temperature:
-    def __init__ (self, temp_input):
-        self.temp_input = temp_input
-    
-    def celcius(self):
-        return self.temp_input
-    
-    def kelvin(self):
-        kelvin = [temps + 273.15 for temps in self.temp_input]
-        return kelvin
-    
-    def fahrenheit(self):
-        fahrenheit = [((temps*9/5) + 32) for temps in self.temp_input]
-        return fahrenheit
-
-temps = Temperature(temps_array)
-
-#### Functions for determining the graphs ####
-
-def mmhg_celcius():
-
-    x_axis_mmhg = temps.celcius()
-    y_axis_mmhg = pressure.mmhg()
-
-    name_graph_mmHg = st.text_input("Name the graph (optional)", value="Vapour Pressure (mmHg) vs Temperature (°C)")
-
-    p_mmhg_c = figure(title = f"{name_graph_mmHg}",
-        x_axis_label = "Temperature (°C)",
-        y_axis_label = "Vapour Pressure (mmHg)")
-
-    p_mmhg_c.line(x_axis_mmhg, y_axis_mmhg, legend_label="Vapour Pressure (mmHg)", line_width = 2) 
+with timings.stage('compute'):
+    if adaptive_sampling:
+        curve = results.get_or_compute(curve_key, lambda: compute_correlation_curve(correlation, parameters, temp_lower, temp_upper,
+            rtol=sampling_tolerance / 100, max_points=sampling_points))
+    else:
+        curve = results.get_or_compute(curve_key, lambda: compute_correlation_curve(correlation, parameters, temp_lower, temp_upper, temp_step))
+temps_array, mmhg_array, invalid_points = curve #temperatures in °C and vapour pressures in mmHg
+
+if invalid_points.any():
+    st.warning(f"{np.count_nonzero(invalid_points)} of the {len(temps_array)} points could not be computed (outside {CORRELATIONS[correlation].domain} or the pressure is too large) and were left out of the graph.")
+
+#### Downloads ####
+
+EXPORT_FORMATS = {
+    'Excel (.xlsx)': 'xlsx',
+    'CSV (.csv)': 'csv',
+    'Parquet (.parquet)': 'parquet',
+    'NumPy (.npz)': 'npz',
+}
+
+def file_download(columns, file_stem, key=()):
+    # columns is a table of values as a DataFrame or a dict of label -> array
+    format_label = st.radio('Download Format:', tuple(EXPORT_FORMATS), key=f"{file_stem}_format")
+    exporter = EXPORTERS[EXPORT_FORMATS[format_label]]
+    file_name = file_stem + exporter.extension
+    key = curve_key + tuple(columns) + key + (file_name,)
+
+    # The file is only written once asked for, then served from the cache as a regular download
+    if key in results or st.button(f'Prepare {format_label} File', help="Click to build the file for download", key=f"{file_stem}_prepare"):
+        try:
+            with timings.stage(f'export ({exporter.name})'):
+                data = results.get_or_compute(key, lambda: export_bytes(exporter.name, columns))
+        except (ImportError, ValueError) as error:
+            st.error(str(error))
+        else:
+            st.download_button(f'Download {format_label} File', data, file_name=file_name, mime=exporter.mime, key=f"{file_stem}_download")
+
+#### Rendering the graph ####
+
+def render_chart():
+    # The chart is sent once in °C/mmHg, its unit buttons convert it in the browser without a rerun
+    name_graph = st.text_input("Name the graph (optional)", value=default_title('mmHg', '°C'))
+
+    with timings.stage('figure'):
+        graph = unit_switching_figure(temps_array, mmhg_array, title=name_graph)
 
     try:
-        st.bokeh_chart(p_mmhg_c,use_container_width=False) #Generates graph for viewing
+        with timings.stage('bokeh_chart'):
+            st.bokeh_chart(graph, use_container_width=False) #Generates graph for viewing
     except ValueError:
         st.error("Your values are out of range for Bokeh to display a graph, try to input smaller values (in particular for your C value) or make a pull request/issue on Github. Thank you!")
 
-    pd_df_mmhg_c = pd.DataFrame({
-        'Temperature (ºC)': x_axis_mmhg,
-        'Vapour Pressure (mmHg)': y_axis_mmhg
-    })
-
-    if st.button('Generate Table of Values', help="Click to generate a table of values"):
-        st.write(pd_df_mmhg_c)
-
-    towrite = io.BytesIO()
-    downloaded_file = pd_df_mmhg_c.to_excel(towrite, encoding='utf-8', index=False, header=True)
-    towrite.seek(0)  # reset pointer
-    b64 = base64.b64encode(towrite.read()).decode() 
-    linko= f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}" download="PVap_mmHg.xlsx">Download Excel (.xlsx) File</a>'
-    st.markdown(linko, unsafe_allow_html=True)
-
-def mmhg_kelvin():
-
-    x_axis_mmhg_k = temps.kelvin()
-    y_axis_mmhg_k = pressure.mmhg()
+render_chart()
 
-    name_graph_mmhg_k = st.text_input("Name the graph (optional)", value="Vapour Pressure (mmHg) vs Temperature (K)")
+#### Table of values and download for the chosen units ####
 
-    p_mmhg_k = figure(title = f"{name_graph_mmhg_k}",
-        x_axis_label = "Temperature (K)",
-        y_axis_label = "Vapour Pressure (mmHg)")
+def render_table(pressure_unit, temperature_unit):
+    units_key = curve_key + (pressure_unit, temperature_unit)
 
-    p_mmhg_k.line(x_axis_mmhg_k, y_axis_mmhg_k, legend_label="Vapour Pressure (mmHg)", line_width = 2) 
-
-    try:
-        st.bokeh_chart(p_mmhg_k,use_container_width=False)
-    except ValueError:
-        st.error("Your values are out of range for Bokeh to display a graph, try to input smaller values (in particular for your C value) or make a pull request/issue on Github. Thank you!")
+    with timings.stage('convert'):
+        x_axis, y_axis = results.get_or_compute(units_key, lambda: convert_curve(curve, pressure_unit, temperature_unit))
 
-    pd_df_mmhg_k = pd.DataFrame({
-        'Temperature (K)': x_axis_mmhg_k,
-        'Vapour Pressure (mmHg)': y_axis_mmhg_k
-    })
+    columns = table_columns(x_axis, y_axis, pressure_unit, temperature_unit)
 
     if st.button('Generate Table of Values', help="Click to generate a table of values"):
-        st.write(pd_df_mmhg_k)
-
-    towrite = io.BytesIO()
-    downloaded_file = pd_df_mmhg_k.to_excel(towrite, encoding='utf-8', index=False, header=True)
-    towrite.seek(0)   
-    b64 = base64.b64encode(towrite.read()).decode() 
-    linko= f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}" download="PVap_mmHg.xlsx">Download Excel (.xlsx) File</a>'
-    st.markdown(linko, unsafe_allow_html=True)
-
-def mmhg_f():
-
-    x_axis_mmhg_f = temps.fahrenheit()
-    y_axis_mmhg_f = pressure.mmhg()
-
-    name_graph_mmhg_f = st.text_input("Name the graph (optional)", value="Vapour Pressure (mmHg) vs Temperature (°F)")
-
-    p_mmhg_f = figure(title = f"{name_graph_mmhg_f}",
-        x_axis_label = "Temperature (°F)",
-        y_axis_label = "Vapour Pressure (mmHg)")
-
-    p_mmhg_f.line(x_axis_mmhg_f, y_axis_mmhg_f, legend_label="Vapour Pressure (mmHg)", line_width = 2) 
-
-    try:
-        st.bokeh_chart(p_mmhg_f,use_container_width=False)
-    except ValueError:
-        st.error("Your values are out of range for Bokeh to display a graph, try to input smaller values (in particular for your C value) or make a pull request/issue on Github. Thank you!")
-
-    pd_df_mmhg_f = pd.DataFrame({
-        'Temperature (ºF)': x_axis_mmhg_f,
-        'Vapour Pressure (mmHg)': y_axis_mmhg_f
-    })
-
-    if st.button('Generate Table of Values', help="Click to generate a table of values"):
-        st.write(pd_df_mmhg_f)
-
-    towrite = io.BytesIO()
-    downloaded_file = pd_df_mmhg_f.to_excel(towrite, encoding='utf-8', index=False, header=True)
-    towrite.seek(0)  
-    b64 = base64.b64encode(towrite.read()).decode() 
-    linko= f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}" download="PVap_mmHg.xlsx">Download Excel (.xlsx) File</a>'
-    st.markdown(linko, unsafe_allow_html=True)
-
-def atm_c():
+        with timings.stage('table'):
+            st.write(results.get_or_compute(units_key + ('table',), lambda: pd.DataFrame(columns)))
 
-    x_axis_atm_c = temps.celcius()
-    y_axis_atm_c = pressure.atm()
+    file_download(columns, f"PVap_{pressure_unit}")
 
-    name_graph_atm_c = st.text_input("Name the graph (optional)", value="Vapour Pressure (atm) vs Temperature (°C)")
-
-    p_atm_c = figure(title = f"{name_graph_atm_c}",
-        x_axis_label = "Temperature (°C)",
-        y_axis_label = "Vapour Pressure (atm)")
-
-    p_atm_c.line(x_axis_atm_c, y_axis_atm_c, legend_label="Vapour Pressure (atm)", line_width = 2) 
-
-    try:
-        st.bokeh_chart(p_atm_c, use_container_width=False)
-    except ValueError:
-        st.error("Your values are out of range for Bokeh to display a graph, try to input smaller values (in particular for your C value) or make a pull request/issue on Github. Thank you!")
-
-    pd_df_atm_c = pd.DataFrame({
-        'Temperature (ºC)': x_axis_atm_c,
-        'Vapour Pressure (atm)': y_axis_atm_c
-    })
-
-    if st.button('Generate Table of Values', help="Click to generate a table of values"):
-        st.write(pd_df_atm_c)
-
-    towrite = io.BytesIO()
-    downloaded_file = pd_df_atm_c.to_excel(towrite, encoding='utf-8', index=False, header=True)
-    towrite.seek(0)  
-    b64 = base64.b64encode(towrite.read()).decode() 
-    linko= f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}" download="PVap_atm.xlsx">Download Excel (.xlsx) File</a>'
-    st.markdown(linko, unsafe_allow_html=True)
-
-def atm_k():
-
-    x_axis_atm_k = temps.kelvin()
-    y_axis_atm_k = pressure.atm()
-    
-    name_graph_atm_k = st.text_input("Name the graph (optional)", value="Vapour Pressure (atm) vs Temperature (K)")
-
-    p_atm_k = figure(title = f"{name_graph_atm_k}",
-        x_axis_label = "Temperature (K)",
-        y_axis_label = "Vapour Pressure (atm)")
-
-    p_atm_k.line(x_axis_atm_k, y_axis_atm_k, legend_label="Vapour Pressure (atm)", line_width = 2) 
-
-    pressure.atm()
-
-    try:
-        st.bokeh_chart(p_atm_k, use_container_width=False)
-    except ValueError:
-        st.error("Your values are out of range for Bokeh to display a graph, try to input smaller values (in particular for your C value) or make a pull request/issue on Github. Thank you!")
-        
-    pd_df_atm_k = pd.DataFrame({
-        'Temperature (K)': x_axis_atm_k,
-        'Vapour Pressure (atm)': y_axis_atm_k
-    })
-    if st.button('Generate Table of Values', help="Click to generate a table of values"):
-        st.write(pd_df_atm_k)
-
-    towrite = io.BytesIO()
-    downloaded_file = pd_df_atm_k.to_excel(towrite, encoding='utf-8', index=False, header=True)
-    towrite.seek(0)  
-    b64 = base64.b64encode(towrite.read()).decode() 
-    linko= f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}" download="PVap_atm.xlsx">Download Excel (.xlsx) File</a>'
-    st.markdown(linko, unsafe_allow_html=True)
-
-def atm_f():
-
-    x_axis_atm_f = temps.fahrenheit()
-    y_axis_atm_f = pressure.atm()
-
-    name_graph_atm_f = st.text_input("Name the graph (optional)", value="Vapour Pressure (atm) vs Temperature (°F)")
-
-    p_atm_f = figure(title = f"{name_graph_atm_f}",
-        x_axis_label = "Temperature (°F)",
-        y_axis_label = "Vapour Pressure (atm)")
-
-    p_atm_f.line(x_axis_atm_f, y_axis_atm_f, legend_label="Vapour Pressure (atm)", line_width = 2) 
-
-    pressure.atm()
-
-    try:
-        st.bokeh_chart(p_atm_f, use_container_width=False)
-    except ValueError:
-        st.error("Your values are out of range for Bokeh to display a graph, try to input smaller values (in particular for your C value) or make a pull request/issue on Github. Thank you!")
-        
-    pd_df_atm_f = pd.DataFrame({
-        'Temperature (ºF)': x_axis_atm_f,
-        'Vapour Pressure (atm)': y_axis_atm_f
-    })
-    if st.button('Generate Table of Values', help="Click to generate a table of values"):
-        st.write(pd_df_atm_f)
-
-    towrite = io.BytesIO()
-    downloaded_file = pd_df_atm_f.to_excel(towrite, encoding='utf-8', index=False, header=True)
-    towrite.seek(0)  
-    b64 = base64.b64encode(towrite.read()).decode() 
-    linko= f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}" download="PVap_atm.xlsx">Download Excel (.xlsx) File</a>'
-    st.markdown(linko, unsafe_allow_html=True)
-
-
-def bar_c():
-
-    x_axis_bar_c = temps.celcius()
-    y_axis_bar_c = pressure.bar()
-
-    name_graph_bar_c = st.text_input("Name the graph (optional)", value="Vapour Pressure (Bar) vs Temperature (°C)")
-    
-    p_bar = figure(title = f"{name_graph_bar_c}",
-        x_axis_label = "Temperature (°C)",
-        y_axis_label = "Vapour Pressure (Bar)")
-    
-    p_bar.line(x_axis_bar_c, y_axis_bar_c, legend_label="Vapour Pressure (Bar)", line_width = 2)
-    
-    pressure.bar()
-    
-    try:
-        st.bokeh_chart(p_bar, use_container_width=False)
-    except ValueError:
-        st.error("Your values are out of range for Bokeh to display a graph, try to input smaller values (in particular for your C value) or make a pull request/issue on Github. Thank you!")
-        
-    pd_df_bar_c = pd.DataFrame({
-        'Temperature (ºC)': x_axis_bar_c,
-        'Vapour Pressure (Bar)': y_axis_bar_c
-    })
-    
-    if st.button('Generate Table of Values', help="Click to generate a table of values"):
-        st.write(pd_df_bar_c)
-
-    towrite = io.BytesIO()
-    downloaded_file = pd_df_bar_c.to_excel(towrite, encoding='utf-8', index=False, header=True)
-    towrite.seek(0)  
-    b64 = base64.b64encode(towrite.read()).decode() 
-    linko= f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}" download="PVap_bar.xlsx">Download Excel (.xlsx) File</a>'
-    st.markdown(linko, unsafe_allow_html=True)
-
-def bar_k():
-
-    x_axis_bar_k = temps.kelvin()
-    y_axis_bar_k = pressure.bar()
-
-    name_graph_bar_k = st.text_input("Name the graph (optional)", value="Vapour Pressure (Bar) vs Temperature (K)")
-    
-    p_bar_k = figure(title = f"{name_graph_bar_k}",
-        x_axis_label = "Temperature (K)",
-        y_axis_label = "Vapour Pressure (Bar)")
-    
-    p_bar_k.line(x_axis_bar_k, y_axis_bar_k, legend_label="Vapour Pressure (Bar)", line_width = 2)
-    
-    pressure.bar()
-    
-    try:
-        st.bokeh_chart(p_bar_k, use_container_width=False)
-    except ValueError:
-        st.error("Your values are out of range for Bokeh to display a graph, try to input smaller values (in particular for your C value) or make a pull request/issue on Github. Thank you!")
-        
-    pd_df_bar_k = pd.DataFrame({
-        'Temperature (K)': x_axis_bar_k,
-        'Vapour Pressure (Bar)': y_axis_bar_k
-    })
-    
-    if st.button('Generate Table of Values', help="Click to generate a table of values"):
-        st.write(pd_df_bar_k)
-
-    towrite = io.BytesIO()
-    downloaded_file = pd_df_bar_k.to_excel(towrite, encoding='utf-8', index=False, header=True)
-    towrite.seek(0)  
-    b64 = base64.b64encode(towrite.read()).decode() 
-    linko= f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}" download="PVap_bar.xlsx">Download Excel (.xlsx) File</a>'
-    st.markdown(linko, unsafe_allow_html=True)
-
-def bar_f():
-
-    x_axis_bar_f = temps.fahrenheit()
-    y_axis_bar_f = pressure.bar()
-
-    name_graph_bar_f = st.text_input("Name the graph (optional)", value="Vapour Pressure (Bar) vs Temperature (°F)")
-    
-    p_bar_f = figure(title = f"{name_graph_bar_f}",
-        x_axis_label = "Temperature (°F)",
-        y_axis_label = "Vapour Pressure (Bar)")
-    
-    p_bar_f.line(x_axis_bar_f, y_axis_bar_f, legend_label="Vapour Pressure (Bar)", line_width = 2)
-    
-    pressure.bar()
-    
-    try:
-        st.bokeh_chart(p_bar_f, use_container_width=False)
-    except ValueError:
-        st.error("Your values are out of range for Bokeh to display a graph, try to input smaller values (in particular for your C value) or make a pull request/issue on Github. Thank you!")
-        
-    pd_df_bar_f = pd.DataFrame({
-        'Temperature (°F)': x_axis_bar_f,
-        'Vapour Pressure (Bar)': y_axis_bar_f
-    })
-    
-    if st.button('Generate Table of Values', help="Click to generate a table of values"):
-        st.write(pd_df_bar_f)
-
-    towrite = io.BytesIO()
-    downloaded_file = pd_df_bar_f.to_excel(towrite, encoding='utf-8', index=False, header=True)
-    towrite.seek(0)  
-    b64 = base64.b64encode(towrite.read()).decode() 
-    linko= f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}" download="PVap_bar.xlsx">Download Excel (.xlsx) File</a>'
-    st.markdown(linko, unsafe_allow_html=True)
-
-def kpa_c():
-    
-    x_axis_kpa = temps.celcius()
-    y_axis_kpa = pressure.kpa()
-
-    name_graph_kPa_c = st.text_input("Name the graph (optional)", value="Vapour Pressure (kPa) vs Temperature (°C)")
-
-    p_kpa_c = figure(title = f"{name_graph_kPa_c}",
-        x_axis_label = "Temperature (°C)",
-        y_axis_label = "Vapour Pressure (kPa)")
-
-    p_kpa_c.line(x_axis_kpa, y_axis_kpa, legend_label="Vapour Pressure (kPa)", line_width = 2)
-
-    pressure.kpa()
-
-    try:
-        st.bokeh_chart(p_kpa_c, use_container_width=False)
-    except ValueError:
-        st.error("Your values are out of range for Bokeh to display a graph, try to input smaller values (in particular for your C value) or make a pull request/issue on Github. Thank you!")
-        
-    pd_df_kpa_c = pd.DataFrame({
-        'Temperature (ºC)': x_axis_kpa,
-        'Vapour Pressure (kPa)': y_axis_kpa
-    })
-    if st.button('Generate Table of Values', help="Click to generate a table of values"):
-        st.write(pd_df_kpa_c)
-
-    towrite = io.BytesIO()
-    downloaded_file = pd_df_kpa_c.to_excel(towrite, encoding='utf-8', index=False, header=True)
-    towrite.seek(0)  
-    b64 = base64.b64encode(towrite.read()).decode() 
-    linko= f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}" download="PVap_kpa.xlsx">Download Excel (.xlsx) File</a>'
-    st.markdown(linko, unsafe_allow_html=True)
-
-def kpa_k():
-
-    x_axis_kpa_k = temps.kelvin()
-    y_axis_kpa_k = pressure.kpa()
-
-    name_graph_kPa_k = st.text_input("Name the graph (optional)", value="Vapour Pressure (kPa) vs Temperature (K)")
-
-    p_kpa_k = figure(title = f"{name_graph_kPa_k}",
-        x_axis_label = "Temperature (K)",
-        y_axis_label = "Vapour Pressure (kPa)")
-
-    p_kpa_k.line(x_axis_kpa_k, y_axis_kpa_k, legend_label="Vapour Pressure (kPa)", line_width = 2)
+options_pressure = st.radio(
+    'Pressure Units (table and download):',
+    tuple(PRESSURE_UNITS))
 
-    pressure.kpa()
+options_temperature = st.radio(
+    'Temperature Units (table and download):',
+    tuple(TEMPERATURE_UNITS))
+
+render_table(options_pressure, options_temperature)
+
+#### Batch mode ####
+
+coefficient_table = None
+
+with st.expander("Batch Mode (multiple compounds)"):
+    st.write("Upload a table of Antoine coefficients (one compound per row with Compound, Formula, A, B and C columns, see Examples/Antoine_Coefficients.xlsx) to evaluate every compound over the temperature range above.")
+    st.write("Compounds can use other correlations too: name it in a Correlation column (Antoine, Extended Antoine, DIPPR 101 or Wagner) and put its parameters, in order, in columns P1 to P7.")
+    coefficient_file = st.file_uploader("Coefficient table (.xlsx or .csv)", type=['xlsx', 'csv'])
+
+    if coefficient_file is not None:
+        try:
+            compound_db = CompoundDatabase.load(coefficient_file) #parsed once, then memory-mapped from the cache
+        except ValueError as error:
+            st.error(f"Could not read the coefficient table: {error}")
+        else:
+            compound_query = st.text_input("Only show a compound (name or formula, optional)")
+            if compound_query:
+                rows = compound_db.find_formula(compound_query)
+                if compound_query in compound_db:
+                    rows = [compound_db.find(compound_query)]
+                coefficient_table = compound_db.subset(rows)
+            else:
+                coefficient_table = compound_db.table
+
+            with timings.stage('batch'):
+                batch_result = evaluate_batch(coefficient_table, temps_array)
+            st.write(f"Evaluated {len(coefficient_table)} compounds at {len(temps_array)} temperatures.")
+            st.write(batch_result.to_frame())
+            file_download(batch_result.columns(), "PVap_batch", (compound_db.content_hash, compound_query)) #keyed on the contents, a re-upload may reuse the name
+
+#### Inverse mode ####
+
+with st.expander("Boiling Temperature at a Given Pressure"):
+    st.write("Solves Antoine's equation for the saturation temperature at each pressure, for the A, B and C values above or for every compound of the batch table when one is uploaded.")
+    pressure_text = st.text_input("Pressures (separated by commas)", value="760")
+    inverse_pressure_unit = st.selectbox("Unit of the pressures", tuple(PRESSURE_UNITS))
+    inverse_temperature_unit = st.selectbox("Unit of the boiling temperatures", tuple(TEMPERATURE_UNITS))
 
     try:
-        st.bokeh_chart(p_kpa_k, use_container_width=False)
+        pressure_values = np.array([float(value) for value in pressure_text.split(',') if value.strip()])
     except ValueError:
-        st.error("Your values are out of range for Bokeh to display a graph, try to input smaller values (in particular for your C value) or make a pull request/issue on Github. Thank you!")
-        
-    pd_df_kpa_k = pd.DataFrame({
-        'Temperature (K)': x_axis_kpa_k,
-        'Vapour Pressure (kPa)': y_axis_kpa_k
-    })
-    if st.button('Generate Table of Values', help="Click to generate a table of values"):
-        st.write(pd_df_kpa_k)
-
-    towrite = io.BytesIO()
-    downloaded_file = pd_df_kpa_k.to_excel(towrite, encoding='utf-8', index=False, header=True)
-    towrite.seek(0)  
-    b64 = base64.b64encode(towrite.read()).decode() 
-    linko= f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}" download="PVap_kpa.xlsx">Download Excel (.xlsx) File</a>'
-    st.markdown(linko, unsafe_allow_html=True)
-
-def kpa_f():
-
-    x_axis_kpa_f = temps.fahrenheit()
-    y_axis_kpa_f = pressure.kpa()
-
-    name_graph_kPa_f = st.text_input("Name the graph (optional)", value="Vapour Pressure (kPa) vs Temperature (°F)")
-
-    p_kpa_f = figure(title = f"{name_graph_kPa_f}",
-        x_axis_label = "Temperature (°F)",
-        y_axis_label = "Vapour Pressure (kPa)")
-
-    p_kpa_f.line(x_axis_kpa_f, y_axis_kpa_f, legend_label="Vapour Pressure (kPa)", line_width = 2)
-
-    pressure.kpa()
-
+        st.error("The pressures must be numbers separated by commas.")
+    else:
+        if coefficient_table is not None:
+            names = coefficient_table.names
+            A, B, C = coefficient_table.A[:, None], coefficient_table.B[:, None], coefficient_table.C[:, None]
+        elif correlation == 'antoine':
+            names = ["A, B, C above"]
+            A, B, C = Coeff_A, Coeff_B, Coeff_C
+        else:
+            names = None
+            st.info(f"Boiling temperatures are only solved for Antoine's equation, not {CORRELATIONS[correlation].label}.")
+
+        if names is not None:
+            with timings.stage('inverse'):
+                boiling_temps, no_solution = saturation_temperature(pressure_values, A, B, C, inverse_pressure_unit, inverse_temperature_unit)
+            st.write(pd.DataFrame(np.broadcast_to(boiling_temps, (len(names), len(pressure_values))),
+                index=names,
+                columns=[f"T at {value:g} {inverse_pressure_unit} ({inverse_temperature_unit})" for value in pressure_values]))
+            if no_solution.any():
+                st.warning("Some pressures have no solution on the physical branch of the equation (P must be above 0 and below 10^A mmHg) and are left empty, as are compounds that don't use Antoine's equation.")
+
+#### Binary mixtures ####
+
+with st.expander("Binary Mixture T-x-y Diagram (Raoult's law)"):
+    st.write("Bubble and dew temperatures of an ideal mixture of two compounds from the batch table at a fixed pressure (compounds given by Antoine coefficients only).")
+    if coefficient_table is None or len(coefficient_table) < 2:
+        st.info("Upload a coefficient table with at least two compounds in Batch Mode above to plot a mixture.")
+    else:
+        first = st.selectbox("First compound", range(len(coefficient_table)), format_func=lambda row: coefficient_table.names[row])
+        second = st.selectbox("Second compound", range(len(coefficient_table)), index=1, format_func=lambda row: coefficient_table.names[row])
+        mixture_pressure = st.number_input("Pressure", value=760.0, min_value=1e-6)
+        mixture_pressure_unit = st.selectbox("Unit of the mixture pressure", tuple(PRESSURE_UNITS))
+        mixture_temperature_unit = st.selectbox("Unit of the mixture temperatures", tuple(TEMPERATURE_UNITS))
+
+        if first == second:
+            st.warning("Pick two different compounds.")
+        else:
+            pair = [first, second]
+            with timings.stage('mixture'):
+                x1, bubble_temps, y1 = binary_txy(Pressures(mixture_pressure, mixture_pressure_unit).to('mmHg'),
+                    coefficient_table.A[pair], coefficient_table.B[pair], coefficient_table.C[pair])
+                bubble_temps = Temperature(bubble_temps).to(mixture_temperature_unit)
+            st.bokeh_chart(txy_figure(x1, bubble_temps, y1, coefficient_table.names[pair],
+                f"{mixture_pressure:g} {mixture_pressure_unit}", mixture_temperature_unit), use_container_width=False)
+            mixture_columns = {
+                f"x {coefficient_table.names[first]}": x1,
+                f"y {coefficient_table.names[first]}": y1,
+                f"Temperature ({mixture_temperature_unit})".replace('°', 'º'): bubble_temps,
+            }
+            pair_coefficients = tuple(np.concatenate([coefficient_table.A[pair], coefficient_table.B[pair], coefficient_table.C[pair]]).tolist())
+            file_download(mixture_columns, "Txy", tuple(coefficient_table.names[pair]) + pair_coefficients + (mixture_pressure, mixture_pressure_unit))
+
+#### Fitting coefficients to measurements ####
+
+with st.expander("Fit A, B and C to Measured Data"):
+    st.write("Upload measured temperatures and vapour pressures (units in brackets in the column headers, see Examples/Vapour_Pressure_Data.xlsx, and optionally a Compound column for several compounds) to fit Antoine coefficients to them.")
+    measurement_file = st.file_uploader("Measurements (.xlsx or .csv)", type=['xlsx', 'csv'], key="measurements")
+
+    if measurement_file is not None:
+        try:
+            with timings.stage('fit'):
+                datasets = read_measurements(measurement_file)
+                fit = fit_many([(temps, pressure) for _, temps, pressure in datasets])
+        except ValueError as error:
+            st.error(f"Could not fit the measurements: {error}")
+        else:
+            fit_columns = fit.columns([name for name, _, _ in datasets])
+            st.write(pd.DataFrame(fit_columns).set_index('Compound'))
+            if not fit.converged.all():
+                st.warning("Some fits did not converge (they need at least 3 points with positive pressures) and may be unreliable.")
+
+            fitted_row = st.selectbox("Compound to graph", range(len(fit)), format_func=lambda row: datasets[row][0])
+            if st.button("Use these coefficients above", help="Fills in A, B and C with the fitted values"):
+                st.session_state['fitted_coefficients'] = (float(fit.A[fitted_row]), float(fit.B[fitted_row]), float(fit.C[fitted_row]))
+                st.experimental_rerun()
+            file_download(fit_columns, "Antoine_fit", (hashlib.sha256(measurement_file.getvalue()).hexdigest(),)) #a re-upload may reuse the name
+
+#### Performance breakdown and metrics ####
+
+METRICS.add(timings)
+for name, value in results.stats().items():
+    METRICS.set_gauge(f"cache_{name}", value)
+
+if os.environ.get('VAPOUR_PRESSURE_METRICS'): #.prom for a Prometheus text file, anything else for JSON lines
     try:
-        st.bokeh_chart(p_kpa_f, use_container_width=False)
-    except ValueError:
-        st.error("Your values are out of range for Bokeh to display a graph, try to input smaller values (in particular for your C value) or make a pull request/issue on Github. Thank you!")
-        
-    pd_df_kpa_f = pd.DataFrame({
-        'Temperature (°F)': x_axis_kpa_f,
-        'Vapour Pressure (kPa)': y_axis_kpa_f
-    })
-    if st.button('Generate Table of Values', help="Click to generate a table of values"):
-        st.write(pd_df_kpa_f)
-
-    towrite = io.BytesIO()
-    downloaded_file = pd_df_kpa_f.to_excel(towrite, encoding='utf-8', index=False, header=True)
-    towrite.seek(0)  
-    b64 = base64.b64encode(towrite.read()).decode() 
-    linko= f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}" download="PVap_kpa.xlsx">Download Excel (.xlsx) File</a>'
-    st.markdown(linko, unsafe_allow_html=True)
-
-#### Statements to execute if option is chosen ####
-
-if options_pressure == 'mmHg' and options_temperature == '°C':
-    mmhg_celcius()
-
-if options_pressure == 'mmHg' and options_temperature == 'K':
-    mmhg_kelvin()
-
-if options_pressure == 'mmHg' and options_temperature == '°F':
-    mmhg_f()
-
-if options_pressure == 'atm' and options_temperature == '°C':
-    atm_c()
-
-if options_pressure == 'atm' and options_temperature == "K":
-    atm_k()
-
-if options_pressure == 'atm' and options_temperature == "°F":
-    atm_f()
-
-if options_pressure == 'Bar' and options_temperature == '°C':
-    bar_c()
-
-if options_pressure == 'Bar' and options_temperature == 'K':
-    bar_k()
-
-if options_pressure == 'Bar' and options_temperature == '°F':
-    bar_f() 
-
-if options_pressure == 'kPa' and options_temperature == '°C':
-    kpa_c()
-
-if options_pressure == 'kPa' and options_temperature == 'K':
-    kpa_k()
-
-if options_pressure == 'kPa' and options_temperature == '°F':
-    kpa_f()
+        METRICS.write(os.environ['VAPOUR_PRESSURE_METRICS'], timings)
+    except OSError as error:
+        st.sidebar.error(f"Could not write the metrics: {error}")
+
+if show_timings:
+    st.sidebar.write(f"This rerun: {timings.total * 1000:.1f} ms")
+    st.sidebar.write(pd.DataFrame(timings.rows()).set_index('stage'))
+    st.sidebar.write("Result cache:", results.stats())
 
 '''
 The graph was generated using [Bokeh ver. 2.2.2](https://bokeh.org/) as well as [Python 3.8.5.](https://www.python.org/downloads/release/python)
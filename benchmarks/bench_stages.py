@@ -0,0 +1,279 @@
+'''
+Benchmarks for each stage of the pipeline: compute, convert, table and export
+
+Every case is timed (best of several runs) and its peak memory is measured
+with tracemalloc (NumPy reports its allocations there too). The original
+per-point implementations from Antoine_Graph.py are kept here as "legacy"
+cases so the gains can be compared at the same size.
+
+    python benchmarks/bench_stages.py                      # 10^2 .. 10^7 points, 1 .. 10^4 compounds
+    python benchmarks/bench_stages.py --max-points 1e5 --stage compute --stage export
+    python benchmarks/bench_stages.py --save baseline.json
+    python benchmarks/bench_stages.py --compare baseline.json --tolerance 1.25
+
+With --compare the script exits with status 1 when any case got slower (or
+used more memory) than the stored baseline by more than the tolerance factor.
+
+'''
+import argparse
+import base64
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vapour_pressure.batch import CoefficientTable, evaluate_batch # noqa: E402
+from vapour_pressure.correlations import MAX_PARAMETERS # noqa: E402
+from vapour_pressure.engine import antoine, temperature_grid # noqa: E402
+from vapour_pressure.export import export_bytes # noqa: E402
+from vapour_pressure.tables import InterpolationTables # noqa: E402
+from vapour_pressure.units import Pressures, Temperature # noqa: E402
+
+# Water, Felder Table B.4
+A, B, C = 8.10765, 1750.286, 235.0
+
+POINTS = [10**exponent for exponent in range(2, 8)]
+COMPOUNDS = [10**exponent for exponent in range(0, 5)]
+BATCH_TEMPERATURES = 1000
+
+# The per-point implementations are far too slow (or size limited) past these sizes
+LEGACY_MAX_POINTS = 10**6
+XLSX_MAX_POINTS = 10**5
+
+#### Cases, each returns a function to time ####
+
+def grid(points):
+    return temperature_grid(0.0, 100.0, 100.0 / (points - 1))
+
+
+def legacy_compute(points):
+    temps_array = list(grid(points))
+
+    def run():
+        mmhg_array = []
+        for temp in range(len(temps_array)):
+            Value = 10**(A-(B/(temps_array[temp]+C)))
+            mmhg_array.append(round(Value, 4))
+        return mmhg_array
+    return run
+
+
+def engine_compute(points):
+    temps = grid(points)
+    out = np.empty_like(temps)
+    return lambda: antoine(temps, A, B, C, out=out)
+
+
+def table_compute(points):
+    water = CoefficientTable(['Water'], [A], [B], [C], t_min=[0.0], t_max=[100.0])
+    table = InterpolationTables.build(water, rtol=1e-6)[0]
+    temps = grid(points)
+    out = np.empty_like(temps)
+    return lambda: table.evaluate(temps, out=out)
+
+
+def legacy_convert(points):
+    pressure = list(antoine(grid(points), A, B, C)[0])
+    temps = list(grid(points))
+    return lambda: ([(value * (101.325/760)) for value in pressure], [((value*9/5) + 32) for value in temps])
+
+
+def quantity_convert(points):
+    pressure = Pressures(antoine(grid(points), A, B, C)[0])
+    temps = Temperature(grid(points))
+    return lambda: (pressure.to('kPa'), temps.to('°F'))
+
+
+def dataframe_table(points):
+    import pandas as pd
+
+    temps = grid(points)
+    pressure = antoine(temps, A, B, C)[0]
+    return lambda: pd.DataFrame({'Temperature (ºC)': temps, 'Vapour Pressure (mmHg)': pressure})
+
+
+def columns(points):
+    temps = grid(points)
+    return {'Temperature (ºC)': temps, 'Vapour Pressure (mmHg)': antoine(temps, A, B, C)[0]}
+
+
+def legacy_xlsx_export(points):
+    import pandas as pd
+
+    frame = pd.DataFrame(columns(points))
+
+    def run():
+        towrite = io.BytesIO()
+        frame.to_excel(towrite, index=False, header=True)
+        towrite.seek(0)
+        return base64.b64encode(towrite.read()).decode()
+    return run
+
+
+def format_export(fmt):
+    def case(points):
+        table = columns(points)
+        return lambda: export_bytes(fmt, table)
+    return case
+
+
+def batch_compute(compounds):
+    rng = np.random.default_rng(0)
+    table = CoefficientTable(
+        names=[f"compound {index}" for index in range(compounds)],
+        A=rng.uniform(6.5, 8.5, compounds),
+        B=rng.uniform(1000, 2000, compounds),
+        C=rng.uniform(200, 250, compounds),
+    )
+    temps = temperature_grid(0.0, 100.0, 100.0 / (BATCH_TEMPERATURES - 1))
+    out = np.empty((compounds, len(temps)))
+    return lambda: evaluate_batch(table, temps, out=out)
+
+
+def mixed_batch_compute(compounds):
+    # The same table with its rows spread over every correlation, one array pass each
+    rng = np.random.default_rng(0)
+    kinds = np.array(['antoine', 'extended_antoine', 'dippr101', 'wagner'])[np.arange(compounds) % 4]
+    parameters = np.full((compounds, MAX_PARAMETERS), np.nan)
+    samples = {
+        'antoine': [(6.5, 8.5), (1000, 2000), (200, 250)],
+        'extended_antoine': [(70, 75), (-7500, -7000), (0, 0), (0, 0), (-7.5, -7), (4e-6, 4.5e-6), (2, 2)],
+        'dippr101': [(70, 75), (-7500, -7000), (-7.5, -7), (4e-6, 4.5e-6), (2, 2)],
+        'wagner': [(500, 700), (3e6, 2e7), (-8, -7), (1, 2), (-3, -2), (-2, -1)],
+    }
+    for kind, ranges in samples.items():
+        rows = kinds == kind
+        for index, (low, high) in enumerate(ranges):
+            parameters[rows, index] = rng.uniform(low, high, np.count_nonzero(rows))
+    A, B, C = np.where(kinds == 'antoine', parameters[:, :3].T, np.nan)
+    table = CoefficientTable(
+        names=[f"compound {index}" for index in range(compounds)],
+        A=A, B=B, C=C, correlations=kinds, parameters=parameters,
+    )
+    temps = temperature_grid(0.0, 100.0, 100.0 / (BATCH_TEMPERATURES - 1))
+    out = np.empty((compounds, len(temps)))
+    return lambda: evaluate_batch(table, temps, out=out)
+
+
+def parquet_available():
+    try:
+        import pyarrow # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def cases(max_points, max_compounds):
+    '''(stage, name, size, setup) for every case within the size limits.'''
+    points = [size for size in POINTS if size <= max_points]
+    for size in points:
+        if size <= LEGACY_MAX_POINTS:
+            yield 'compute', 'legacy-loop', size, legacy_compute
+            yield 'convert', 'legacy-lists', size, legacy_convert
+        yield 'compute', 'engine', size, engine_compute
+        yield 'compute', 'interpolation-table', size, table_compute
+        yield 'convert', 'quantity', size, quantity_convert
+        yield 'table', 'dataframe', size, dataframe_table
+        if size <= XLSX_MAX_POINTS:
+            yield 'export', 'legacy-xlsx-base64', size, legacy_xlsx_export
+            yield 'export', 'xlsx', size, format_export('xlsx')
+        yield 'export', 'csv', size, format_export('csv')
+        yield 'export', 'npz', size, format_export('npz')
+        if parquet_available():
+            yield 'export', 'parquet', size, format_export('parquet')
+    for size in COMPOUNDS:
+        if size <= max_compounds:
+            yield 'batch', f'compounds-x{BATCH_TEMPERATURES}', size, batch_compute
+            yield 'batch', f'mixed-correlations-x{BATCH_TEMPERATURES}', size, mixed_batch_compute
+
+#### Measuring ####
+
+def measure(run, min_time=0.2, max_repeats=5):
+    '''Best wall time over up to max_repeats runs (fewer for slow cases) and peak traced memory.'''
+    run() # warm up
+
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < max_repeats and (not timings or time.perf_counter() - started < min_time):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'time': min(timings), 'peak_bytes': peak, 'repeats': len(timings)}
+
+
+def compare(results, baseline, tolerance):
+    '''Lines describing every case that regressed against the baseline.'''
+    regressions = []
+    for case, result in results.items():
+        reference = baseline.get(case)
+        if reference is None:
+            continue
+        for metric in ('time', 'peak_bytes'):
+            if reference[metric] and result[metric] > reference[metric] * tolerance:
+                regressions.append(f"{case}: {metric} {result[metric]:.4g} vs baseline {reference[metric]:.4g} "
+                    f"({result[metric] / reference[metric]:.2f}x)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--max-points', type=float, default=max(POINTS))
+    parser.add_argument('--max-compounds', type=float, default=max(COMPOUNDS))
+    parser.add_argument('--stage', action='append', choices=('compute', 'convert', 'table', 'export', 'batch'),
+        help="only run these stages (repeatable)")
+    parser.add_argument('--save', help="write the results to this JSON file")
+    parser.add_argument('--compare', help="baseline JSON file to compare against")
+    parser.add_argument('--tolerance', type=float, default=1.25, help="allowed slowdown factor against the baseline (default 1.25)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'case':<42} {'time (s)':>12} {'peak (MB)':>12} {'points/s':>12}")
+    for stage, name, size, setup in cases(args.max_points, args.max_compounds):
+        if args.stage and stage not in args.stage:
+            continue
+        case = f"{stage}/{name}/{size}"
+        result = measure(setup(size))
+        results[case] = result
+        points = size * BATCH_TEMPERATURES if stage == 'batch' else size
+        print(f"{case:<42} {result['time']:>12.6f} {result['peak_bytes'] / 2**20:>12.2f} {points / result['time']:>12.3g}")
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump({
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'machine': platform.platform(),
+                'results': results,
+            }, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)['results']
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.compare} (tolerance {args.tolerance}x)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
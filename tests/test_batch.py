@@ -0,0 +1,70 @@
+import io
+
+import pytest
+
+from vapour_pressure.batch import read_coefficient_table
+
+
+def upload(data, name):
+    buffer = io.BytesIO(data)
+    buffer.name = name
+    return buffer
+
+
+@pytest.mark.parametrize('data, name', [
+    (b'not a spreadsheet', 'table.xlsx'),
+    (b'PK\x03\x04truncated', 'table.xlsx'),
+    (b'', 'table.csv'),
+    (b'Compound,A\n"unterminated', 'table.csv'),
+])
+def test_unreadable_files_raise_value_error(data, name):
+    with pytest.raises(ValueError, match=name):
+        read_coefficient_table(upload(data, name))
+
+
+def test_read_csv_table():
+    table = read_coefficient_table(upload(b'Compound,A,B,C\nWater,8.10765,1750.286,235\n', 'table.csv'))
+    assert table.names.tolist() == ['Water']
+    assert table.correlations.tolist() == ['antoine']
+
+
+
+def test_database_content_hash_follows_the_contents(tmp_path):
+    from vapour_pressure.database import CompoundDatabase
+
+    first = CompoundDatabase.load(upload(b'Compound,A,B,C\nWater,8.10765,1750.286,235\n', 'table.csv'), cache_dir=str(tmp_path))
+    edited = CompoundDatabase.load(upload(b'Compound,A,B,C\nWater,8.0,1750.286,235\n', 'table.csv'), cache_dir=str(tmp_path))
+    assert first.content_hash != edited.content_hash
+    assert edited.table.A.tolist() == [8.0]
+
+
+@pytest.fixture
+def database():
+    from vapour_pressure.batch import CoefficientTable
+    from vapour_pressure.database import CompoundDatabase
+
+    table = CoefficientTable(
+        names=['Carbon monoxide', 'Cobalt', 'Nitric oxide', 'Nobelium', 'Water', 'Heavy water'],
+        A=[6.24, 9.0, 8.7, 1.0, 8.10765, 8.0],
+        B=[230.3, 1.0, 682.9, 1.0, 1750.286, 1700.0],
+        C=[260.0, 1.0, 268.3, 1.0, 235.0, 230.0],
+        formulas=['CO', 'Co', 'NO', 'No', 'H2O', ' D2O '],
+    )
+    return CompoundDatabase.from_table(table)
+
+
+def test_formula_lookup_is_case_sensitive(database):
+    assert database.find_formula('CO').tolist() == [0]
+    assert database.find_formula('Co').tolist() == [1]
+    assert database.find_formula('NO').tolist() == [2]
+    assert database.find_formula('No').tolist() == [3]
+    assert database.find_formula('co').tolist() == []
+    assert database.find_formula(' D2O').tolist() == [5] # only whitespace is ignored
+
+
+def test_name_lookup_ignores_case_and_whitespace(database):
+    assert database.find(' water ') == 4
+    assert 'COBALT' in database and 'Iron' not in database
+    assert database.coefficients('Water') == (8.10765, 1750.286, 235.0)
+    with pytest.raises(KeyError):
+        database.find('Iron')
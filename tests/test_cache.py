@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from vapour_pressure.cache import LRUCache
+
+
+def test_evicts_least_recently_used_by_entry_count():
+    cache = LRUCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a') # b is now the least recently used
+    cache.put('c', 3)
+    assert 'a' in cache and 'c' in cache and 'b' not in cache
+    assert cache.stats()['evictions'] == 1
+
+
+def test_evicts_by_byte_budget():
+    cache = LRUCache(maxsize=100, max_bytes=2500)
+    for key in range(3):
+        cache.put(key, np.zeros(100)) # 800 bytes each
+    assert len(cache) == 3 and cache.nbytes == 2400
+    cache.put(3, np.zeros(100))
+    assert 0 not in cache and len(cache) == 3 and cache.nbytes == 2400
+
+
+def test_replacing_a_key_updates_the_byte_count():
+    cache = LRUCache(max_bytes=10**6)
+    cache.put('a', np.zeros(100))
+    cache.put('a', np.zeros(10))
+    assert len(cache) == 1 and cache.nbytes == 80
+
+
+def test_oversize_values_bypass_the_cache():
+    cache = LRUCache(max_bytes=1000)
+    cache.put('small', np.zeros(10))
+    big = np.zeros(1000)
+    assert cache.put('big', big) is big
+    assert 'big' not in cache and 'small' in cache # nothing was evicted for it
+    assert big.flags.writeable
+
+
+def test_cached_arrays_are_frozen():
+    cache = LRUCache()
+    temps, pressure = cache.get_or_compute('curve', lambda: (np.arange(3.0), np.ones(3)))
+    for array in (temps, pressure):
+        with pytest.raises(ValueError):
+            array[0] = 5.0
+
+
+def test_hit_and_miss_counters():
+    cache = LRUCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return 'value'
+
+    assert cache.get_or_compute('key', compute) == 'value'
+    assert cache.get_or_compute('key', compute) == 'value'
+    assert cache.get('other') is None
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (1, 2)
+    assert stats['hit_rate'] == pytest.approx(1 / 3)
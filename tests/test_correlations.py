@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from vapour_pressure.correlations import (CORRELATIONS, MAX_PARAMETERS, evaluate_correlations, evaluate_derivatives,
+    get_correlation)
+from vapour_pressure.engine import antoine
+
+# Water in every correlation; the extended Antoine set reduces to the DIPPR 101 one
+PARAMETERS = {
+    'antoine': (8.10765, 1750.286, 235.0),
+    'extended_antoine': (73.649, -7258.2, 0.0, 0.0, -7.3037, 4.1653e-6, 2.0),
+    'dippr101': (73.649, -7258.2, -7.3037, 4.1653e-6, 2.0),
+    'wagner': (647.3, 22.12e6, -7.77224, 1.45684, -2.71942, -1.41336),
+}
+TEMPS = np.array([-20.0, 0.01, 25.0, 100.0, 200.0, 300.0, 370.0])
+
+
+def test_every_registered_correlation_is_covered():
+    assert set(PARAMETERS) == set(CORRELATIONS)
+
+
+@pytest.mark.parametrize('name', sorted(PARAMETERS))
+def test_derivative_matches_finite_differences(name):
+    correlation = get_correlation(name)
+    parameters = PARAMETERS[name]
+    slope, invalid = correlation.derivative(TEMPS, *parameters)
+    step = 1e-5
+    numeric = (correlation.pressure(TEMPS + step, *parameters)[0] - correlation.pressure(TEMPS - step, *parameters)[0]) / (2 * step)
+    assert not invalid.any()
+    np.testing.assert_allclose(slope, numeric, rtol=1e-6)
+
+
+def test_dippr101_and_extended_antoine_give_1_atm_at_100_c():
+    for name in ('dippr101', 'extended_antoine'):
+        pressure, _ = get_correlation(name).pressure(100.0, *PARAMETERS[name])
+        assert pressure == pytest.approx(760.0, rel=2e-3)
+
+
+def test_wagner_is_invalid_above_the_critical_temperature():
+    pressure, invalid = get_correlation('wagner').pressure(np.array([374.0, 374.2, 500.0]), *PARAMETERS['wagner'])
+    assert invalid.tolist() == [False, True, True]
+    assert np.isnan(pressure[1:]).all()
+    critical, _ = get_correlation('wagner').pressure(647.3 - 273.15, *PARAMETERS['wagner'])
+    assert critical * 133.322368 == pytest.approx(22.12e6) # P = Pc at T = Tc
+
+
+def test_antoine_correlation_is_the_engine():
+    pressure, _ = get_correlation('Antoine').pressure(TEMPS, *PARAMETERS['antoine'])
+    np.testing.assert_array_equal(pressure, antoine(TEMPS, *PARAMETERS['antoine'])[0])
+
+
+def test_lookup_by_label_and_unknown_names():
+    assert get_correlation('DIPPR 101').name == 'dippr101'
+    assert get_correlation('Extended-Antoine').name == 'extended_antoine'
+    assert get_correlation('').name == 'antoine'
+    with pytest.raises(ValueError, match="Unknown correlation"):
+        get_correlation('Riedel')
+
+
+def test_grouped_evaluation_matches_each_row_alone():
+    kinds = np.array(['wagner', 'antoine', 'dippr101', 'antoine', 'extended_antoine'])
+    parameters = np.full((len(kinds), MAX_PARAMETERS), np.nan)
+    for row, kind in enumerate(kinds):
+        parameters[row, :len(PARAMETERS[kind])] = PARAMETERS[kind]
+
+    pressure, invalid = evaluate_correlations(kinds, parameters, TEMPS)
+    slope, _ = evaluate_derivatives(kinds, parameters, TEMPS)
+    for row, kind in enumerate(kinds):
+        correlation = get_correlation(kind)
+        expected, expected_invalid = correlation.pressure(TEMPS, *PARAMETERS[kind])
+        np.testing.assert_array_equal(pressure[row], expected)
+        np.testing.assert_array_equal(invalid[row], expected_invalid)
+        np.testing.assert_array_equal(slope[row], correlation.derivative(TEMPS, *PARAMETERS[kind])[0])
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from vapour_pressure.engine import antoine, antoine_temperature, temperature_grid
+
+WATER = (8.10765, 1750.286, 235.0)
+
+
+def test_antoine_matches_the_formula():
+    temps = np.array([0.0, 25.0, 100.0])
+    pressure, invalid = antoine(temps, *WATER)
+    np.testing.assert_allclose(pressure, 10 ** (WATER[0] - WATER[1] / (temps + WATER[2])), rtol=1e-13)
+    assert not invalid.any()
+    assert pressure[2] == pytest.approx(760.0, rel=5e-3)
+
+
+def test_antoine_writes_into_out():
+    temps = np.linspace(0.0, 100.0, 11)
+    out = np.empty_like(temps)
+    pressure, _ = antoine(temps, *WATER, out=out)
+    assert pressure is out
+    np.testing.assert_array_equal(out, antoine(temps, *WATER)[0])
+
+
+def test_antoine_rejects_an_out_of_the_wrong_shape():
+    with pytest.raises(ValueError, match="out has shape"):
+        antoine(np.zeros(3), *WATER, out=np.empty(4))
+
+
+def test_antoine_broadcasts_compounds_against_temperatures():
+    A, B, C = np.array([8.10765, 8.20417]), np.array([1750.286, 1642.89]), np.array([235.0, 230.3])
+    temps = np.array([20.0, 50.0, 80.0])
+    pressure, invalid = antoine(temps[None, :], A[:, None], B[:, None], C[:, None])
+    assert pressure.shape == invalid.shape == (2, 3)
+    for row in range(2):
+        np.testing.assert_array_equal(pressure[row], antoine(temps, A[row], B[row], C[row])[0])
+
+
+def test_antoine_invalid_points_are_nan():
+    temps = np.array([-235.0, 20.0, np.nan])
+    pressure, invalid = antoine(temps, *WATER)
+    assert invalid.tolist() == [True, False, True]
+    assert np.isnan(pressure[invalid]).all() and np.isfinite(pressure[~invalid]).all()
+
+    # a pressure too large for a float64
+    pressure, invalid = antoine(0.0, 400.0, 1.0, 1.0)
+    assert invalid and np.isnan(pressure)
+
+
+def test_antoine_is_invalid_below_minus_c():
+    # T > -C is the equation's domain, below it the formula gives a spurious finite pressure
+    temps = np.array([-300.0, -236.0, -235.0, -200.0])
+    pressure, invalid = antoine(temps, *WATER)
+    assert invalid.tolist() == [True, True, True, False]
+    assert np.isnan(pressure[:3]).all() and pressure[3] > 0
+
+
+def test_antoine_temperature_inverts_antoine():
+    temps = np.linspace(-50.0, 300.0, 36)
+    pressure, _ = antoine(temps, *WATER)
+    boiling, invalid = antoine_temperature(pressure, *WATER)
+    assert not invalid.any()
+    np.testing.assert_allclose(boiling, temps, rtol=0, atol=1e-9)
+    assert antoine_temperature(760.0, *WATER)[0] == pytest.approx(100.0, abs=0.2)
+
+
+def test_antoine_temperature_broadcasts_and_writes_into_out():
+    A, B, C = np.array([8.10765, 7.0]), np.array([1750.286, 1200.0]), np.array([235.0, 220.0])
+    pressure = np.array([100.0, 760.0, 2000.0])
+    out = np.empty((2, 3))
+    boiling, _ = antoine_temperature(pressure[None, :], A[:, None], B[:, None], C[:, None], out=out)
+    assert boiling is out
+    for row in range(2):
+        np.testing.assert_allclose(boiling[row], antoine_temperature(pressure, A[row], B[row], C[row])[0])
+
+
+def test_antoine_temperature_has_no_solution_outside_its_range():
+    A = WATER[0]
+    pressure = np.array([-1.0, 0.0, np.nan, 10**A, 2 * 10**A, 0.5 * 10**A])
+    boiling, invalid = antoine_temperature(pressure, *WATER)
+    assert invalid.tolist() == [True, True, True, True, True, False]
+    assert np.isnan(boiling[invalid]).all() and np.isfinite(boiling[~invalid]).all()
+    assert boiling[-1] > -WATER[2] # on the physical branch
+
+
+def test_temperature_grid_includes_the_end_point_on_the_grid():
+    np.testing.assert_array_equal(temperature_grid(0.0, 1.0, 0.25), [0.0, 0.25, 0.5, 0.75, 1.0])
+    assert temperature_grid(0.0, 100.0, 0.1)[-1] == pytest.approx(100.0) # no drift or lost end point on fine steps
+    assert len(temperature_grid(0.0, 100.0, 0.1)) == 1001
+
+
+def test_temperature_grid_stops_before_an_end_point_off_the_grid():
+    np.testing.assert_array_equal(temperature_grid(0.0, 1.0, 0.4), [0.0, 0.4, 0.8])
+    np.testing.assert_array_equal(temperature_grid(5.0, 5.0), [5.0])
+    assert len(temperature_grid(1.0, 0.0)) == 0
+    with pytest.raises(ValueError):
+        temperature_grid(0.0, 1.0, 0.0)
@@ -0,0 +1,27 @@
+import io
+
+import numpy as np
+import pytest
+
+from vapour_pressure.export import export_bytes
+
+
+def test_npz_keeps_columns_whose_names_collide():
+    columns = {'Pressure (mmHg)': np.array([1.0]), 'pressure mmhg': np.array([2.0]), 'Labels': np.array([3.0])}
+    with np.load(io.BytesIO(export_bytes('npz', columns))) as arrays:
+        assert arrays['labels'].tolist() == list(columns)
+        assert arrays['pressure_mmhg'].tolist() == [1.0]
+        assert arrays['pressure_mmhg_2'].tolist() == [2.0]
+        assert arrays['labels_2'].tolist() == [3.0]
+
+
+def test_parquet_from_no_chunks_is_a_valid_file():
+    pq = pytest.importorskip('pyarrow.parquet')
+    data = export_bytes('parquet', iter([]))
+    assert pq.read_table(io.BytesIO(data)).num_rows == 0
+
+
+def test_streamed_chunks_match_one_table():
+    chunks = [{'x': np.arange(3.0), 'y': np.arange(3.0) * 2}, {'x': np.arange(3.0, 5.0), 'y': np.arange(3.0, 5.0) * 2}]
+    whole = {'x': np.arange(5.0), 'y': np.arange(5.0) * 2}
+    assert export_bytes('csv', iter(chunks)) == export_bytes('csv', whole)
@@ -0,0 +1,62 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from vapour_pressure.batch import CoefficientTable
+from vapour_pressure.cli import main
+from vapour_pressure.engine import antoine
+from vapour_pressure.fitting import fit_many, read_measurements
+
+WATER = (8.10765, 1750.286, 235.0)
+ETHANOL = (8.20417, 1642.89, 230.3)
+
+
+def dataset(coefficients, lower, upper, points=25):
+    temps = np.linspace(lower, upper, points)
+    return temps, antoine(temps, *coefficients)[0]
+
+
+def test_recovers_exact_coefficients():
+    result = fit_many([dataset(WATER, 1, 100), dataset(ETHANOL, -10, 78, points=12)])
+    assert result.converged.all()
+    np.testing.assert_allclose(np.column_stack([result.A, result.B, result.C]), [WATER, ETHANOL], rtol=1e-6)
+    assert (result.max_relative_error < 1e-8).all()
+
+
+def test_no_datasets_is_a_value_error():
+    with pytest.raises(ValueError, match="no datasets"):
+        fit_many([])
+
+
+def test_exported_columns_read_back_as_a_coefficient_table():
+    result = fit_many([dataset(WATER, 1, 100)])
+    columns = result.columns(['Water'])
+    assert 'T Min (ºC)' in columns and 'T Max (ºC)' in columns
+
+    table = CoefficientTable.from_frame(pd.DataFrame(columns))
+    assert table.t_min.tolist() == [1.0] and table.t_max.tolist() == [100.0]
+
+
+@pytest.mark.parametrize('data, name', [
+    (b'not a spreadsheet', 'measurements.xlsx'),
+    (b'PK\x03\x04truncated', 'measurements.xlsx'),
+    (b'', 'measurements.csv'),
+])
+def test_unreadable_measurements_raise_value_error(data, name):
+    upload = io.BytesIO(data)
+    upload.name = name
+    with pytest.raises(ValueError, match=name):
+        read_measurements(upload)
+
+
+def test_fit_command_reports_an_unreadable_file(tmp_path, capsys):
+    path = tmp_path / 'bad.xlsx'
+    path.write_bytes(b'not a spreadsheet')
+    with pytest.raises(SystemExit) as exit:
+        main(['fit', str(path)])
+    assert exit.value.code == 1
+    error = capsys.readouterr().err
+    assert error.startswith("error: bad.xlsx is not a readable Excel file")
+    assert 'Traceback' not in error
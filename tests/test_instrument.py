@@ -0,0 +1,33 @@
+import tracemalloc
+
+from vapour_pressure.instrument import Timings
+
+
+def test_tracing_started_elsewhere_is_left_running():
+    tracemalloc.start()
+    try:
+        timings = Timings(trace_memory=True)
+        with timings.stage('compute'):
+            data = bytearray(2**20)
+        assert tracemalloc.is_tracing()
+        assert timings.records[0].allocated_bytes >= len(data)
+    finally:
+        tracemalloc.stop()
+
+
+def test_tracing_started_here_is_stopped():
+    assert not tracemalloc.is_tracing()
+    with Timings(trace_memory=True).stage('compute'):
+        assert tracemalloc.is_tracing()
+    assert not tracemalloc.is_tracing()
+
+
+def test_nested_stage_does_not_reset_the_outer_peak():
+    outer, inner = Timings(trace_memory=True), Timings(trace_memory=True)
+    with outer.stage('outer'):
+        data = bytearray(4 * 2**20)
+        del data
+        with inner.stage('inner'):
+            pass
+    assert outer.records[0].peak_bytes >= 4 * 2**20
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,50 @@
+import numpy as np
+
+from vapour_pressure.engine import antoine
+from vapour_pressure.mixture import binary_txy, bubble_pressure, bubble_temperature, dew_pressure, dew_temperature
+
+# benzene, toluene (mmHg, °C)
+A = np.array([6.89272, 6.95805])
+B = np.array([1203.531, 1346.773])
+C = np.array([219.888, 219.693])
+COMPOSITIONS = np.array([[0.0, 1.0], [0.1, 0.9], [0.5, 0.5], [0.9, 0.1], [1.0, 0.0]])
+
+
+def test_bubble_temperature_satisfies_raoults_law():
+    result = bubble_temperature(COMPOSITIONS, 760.0, A, B, C)
+    assert not result.invalid.any()
+    saturation = antoine(result.temperature[:, None], A, B, C)[0]
+    np.testing.assert_allclose((COMPOSITIONS * saturation).sum(axis=1), 760.0, rtol=1e-10)
+    np.testing.assert_allclose(result.y.sum(axis=1), 1.0)
+
+
+def test_dew_temperature_satisfies_raoults_law():
+    result = dew_temperature(COMPOSITIONS, 760.0, A, B, C)
+    assert not result.invalid.any()
+    saturation = antoine(result.temperature[:, None], A, B, C)[0]
+    np.testing.assert_allclose(760.0 * (COMPOSITIONS / saturation).sum(axis=1), 1.0, rtol=1e-10)
+    np.testing.assert_allclose(result.x.sum(axis=1), 1.0)
+
+
+def test_pure_compounds_boil_at_their_boiling_points():
+    result = bubble_temperature([[1.0, 0.0], [0.0, 1.0]], 760.0, A, B, C)
+    expected = B / (A - np.log10(760.0)) - C
+    np.testing.assert_allclose(result.temperature, expected, rtol=1e-10)
+
+
+def test_temperature_and_pressure_solvers_agree():
+    bubble = bubble_temperature(COMPOSITIONS, 500.0, A, B, C)
+    np.testing.assert_allclose(bubble_pressure(COMPOSITIONS, bubble.temperature, A, B, C).pressure, 500.0, rtol=1e-10)
+    dew = dew_temperature(COMPOSITIONS, 500.0, A, B, C)
+    np.testing.assert_allclose(dew_pressure(COMPOSITIONS, dew.temperature, A, B, C).pressure, 500.0, rtol=1e-10)
+
+
+def test_dew_line_lies_above_the_bubble_line():
+    x1, temperature, y1 = binary_txy(760.0, A, B, C, points=21)
+    assert np.all(np.diff(temperature) < 0) # the lighter benzene lowers the boiling point
+    assert np.all(y1[1:-1] > x1[1:-1]) # and is enriched in the vapour
+
+
+def test_unsolvable_rows_are_invalid_not_raised():
+    result = bubble_temperature([[0.5, 0.5]], 760.0, np.array([np.nan, 6.95805]), B, C)
+    assert result.invalid.all() and np.isnan(result.temperature).all()
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from vapour_pressure.batch import CoefficientTable, evaluate_batch
+from vapour_pressure.engine import antoine
+from vapour_pressure.export import _concatenate
+from vapour_pressure.parallel import SharedArray, evaluate_parallel, iter_batch_columns, iter_parallel
+
+TEMPS = np.linspace(-50.0, 300.0, 64)
+
+
+def coefficients(rows):
+    rng = np.random.default_rng(0)
+    A, B, C = rng.uniform(6.5, 8.5, rows), rng.uniform(1000, 2000, rows), rng.uniform(200, 250, rows)
+    C[::7] = 50.0 # some rows reach T = -C inside the grid
+    return A, B, C
+
+
+@pytest.mark.parametrize('file', [False, True])
+def test_parallel_matches_serial(tmp_path, file):
+    A, B, C = coefficients(37)
+    expected, _ = antoine(TEMPS[None, :], A[:, None], B[:, None], C[:, None])
+    path = str(tmp_path / 'grid.npy') if file else None
+    with SharedArray((len(A), len(TEMPS)), path=path) as output:
+        result = evaluate_parallel(TEMPS, A, B, C, output, processes=2, chunk_rows=5).copy()
+    np.testing.assert_array_equal(result, expected)
+    if file:
+        np.testing.assert_array_equal(np.load(path), expected)
+
+
+def test_chunks_come_back_in_order():
+    A, B, C = coefficients(23)
+    with SharedArray((len(A), len(TEMPS))) as output:
+        ranges = list(iter_parallel(TEMPS, A, B, C, output, processes=2, chunk_rows=4))
+    assert ranges == [(start, min(start + 4, 23)) for start in range(0, 23, 4)]
+
+
+def test_batch_columns_match_evaluate_batch():
+    A, B, C = coefficients(11)
+    table = CoefficientTable([f"compound {row}" for row in range(11)], A, B, C)
+    streamed = _concatenate(iter_batch_columns(table, TEMPS, processes=2, chunk_rows=3))
+    expected = evaluate_batch(table, TEMPS).columns()
+    assert list(streamed) == list(expected)
+    for label in expected:
+        np.testing.assert_array_equal(streamed[label], expected[label])
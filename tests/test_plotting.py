@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from vapour_pressure.plotting import minmax_decimate, unit_switching_figure
+from vapour_pressure.units import PRESSURE_UNITS, TEMPERATURE_UNITS
+
+
+def buckets_of(count, buckets):
+    return (np.arange(count) * buckets) // count
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_every_bucket_keeps_its_min_and_max(seed):
+    y = np.random.default_rng(seed).normal(size=10007)
+    buckets = 100
+    keep = minmax_decimate(y, buckets)
+    assert len(keep) <= 4 * buckets
+    assert np.all(np.diff(keep) > 0) # sorted, no duplicates
+
+    bucket = buckets_of(len(y), buckets)
+    for index in range(buckets):
+        kept = y[keep[bucket[keep] == index]]
+        assert kept.min() == y[bucket == index].min()
+        assert kept.max() == y[bucket == index].max()
+
+
+def test_end_points_are_kept():
+    y = np.sin(np.linspace(0.0, 20.0, 5000))
+    keep = minmax_decimate(y, 50)
+    assert keep[0] == 0 and keep[-1] == len(y) - 1
+
+
+def test_gaps_are_kept():
+    y = np.linspace(0.0, 1.0, 5000)
+    y[1000:1003] = np.nan
+    y[4000] = np.inf
+    keep = minmax_decimate(y, 50)
+    kept = y[keep]
+    assert np.isnan(kept).any() and np.isinf(kept).any()
+    # the line still breaks between the points either side of the gap
+    gap = np.flatnonzero(np.isnan(kept))[0]
+    assert keep[gap - 1] < 1000 and 1000 <= keep[gap] < 1003
+
+
+@pytest.mark.parametrize('count', [0, 1, 50, 200])
+def test_short_series_are_not_decimated(count):
+    np.testing.assert_array_equal(minmax_decimate(np.arange(count, dtype=float), 50), np.arange(count))
+
+
+def test_no_buckets_keeps_everything():
+    np.testing.assert_array_equal(minmax_decimate(np.arange(1000.0), 0), np.arange(1000))
+
+
+def test_unit_switching_figure_converts_in_the_browser():
+    pytest.importorskip('bokeh')
+    temps = np.linspace(0.0, 100.0, 5000)
+    layout = unit_switching_figure(temps, 10 * temps + 1, pressure_unit='kPa', temperature_unit='K')
+    pressure_buttons, temperature_buttons, graph = layout.children
+
+    assert pressure_buttons.labels == list(PRESSURE_UNITS)
+    assert pressure_buttons.labels[pressure_buttons.active] == 'kPa'
+    assert temperature_buttons.labels == list(TEMPERATURE_UNITS)
+    assert temperature_buttons.labels[temperature_buttons.active] == 'K'
+    assert graph.xaxis[0].axis_label == "Temperature (K)"
+    assert graph.yaxis[0].axis_label == "Vapour Pressure (kPa)"
+    assert graph.title.text == graph.title.tags[0] == "Vapour Pressure (kPa) vs Temperature (K)"
+
+    # the data is sent once, decimated and in base units, and converted by the transforms
+    glyph = graph.renderers[0].glyph
+    source = graph.renderers[0].data_source
+    assert len(source.data['x']) < len(temps)
+    np.testing.assert_array_equal(source.data['y'], 10 * source.data['x'] + 1)
+    for field, buttons, units in ((glyph.x, temperature_buttons, TEMPERATURE_UNITS), (glyph.y, pressure_buttons, PRESSURE_UNITS)):
+        assert field.transform.args['buttons'] is buttons
+        assert field.transform.args['units'] == {unit: list(factors) for unit, factors in units.items()}
+
+    # both button groups relabel the chart through the same callback
+    relabel, = pressure_buttons.js_property_callbacks['change:active']
+    assert temperature_buttons.js_property_callbacks['change:active'] == [relabel]
+    assert relabel.args['source'] is source
+    assert relabel.args['title'] is graph.title
+
+
+def test_unit_switching_figure_keeps_a_custom_title():
+    pytest.importorskip('bokeh')
+    layout = unit_switching_figure(np.arange(10.0), np.arange(10.0), title="Water")
+    graph = layout.children[2]
+    assert graph.title.text == "Water"
+    assert graph.title.tags == ["Vapour Pressure (mmHg) vs Temperature (°C)"]
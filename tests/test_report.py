@@ -0,0 +1,59 @@
+import io
+import json
+import re
+
+import numpy as np
+import pytest
+
+from vapour_pressure.batch import CoefficientTable
+from vapour_pressure.engine import antoine
+from vapour_pressure.report import render_report
+
+pytest.importorskip('bokeh')
+
+
+def columns(node, found):
+    '''The x/y columns and the title in a serialized chart, whichever way this Bokeh version nests them.'''
+    if isinstance(node, dict):
+        if node.get('name') == 'Title':
+            found['title'] = node['attributes']['text']
+        for key, value in node.items():
+            if key in ('x', 'y') and isinstance(value, list):
+                found[key] = value
+            columns(value, found)
+    elif isinstance(node, list):
+        if len(node) == 2 and node[0] in ('x', 'y') and isinstance(node[1], list):
+            found[node[0]] = node[1]
+        for value in node:
+            columns(value, found)
+    return found
+
+
+def test_one_chart_per_compound_with_its_own_data():
+    table = CoefficientTable(['Water', 'Ethanol', ''], [8.10765, 8.20417, 7.0], [1750.286, 1642.89, 1500.0], [235.0, 230.3, 150.0],
+        formulas=['H2O', 'C2H6O', ''], t_min=[1.0, -57.0, np.nan], t_max=[100.0, 80.0, np.nan])
+    stream = io.StringIO()
+    stats = render_report(table, stream, lower=0.0, upper=50.0, points=5, chunk_size=2, processes=1)
+    assert stats['charts'] == 3
+
+    page = stream.getvalue()
+    assert page.count('<div class="chart"') == 3
+    items = re.findall(r'<script type="application/json" data-chart="(chart-\d+)">(.*?)</script>', page, re.S)
+    assert [target for target, _ in items] == ['chart-0', 'chart-1', 'chart-2']
+
+    titles = ["Water H2O", "Ethanol C2H6O", "Compound 3"]
+    ranges = [(1.0, 100.0), (-57.0, 80.0), (0.0, 50.0)]
+    for row, (target, item) in enumerate(items):
+        item = json.loads(item)
+        assert item['target_id'] == target
+        found = columns(item['doc'], {})
+        assert found['title'] == titles[row]
+        temps = np.linspace(*ranges[row], 5)
+        np.testing.assert_allclose(found['x'], temps)
+        np.testing.assert_allclose(found['y'], antoine(temps, table.A[row], table.B[row], table.C[row])[0])
+
+
+def test_compounds_without_a_range_need_lower_and_upper():
+    table = CoefficientTable(['Water'], [8.10765], [1750.286], [235.0])
+    with pytest.raises(ValueError, match="Water"):
+        render_report(table, io.StringIO())
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from vapour_pressure.engine import antoine
+from vapour_pressure.sampling import adaptive_grid
+
+WATER = (8.10765, 1750.286, 235.0)
+
+
+@pytest.mark.parametrize('rtol', [1e-2, 1e-3, 1e-4])
+def test_grid_meets_rtol_at_every_midpoint(rtol):
+    temps, pressure, invalid = adaptive_grid(*WATER, 0.0, 100.0, rtol=rtol, max_points=100000)
+    assert not invalid.any()
+    np.testing.assert_allclose(pressure, antoine(temps, *WATER)[0])
+
+    mids = 0.5 * (temps[:-1] + temps[1:])
+    exact = antoine(mids, *WATER)[0]
+    interpolated = 0.5 * (pressure[:-1] + pressure[1:])
+    assert np.max(np.abs(interpolated - exact) / exact) <= rtol
+
+
+def test_grid_is_sorted_and_spans_the_range():
+    temps, _, _ = adaptive_grid(*WATER, 10.0, 90.0)
+    assert temps[0] == 10.0 and temps[-1] == 90.0
+    assert np.all(np.diff(temps) > 0)
+
+
+@pytest.mark.parametrize('max_points', [2, 20, 100])
+def test_max_points_is_respected(max_points):
+    temps, pressure, invalid = adaptive_grid(*WATER, 0.0, 100.0, rtol=1e-9, max_points=max_points)
+    assert len(temps) == len(pressure) == len(invalid) <= max_points
+
+
+def test_points_concentrate_near_the_asymptote():
+    # log10 P -> -inf as T -> -C, so the curve bends sharply just above -235 °C
+    A, B, C = WATER
+    lower, upper = -C + 20.0, 100.0
+    temps, _, invalid = adaptive_grid(A, B, C, lower, upper, rtol=1e-3, max_points=2000)
+    assert not invalid.any()
+    tenth = 0.1 * (upper - lower)
+    near = temps[temps < lower + tenth]
+    far = temps[temps > upper - tenth]
+    assert len(near) > 5 * len(far)
+    assert np.median(np.diff(near)) < np.median(np.diff(far)) / 5
+
+
+def test_custom_function_is_sampled():
+    def parabola(temps):
+        return 1.0 + temps**2, np.zeros(np.shape(temps), dtype=bool)
+
+    temps, pressure, _ = adaptive_grid(None, None, None, -1.0, 1.0, rtol=1e-3, function=parabola)
+    np.testing.assert_array_equal(pressure, 1.0 + temps**2)
+
+
+def test_empty_and_degenerate_ranges():
+    assert len(adaptive_grid(*WATER, 10.0, 0.0)[0]) == 0
+    np.testing.assert_array_equal(adaptive_grid(*WATER, 5.0, 5.0)[0], [5.0])
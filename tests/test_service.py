@@ -0,0 +1,104 @@
+import asyncio
+import json
+import logging
+
+import numpy as np
+import pytest
+
+from vapour_pressure.engine import antoine
+from vapour_pressure.service import MAX_BODY_BYTES, MAX_LINE_BYTES, VapourPressureService, start_server
+
+WATER = {'A': 8.10765, 'B': 1750.286, 'C': 235}
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_concurrent_requests_are_batched():
+    async def scenario():
+        service = VapourPressureService()
+        temps = [[20.0], [50.0, 80.0], [100.0]]
+        responses = await asyncio.gather(*(
+            service.respond('POST', '/antoine', json.dumps({**WATER, 'T': values}).encode()) for values in temps))
+        return service, temps, responses
+
+    service, temps, responses = run(scenario())
+    for values, (status, _, body) in zip(temps, responses):
+        assert status == 200
+        expected, _ = antoine(np.array(values), WATER['A'], WATER['B'], WATER['C'])
+        np.testing.assert_allclose(json.loads(body)['pressure'], expected)
+    assert service.antoine.stats()['batches'] == 1
+    assert service.antoine.stats()['requests'] == 3
+
+
+def test_invalid_points_are_null():
+    status, _, body = run(VapourPressureService().respond('GET', '/antoine?A=8&B=1700&C=235&T=-235,20', b''))
+    assert status == 200
+    pressure = json.loads(body)['pressure']
+    assert pressure[0] is None and pressure[1] > 0
+
+
+@pytest.mark.parametrize('method, target, body, status', [
+    ('GET', '/nowhere', b'', 404),
+    ('PUT', '/antoine', b'', 405),
+    ('POST', '/antoine', b'not json', 400),
+    ('POST', '/antoine', b'[1, 2]', 400),
+    ('GET', '/antoine?A=8&B=1700&T=20', b'', 400),
+    ('GET', '/antoine?A=8&B=1700&C=x&T=20', b'', 400),
+    ('POST', '/antoine', json.dumps({**WATER, 'T': [20], 'pressure_unit': ['mmHg']}).encode(), 400),
+    ('POST', '/antoine', json.dumps({**WATER, 'T': [20], 'format': {'csv': 1}}).encode(), 400),
+    ('POST', '/antoine', json.dumps({**WATER, 'T': {'a': 1}}).encode(), 400),
+    ('POST', '/convert', json.dumps({'kind': ['pressure'], 'values': [1]}).encode(), 400),
+    ('GET', '/antoine?A=8&B=1700&C=235&lower=0&upper=1e9&step=1e-3', b'', 413),
+    ('GET', '/antoine?A=8&B=1700&C=235&T=20&format=docx', b'', 400),
+])
+def test_malformed_requests_get_error_responses(method, target, body, status):
+    code, content_type, payload = run(VapourPressureService().respond(method, target, body))
+    assert code == status
+    assert content_type == 'application/json' and 'error' in json.loads(payload)
+
+
+async def raw_request(request):
+    server = await start_server('127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(request)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+    return response
+
+
+@pytest.mark.parametrize('length, status', [('abc', b'400'), ('-5', b'400'), (str(MAX_BODY_BYTES + 1), b'413')])
+def test_bad_content_length_is_answered(length, status):
+    response = run(raw_request(f"POST /antoine HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode()))
+    assert response.split(b' ')[1] == status
+
+
+def test_keep_alive_serves_several_requests_on_one_connection():
+    request = b"GET /health HTTP/1.1\r\n\r\nGET /antoine?A=8&B=1700&C=235&T=20 HTTP/1.1\r\nConnection: close\r\n\r\n"
+    response = run(raw_request(request))
+    assert response.count(b'HTTP/1.1 200 OK') == 2
+
+
+def test_overlong_lines_are_answered():
+    temps = ','.join(['20'] * (MAX_LINE_BYTES // 3))
+    response = run(raw_request(f"GET /antoine?A=8&B=1700&C=235&T={temps} HTTP/1.1\r\n\r\n".encode()))
+    assert response.startswith(b'HTTP/1.1 414 ')
+
+    response = run(raw_request(f"GET /health HTTP/1.1\r\nCookie: {'x' * MAX_LINE_BYTES}\r\n\r\n".encode()))
+    assert response.startswith(b'HTTP/1.1 431 ')
+
+
+def test_unexpected_errors_are_logged(caplog):
+    async def broken(params):
+        raise RuntimeError("boom")
+
+    service = VapourPressureService()
+    service.routes['/health'] = broken
+    with caplog.at_level(logging.ERROR, logger='vapour_pressure.service'):
+        status, _, payload = run(service.respond('GET', '/health', b''))
+    assert status == 500 and json.loads(payload) == {'error': "internal error"}
+    assert "GET /health failed" in caplog.text and "RuntimeError: boom" in caplog.text
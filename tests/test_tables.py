@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from vapour_pressure.batch import CoefficientTable
+from vapour_pressure.engine import antoine
+from vapour_pressure.tables import InterpolationTables
+
+# Antoine coefficients (mmHg, °C) and the range each table covers
+COMPOUNDS = {
+    'water': ((8.10765, 1750.286, 235.0), (1.0, 100.0)),
+    'ethanol': ((8.20417, 1642.89, 230.3), (-57.0, 80.0)),
+    'benzene': ((6.89272, 1203.531, 219.888), (8.0, 103.0)),
+    'near asymptote': ((7.0, 1500.0, 150.0), (-140.0, 200.0)),
+}
+
+
+@pytest.fixture(scope='module')
+def table():
+    names = list(COMPOUNDS)
+    (A, B, C), bounds = (np.array(values).T for values in zip(*COMPOUNDS.values()))
+    return CoefficientTable(names, A, B, C, t_min=bounds[0], t_max=bounds[1])
+
+
+@pytest.mark.parametrize('degree, rtol', [(1, 1e-3), (3, 1e-3), (3, 1e-6), (3, 1e-9), (5, 1e-6), (5, 1e-9)])
+def test_error_bound_holds_across_the_range(table, rtol, degree):
+    tables = InterpolationTables.build(table, rtol=rtol, degree=degree)
+    for row in range(len(table)):
+        low, high = table.t_min[row], table.t_max[row]
+        # dense sample plus both edges and the points just inside them
+        temps = np.concatenate([np.linspace(low, high, 20001), [low, high, np.nextafter(low, high), np.nextafter(high, low)]])
+        exact, _ = antoine(temps, table.A[row], table.B[row], table.C[row])
+        approximate, invalid = tables.evaluate(row, temps)
+
+        assert not invalid.any()
+        assert np.max(np.abs(approximate / exact - 1)) <= rtol
+        # the scalar path evaluates the same polynomials
+        scalar = np.array([tables[row].pressure(temp) for temp in temps[::500]])
+        np.testing.assert_allclose(scalar, approximate[::500], rtol=1e-12)
+
+
+def test_unreachable_tolerance_raises(table):
+    with pytest.raises(ValueError, match="Could not reach"):
+        InterpolationTables.build(table, rtol=1e-9, degree=1)
+
+
+def test_out_of_range_is_invalid(table):
+    tables = InterpolationTables.build(table, rtol=1e-6)
+    low, high = table.t_min[0], table.t_max[0]
+    temps = np.array([low - 1, np.nextafter(low, -np.inf) - 1e-9, high + 1e-9, high + 1, np.nan, -300.0])
+    pressure, invalid = tables.evaluate(0, temps)
+    assert invalid.all() and np.isnan(pressure).all()
+    assert np.isnan(tables[0].pressure(high + 1))
+
+
+def test_scalar_temperature(table):
+    tables = InterpolationTables.build(table, rtol=1e-6)
+    pressure, invalid = tables.evaluate(0, 25.0)
+    assert pressure.shape == () and not invalid
+    assert pressure == pytest.approx(antoine(25.0, *COMPOUNDS['water'][0])[0], rel=1e-6)
+
+    pressure, invalid = tables.evaluate(0, np.float64(500.0))
+    assert np.isnan(pressure) and invalid
+
+
+def test_save_and_load_round_trip(table, tmp_path):
+    tables = InterpolationTables.build(table, rtol=1e-6)
+    tables.save(str(tmp_path))
+    loaded = InterpolationTables.load(str(tmp_path))
+    temps = np.linspace(10.0, 90.0, 101)
+    np.testing.assert_array_equal(loaded.evaluate(0, temps)[0], tables.evaluate(0, temps)[0])
+
+
+def test_rows_are_built_once(table):
+    tables = InterpolationTables.build(table, rtol=1e-6)
+    first = tables[1]
+    assert tables[1] is first and tables[-3] is first
+    first.pressure(25.0)
+    tables.evaluate(1, np.array([25.0]))
+    assert tables[1]._scalar is not None and tables[1]._columns is not None
+    with pytest.raises(IndexError):
+        tables[len(table)]
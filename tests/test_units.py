@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from vapour_pressure.units import PRESSURE_UNITS, TEMPERATURE_UNITS, Pressures, Temperature, convert
+
+
+@pytest.mark.parametrize('unit, expected', [
+    ('mmHg', 760.0), ('torr', 760.0), ('atm', 1.0), ('Bar', 1.01325), ('kPa', 101.325), ('Pa', 101325.0), ('psi', 14.6959488),
+])
+def test_one_atmosphere(unit, expected):
+    assert Pressures([760.0]).to(unit)[0] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('unit, expected', [('°C', 100.0), ('K', 373.15), ('°F', 212.0), ('°R', 671.67)])
+def test_boiling_water(unit, expected):
+    assert Temperature([100.0]).to(unit)[0] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('units', [PRESSURE_UNITS, TEMPERATURE_UNITS])
+def test_every_pair_round_trips(units):
+    values = np.array([-40.0, 0.0, 1.5, 1e4])
+    for from_unit in units:
+        for to_unit in units:
+            there = convert(values, units, from_unit, to_unit)
+            np.testing.assert_allclose(convert(there, units, to_unit, from_unit), values, rtol=1e-12, atol=1e-9)
+
+
+def test_to_writes_into_out_and_same_unit_returns_the_buffer():
+    pressure = Pressures([760.0, 1520.0])
+    assert pressure.to('mmHg') is pressure.values
+    out = np.empty(2)
+    assert pressure.to('atm', out=out) is out
+    np.testing.assert_allclose(out, [1.0, 2.0])
+
+
+def test_convert_in_place_keeps_the_buffer():
+    temperature = Temperature([0.0, 100.0])
+    buffer = temperature.values
+    assert temperature.convert_in_place('K') is temperature
+    assert temperature.values is buffer and temperature.unit == 'K'
+    np.testing.assert_allclose(buffer, [273.15, 373.15])
+
+
+def test_unknown_units_raise_value_error():
+    with pytest.raises(ValueError, match="Unknown unit"):
+        Pressures([1.0], 'inHg')
+    with pytest.raises(ValueError, match="Unknown unit"):
+        convert([1.0], TEMPERATURE_UNITS, '°C', 'C')
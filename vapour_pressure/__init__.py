@@ -0,0 +1,12 @@
+'''
+Computation layer behind the vapour pressure graph generator.
+
+Everything importable from here only depends on NumPy so it can be used
+without the Streamlit app; pandas, Bokeh and openpyxl are only imported by
+the stages that need them (reading spreadsheets, plotting and .xlsx export).
+
+'''
+from .correlations import CORRELATIONS, evaluate_correlations, get_correlation, register_correlation
+from .engine import antoine, antoine_derivative, antoine_temperature, temperature_grid
+from .pipeline import compute_correlation_curve, compute_curve, convert_curve, saturation_temperature, table_columns
+from .units import Pressures, Temperature
@@ -0,0 +1,227 @@
+'''
+Batch (multi-compound) evaluation of Antoine's equation
+
+A coefficient table holds one compound per row, laid out like the spreadsheets
+in Examples/ (a header row followed by the values), e.g.
+
+    Compound | Formula | A | B | C | T Min (°C) | T Max (°C)
+
+Only the A, B and C columns are required. Every compound is evaluated over a
+shared temperature grid as one (compounds x temperatures) array computation.
+
+Compounds can also use the other correlations of correlations.py: a
+Correlation column names each row's equation (empty means Antoine) and its
+parameters go in the columns P1 to P7, in the order the correlation lists
+them, e.g.
+
+    Compound | Correlation | P1 | P2 | P3 | P4 | P5
+    Water    | DIPPR 101   | 73.649 | -7258.2 | -7.3037 | 4.1653e-6 | 2
+
+A table mixing correlations is evaluated with one array pass per correlation.
+The Antoine-only calculations (saturation temperatures, mixtures, fitting)
+give NaN for the other rows.
+
+'''
+import os
+
+import numpy as np
+
+from .correlations import MAX_PARAMETERS, evaluate_correlations, get_correlation
+
+#### Column names accepted when reading a table (matched case-insensitively) ####
+
+COLUMN_ALIASES = {
+    'name': ('compound', 'name', 'species'),
+    'formula': ('formula',),
+    'A': ('a', 'coeff_a', 'a value'),
+    'B': ('b', 'coeff_b', 'b value'),
+    'C': ('c', 'coeff_c', 'c value'),
+    't_min': ('t min (°c)', 't min', 'tmin', 't_min'),
+    't_max': ('t max (°c)', 't max', 'tmax', 't_max'),
+    'correlation': ('correlation', 'equation'),
+    **{f'P{index}': (f'p{index}', f'parameter {index}') for index in range(1, MAX_PARAMETERS + 1)},
+}
+
+
+class CoefficientTable:
+    '''
+    Antoine coefficients (mmHg, °C) for a set of compounds, stored column-wise.
+
+    correlations names each compound's correlation (all Antoine by default)
+    and parameters holds its parameters as a (compounds x MAX_PARAMETERS)
+    array padded with NaN. Without parameters they are A, B and C; A, B and C
+    are NaN for compounds that don't use Antoine's equation.
+    '''
+
+    def __init__(self, names, A, B, C, formulas=None, t_min=None, t_max=None, correlations=None, parameters=None):
+        self.names = np.asarray(names, dtype=str)
+        self.A = np.asarray(A, dtype=np.float64)
+        self.B = np.asarray(B, dtype=np.float64)
+        self.C = np.asarray(C, dtype=np.float64)
+
+        count = len(self.names)
+        self.formulas = np.asarray(formulas if formulas is not None else [''] * count, dtype=str)
+        self.t_min = np.asarray(t_min if t_min is not None else np.full(count, -np.inf), dtype=np.float64)
+        self.t_max = np.asarray(t_max if t_max is not None else np.full(count, np.inf), dtype=np.float64)
+        self.correlations = np.asarray(correlations if correlations is not None else np.full(count, 'antoine'), dtype=str)
+
+        for column in (self.A, self.B, self.C, self.formulas, self.t_min, self.t_max, self.correlations):
+            if column.shape != (count,):
+                raise ValueError("Every column of a coefficient table must have one value per compound.")
+
+        if parameters is None:
+            parameters = np.full((count, MAX_PARAMETERS), np.nan)
+            parameters[:, 0], parameters[:, 1], parameters[:, 2] = self.A, self.B, self.C
+        self.parameters = np.asarray(parameters, dtype=np.float64)
+        if self.parameters.shape != (count, MAX_PARAMETERS):
+            raise ValueError(f"The parameters of a coefficient table must be a (compounds x {MAX_PARAMETERS}) array.")
+
+    def __len__(self):
+        return len(self.names)
+
+    def subset(self, rows):
+        '''The compounds at the given row indices (or slice) as a new table.'''
+        return CoefficientTable(self.names[rows], self.A[rows], self.B[rows], self.C[rows],
+            formulas=self.formulas[rows], t_min=self.t_min[rows], t_max=self.t_max[rows],
+            correlations=self.correlations[rows], parameters=self.parameters[rows])
+
+    @classmethod
+    def from_frame(cls, frame):
+        '''Builds a table from a DataFrame, matching its columns against COLUMN_ALIASES.'''
+        # Exports write °C with the ordinal sign (ºC), so both read back
+        lookup = {str(column).strip().lower().replace('º', '°'): column for column in frame.columns}
+        columns = {}
+        for key, aliases in COLUMN_ALIASES.items():
+            match = next((lookup[alias] for alias in aliases if alias in lookup), None)
+            if match is not None:
+                columns[key] = frame[match].to_numpy()
+
+        correlations = _correlations(columns.get('correlation'), len(frame))
+        parameters = np.full((len(frame), MAX_PARAMETERS), np.nan)
+        for index in range(MAX_PARAMETERS):
+            if f'P{index + 1}' in columns:
+                parameters[:, index] = np.asarray(columns[f'P{index + 1}'], dtype=np.float64)
+
+        # Antoine rows take A, B and C from their own columns when the table has them
+        antoine_rows = correlations == 'antoine'
+        for index, key in enumerate(('A', 'B', 'C')):
+            if key in columns:
+                parameters[antoine_rows, index] = np.asarray(columns[key], dtype=np.float64)[antoine_rows]
+
+        for name in np.unique(correlations):
+            correlation = get_correlation(name)
+            if name == 'antoine':
+                missing = [key for index, key in enumerate(('A', 'B', 'C')) if key not in columns and f'P{index + 1}' not in columns]
+            else:
+                missing = [f'P{index + 1}' for index in range(len(correlation.parameters)) if f'P{index + 1}' not in columns]
+            if missing:
+                raise ValueError(f"The coefficient table is missing the column(s) {', '.join(missing)} for {correlation.label}")
+
+        names = columns.get('name')
+        if names is None:
+            names = [f"Compound {row + 1}" for row in range(len(frame))]
+        formulas = columns.get('formula')
+
+        return cls(
+            names=_text(names),
+            A=np.where(antoine_rows, parameters[:, 0], np.nan),
+            B=np.where(antoine_rows, parameters[:, 1], np.nan),
+            C=np.where(antoine_rows, parameters[:, 2], np.nan),
+            formulas=None if formulas is None else _text(formulas),
+            t_min=_bound(columns.get('t_min'), -np.inf),
+            t_max=_bound(columns.get('t_max'), np.inf),
+            correlations=correlations,
+            parameters=parameters,
+        )
+
+
+def _text(column):
+    # Empty spreadsheet cells come through as None/NaN
+    return ['' if value is None or value != value else str(value) for value in column]
+
+
+def _correlations(column, count):
+    '''Registered names of the correlations in a Correlation column, Antoine where there isn't one.'''
+    if column is None:
+        return np.full(count, 'antoine')
+    labels, inverse = np.unique(_text(column), return_inverse=True)
+    return np.array([get_correlation(label).name for label in labels])[inverse.ravel()]
+
+
+def _bound(column, default):
+    if column is None:
+        return None
+    column = np.asarray(column, dtype=np.float64)
+    return np.where(np.isnan(column), default, column)
+
+
+def read_frame(source):
+    '''
+    Reads an .xlsx or .csv file (path or file-like object) into a DataFrame.
+    Files that can't be parsed (not a spreadsheet, corrupt, malformed CSV)
+    raise ValueError like every other problem with an uploaded table.
+
+    pandas is imported here rather than at module level so the batch engine
+    itself only needs NumPy.
+    '''
+    import zipfile
+
+    import pandas as pd
+
+    name = str(getattr(source, 'name', source)).lower()
+    try:
+        if name.endswith('.csv'):
+            return pd.read_csv(source)
+        return pd.read_excel(source, engine='openpyxl')
+    except (ValueError, KeyError, zipfile.BadZipFile) as error: # pandas' parser errors are ValueErrors, openpyxl raises the others
+        raise ValueError(f"{os.path.basename(name)} is not a readable {'CSV' if name.endswith('.csv') else 'Excel'} file ({error})") from error
+
+
+def read_coefficient_table(source):
+    '''Reads a coefficient table from an .xlsx or .csv file (path or file-like object).'''
+    return CoefficientTable.from_frame(read_frame(source))
+
+
+class BatchResult:
+    '''Pressures (mmHg) of every compound in a table over a shared temperature grid (°C).'''
+
+    def __init__(self, table, temps, pressure, invalid):
+        self.table = table
+        self.temps = temps
+        self.pressure = pressure # shape (compounds, temperatures)
+        self.invalid = invalid
+
+    @property
+    def in_range(self):
+        '''Mask of the points that fall inside each compound's validity range.'''
+        return (self.temps >= self.table.t_min[:, None]) & (self.temps <= self.table.t_max[:, None])
+
+    def columns(self):
+        '''The tidy result as columns (label -> array) with one row per (compound, temperature).'''
+        compounds, points = self.pressure.shape
+        return {
+            'Compound': np.repeat(self.table.names, points),
+            'Formula': np.repeat(self.table.formulas, points),
+            'Temperature (ºC)': np.tile(self.temps, compounds),
+            'Vapour Pressure (mmHg)': self.pressure.ravel(),
+            'In Range': self.in_range.ravel(),
+        }
+
+    def to_frame(self):
+        '''Returns the result as a tidy DataFrame with one row per (compound, temperature).'''
+        import pandas as pd
+
+        return pd.DataFrame(self.columns())
+
+
+def evaluate_batch(table, temps, out=None):
+    '''
+    Evaluates every compound in table over temps (°C) in a single array pass
+    (one per correlation when the table mixes them).
+
+    out, if given, must be a float64 array of shape (len(table), len(temps)).
+    '''
+    temps = np.asarray(temps, dtype=np.float64)
+    pressure, invalid = evaluate_correlations(table.correlations, table.parameters, temps, out=out)
+    return BatchResult(table, temps, pressure, invalid)
+
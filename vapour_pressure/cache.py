@@ -0,0 +1,117 @@
+'''
+Bounded least-recently-used cache for computed results
+
+Streamlit re-runs the whole script on every widget interaction, so results
+are kept here keyed on the numeric inputs that produced them. The cache is
+bounded both by entry count and by an estimate of the memory its values use,
+and it is safe to share between the threads serving different sessions.
+
+'''
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def sizeof(value):
+    '''Rough memory footprint of a cached value in bytes.'''
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray, str)):
+        return sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        # Assume homogeneous items rather than walking very long lists
+        if value and not isinstance(value[0], (np.ndarray, bytes, str, list, tuple)):
+            return sys.getsizeof(value) + len(value) * sys.getsizeof(value[0])
+        return sys.getsizeof(value) + sum(sizeof(item) for item in value)
+    if hasattr(value, 'memory_usage'): # pandas objects
+        return int(np.sum(value.memory_usage(deep=True)))
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    return sys.getsizeof(value)
+
+
+def _freeze(value):
+    # Cached arrays are shared between reruns and sessions, so make them read-only
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, tuple):
+        for item in value:
+            _freeze(item)
+
+
+class LRUCache:
+    '''
+    Keeps at most maxsize values using at most max_bytes between them, dropping
+    the least recently used ones first. hits/misses/evictions count lookups.
+    '''
+
+    def __init__(self, maxsize=128, max_bytes=256 * 2**20):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict() # key -> (value, size)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = sizeof(value)
+        if size > self.max_bytes:
+            return value # Never worth evicting everything else for one value
+
+        _freeze(value)
+
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            while len(self._entries) > self.maxsize or self.nbytes > self.max_bytes:
+                _, (_, dropped) = self._entries.popitem(last=False)
+                self.nbytes -= dropped
+                self.evictions += 1
+        return value
+
+    def get_or_compute(self, key, compute):
+        '''Returns the cached value for key, calling compute() to fill it on a miss.'''
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            # Computed outside the lock so a slow value doesn't block other sessions
+            value = self.put(key, compute())
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.nbytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
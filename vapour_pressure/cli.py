@@ -0,0 +1,250 @@
+'''
+Command line interface, run with python -m vapour_pressure
+
+    python -m vapour_pressure curve -A 8.10765 -B 1750.286 -C 235 --lower 0 --upper 100
+    python -m vapour_pressure curve --correlation dippr101 --parameters 73.649 -7258.2 -7.3037 4.1653e-6 2 --lower 0 --upper 100
+    python -m vapour_pressure batch Examples/Antoine_Coefficients.xlsx --lower 0 --upper 100 -f parquet -o out.parquet
+    python -m vapour_pressure boiling 1 2 5 -p atm --table Examples/Antoine_Coefficients.xlsx
+    python -m vapour_pressure fit Examples/Vapour_Pressure_Data.xlsx -o fitted.xlsx
+    python -m vapour_pressure serve --port 8000
+    python -m vapour_pressure report Examples/Antoine_Coefficients.xlsx -o report.html
+
+Results go to stdout unless -o is given. Only NumPy is imported up front;
+pandas/openpyxl are loaded when reading a spreadsheet that isn't cached yet,
+and pyarrow only for Parquet output.
+
+'''
+import argparse
+import contextlib
+import os
+import sys
+
+from .units import PRESSURE_UNITS, TEMPERATURE_UNITS
+
+
+def _add_grid_arguments(parser):
+    parser.add_argument('--lower', type=float, required=True, help="lower temperature bound (°C)")
+    parser.add_argument('--upper', type=float, required=True, help="upper temperature bound (°C)")
+    parser.add_argument('--step', type=float, default=1.0, help="temperature step (°C, default 1)")
+
+
+def _add_output_arguments(parser, units=True):
+    if units:
+        parser.add_argument('-p', '--pressure-unit', default='mmHg', choices=tuple(PRESSURE_UNITS))
+        parser.add_argument('-t', '--temperature-unit', default='°C', choices=tuple(TEMPERATURE_UNITS))
+    parser.add_argument('-f', '--format', default=None, help="csv, npz, parquet or xlsx (default: from the output file's extension, else csv)")
+    parser.add_argument('-o', '--output', default='-', help="output file (default: stdout)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m vapour_pressure', description="Vapour pressures from Antoine's equation.")
+    parser.add_argument('--timings', action='store_true', help="print the time and memory used by each stage to stderr")
+    parser.add_argument('--metrics', help="also append the stage timings to this JSON lines (or .prom Prometheus) file")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    curve = commands.add_parser('curve', help="evaluate one set of coefficients over a temperature range")
+    curve.add_argument('-A', type=float)
+    curve.add_argument('-B', type=float)
+    curve.add_argument('-C', type=float)
+    curve.add_argument('--correlation', help="another correlation instead of Antoine: extended_antoine, dippr101 or wagner")
+    curve.add_argument('--parameters', type=float, nargs='+', help="the parameters of --correlation, in order")
+    _add_grid_arguments(curve)
+    curve.add_argument('--rtol', type=float, default=None, help="sample adaptively to this relative interpolation error instead of using --step")
+    curve.add_argument('--max-points', type=int, default=2000, help="point budget for adaptive sampling (default 2000)")
+    curve.add_argument('--decimals', type=int, default=4, help="round pressures to this many decimals (default 4, -1 to keep full precision)")
+    _add_output_arguments(curve)
+
+    batch = commands.add_parser('batch', help="evaluate every compound of a coefficient table (.xlsx/.csv)")
+    batch.add_argument('table')
+    _add_grid_arguments(batch)
+    batch.add_argument('--processes', type=int, default=None, help="evaluate in chunks on this many processes, streaming them to the output")
+    batch.add_argument('--chunk-rows', type=int, default=None, help="compounds per chunk with --processes")
+    batch.add_argument('--grid-file', default=None, help="with --processes, also keep the (compounds x temperatures) pressures in this .npy file")
+    _add_output_arguments(batch, units=False)
+
+    boiling = commands.add_parser('boiling', help="saturation temperatures at given pressures (inverse of Antoine's equation)")
+    boiling.add_argument('pressures', type=float, nargs='+')
+    boiling.add_argument('-A', type=float)
+    boiling.add_argument('-B', type=float)
+    boiling.add_argument('-C', type=float)
+    boiling.add_argument('--table', help="coefficient table (.xlsx/.csv) to solve every compound of, instead of -A/-B/-C")
+    _add_output_arguments(boiling)
+
+    fit = commands.add_parser('fit', help="fit A, B and C to measured temperatures and pressures (.xlsx/.csv)")
+    fit.add_argument('measurements', help="temperature and pressure columns (units in the headers), optionally a Compound column")
+    fit.add_argument('--processes', type=int, default=None, help="fit in this many processes when there are many compounds")
+    _add_output_arguments(fit, units=False)
+
+    serve = commands.add_parser('serve', help="run the local HTTP service (see vapour_pressure/service.py)")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8000)
+    serve.add_argument('--batch-window', type=float, default=0.0,
+        help="seconds to collect requests into one evaluation (default 0: everything that arrives in the same event loop tick)")
+
+    report = commands.add_parser('report', help="render a chart of every compound of a coefficient table into one HTML file")
+    report.add_argument('table')
+    report.add_argument('--lower', type=float, default=None, help="lower temperature bound (°C) for compounds without T Min")
+    report.add_argument('--upper', type=float, default=None, help="upper temperature bound (°C) for compounds without T Max")
+    report.add_argument('--points', type=int, default=200, help="points per chart (default 200)")
+    report.add_argument('--title', default="Vapour Pressure Report")
+    report.add_argument('--images', default=None, help="also save a PNG of every chart into this directory (needs selenium)")
+    report.add_argument('--inline', action='store_true', help="embed BokehJS in the file instead of loading it from the CDN")
+    report.add_argument('--processes', type=int, default=None, help="worker processes (default: every CPU)")
+    report.add_argument('-p', '--pressure-unit', default='mmHg', choices=tuple(PRESSURE_UNITS))
+    report.add_argument('-t', '--temperature-unit', default='°C', choices=tuple(TEMPERATURE_UNITS))
+    report.add_argument('-o', '--output', required=True, help="HTML file to write")
+
+    return parser
+
+
+def _output_format(args):
+    if args.format:
+        return args.format
+    extension = os.path.splitext(args.output)[1].lstrip('.').lower()
+    return extension if args.output != '-' and extension else 'csv'
+
+
+@contextlib.contextmanager
+def _open_output(path):
+    if path == '-':
+        yield sys.stdout.buffer
+        sys.stdout.buffer.flush()
+    else:
+        with open(path, 'wb') as stream:
+            yield stream
+
+
+def run_curve(args):
+    from .pipeline import compute_adaptive_curve, compute_correlation_curve, compute_curve, convert_curve, table_columns
+
+    decimals = None if args.decimals < 0 else args.decimals
+    if args.correlation is not None:
+        if not args.parameters:
+            raise ValueError("--correlation needs its --parameters")
+        curve = compute_correlation_curve(args.correlation, args.parameters, args.lower, args.upper, args.step,
+            decimals=decimals, rtol=args.rtol, max_points=args.max_points)
+    elif None in (args.A, args.B, args.C):
+        raise ValueError("give either -A, -B and -C or --correlation and --parameters")
+    elif args.rtol is not None:
+        curve = compute_adaptive_curve(args.A, args.B, args.C, args.lower, args.upper,
+            rtol=args.rtol, max_points=args.max_points, decimals=decimals)
+    else:
+        curve = compute_curve(args.A, args.B, args.C, args.lower, args.upper, args.step, decimals=decimals)
+    temps, pressure = convert_curve(curve, args.pressure_unit, args.temperature_unit)
+    return table_columns(temps, pressure, args.pressure_unit, args.temperature_unit)
+
+
+def run_batch(args):
+    from .batch import evaluate_batch
+    from .database import CompoundDatabase
+    from .engine import temperature_grid
+
+    database = CompoundDatabase.load(args.table)
+    temps = temperature_grid(args.lower, args.upper, args.step)
+    if args.processes:
+        from .parallel import iter_batch_columns
+
+        # Evaluated lazily while the export writes the chunks out
+        return iter_batch_columns(database.table, temps, processes=args.processes, chunk_rows=args.chunk_rows, path=args.grid_file)
+    return evaluate_batch(database.table, temps).columns()
+
+
+def run_boiling(args):
+    import numpy as np
+
+    from .pipeline import saturation_temperature
+
+    if args.table:
+        from .database import CompoundDatabase
+
+        table = CompoundDatabase.load(args.table).table
+        names, formulas = table.names, table.formulas
+        A, B, C = table.A[:, None], table.B[:, None], table.C[:, None]
+    elif None in (args.A, args.B, args.C):
+        raise ValueError("give either -A, -B and -C or --table")
+    else:
+        names, formulas = np.array(['']), np.array([''])
+        A, B, C = args.A, args.B, args.C
+
+    pressure = np.asarray(args.pressures, dtype=np.float64)
+    temps, _ = saturation_temperature(pressure, A, B, C, args.pressure_unit, args.temperature_unit)
+    temps = np.broadcast_to(temps, (len(names), len(pressure)))
+
+    columns = {}
+    if args.table:
+        columns['Compound'] = np.repeat(names, len(pressure))
+        columns['Formula'] = np.repeat(formulas, len(pressure))
+    columns[f"Pressure ({args.pressure_unit})"] = np.tile(pressure, len(names))
+    columns[f"Boiling Temperature ({args.temperature_unit})".replace('°', 'º')] = temps.ravel()
+    return columns
+
+
+def run_fit(args):
+    from .fitting import fit_many, read_measurements
+
+    datasets = read_measurements(args.measurements)
+    result = fit_many([(temps, pressure) for _, temps, pressure in datasets], processes=args.processes)
+    return result.columns([name for name, _, _ in datasets])
+
+
+def run_serve(args):
+    from .service import serve
+
+    return serve(args.host, args.port, args.batch_window)
+
+
+def run_report(args):
+    from .database import CompoundDatabase
+    from .report import render_report
+
+    table = CompoundDatabase.load(args.table).table
+    with open(args.output, 'w', encoding='utf-8') as stream:
+        stats = render_report(table, stream, lower=args.lower, upper=args.upper, points=args.points,
+            pressure_unit=args.pressure_unit, temperature_unit=args.temperature_unit, title=args.title,
+            processes=args.processes, images_dir=args.images, inline=args.inline)
+    print(f"{stats['charts']} charts in {stats['seconds']:.2f} s ({stats['charts_per_second']:.1f} charts/s)", file=sys.stderr)
+    return 0
+
+
+# Commands that write their own output (or none) instead of returning columns to export
+STANDALONE_COMMANDS = {
+    'serve': run_serve,
+    'report': run_report,
+}
+
+COMMANDS = {
+    'curve': run_curve,
+    'batch': run_batch,
+    'boiling': run_boiling,
+    'fit': run_fit,
+}
+
+
+def main(argv=None):
+    from .export import export
+    from .instrument import METRICS, Timings
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command in STANDALONE_COMMANDS:
+        try:
+            return STANDALONE_COMMANDS[args.command](args)
+        except (ValueError, ImportError, OSError) as error:
+            parser.exit(1, f"error: {error}\n")
+
+    timings = Timings(trace_memory=args.timings)
+    try:
+        with timings.stage(args.command):
+            columns = COMMANDS[args.command](args)
+        with timings.stage('export'), _open_output(args.output) as stream:
+            export(_output_format(args), columns, stream)
+        if args.metrics:
+            METRICS.add(timings)
+            METRICS.write(args.metrics, timings)
+    except (ValueError, ImportError, OSError) as error:
+        parser.exit(1, f"error: {error}\n")
+
+    if args.timings:
+        for record in timings.records:
+            print(f"{record.stage:<10} {record.seconds * 1000:10.2f} ms {record.peak_bytes / 2**20:10.2f} MB peak", file=sys.stderr)
+    return 0
@@ -0,0 +1,243 @@
+'''
+Vapour pressure correlations beyond Antoine's equation
+
+Each correlation is a vectorized kernel pressure(temps, *parameters, out=None)
+-> (pressure, invalid), with temps in °C and pressure in mmHg like the engine,
+plus its analytic derivative dP/dT and the range it is valid over. Points
+outside that range (e.g. above the critical temperature for Wagner) are
+invalid. Registered correlations:
+
+    antoine           log10 P[mmHg] = A - B/(T[°C] + C)
+    extended_antoine  ln P[Pa] = C1 + C2/(T + C3) + C4 T + C5 ln T + C6 T^C7   (T in K, Aspen PLXANT)
+    dippr101          ln P[Pa] = A + B/T + C ln T + D T^E                      (T in K)
+    wagner            ln(P/Pc) = (a t + b t^1.5 + c t^2.5 + d t^5) / Tr,
+                      Tr = T/Tc, t = 1 - Tr                                    (T, Tc in K, Pc in Pa)
+
+A coefficient table stores the correlation of every compound and its
+parameters in one (compounds x MAX_PARAMETERS) array; evaluate_correlations
+evaluates such a table with one array pass per correlation present instead of
+one call per compound.
+
+New correlations are added with register_correlation.
+
+'''
+import numpy as np
+
+from .engine import LN10, LOG10_MAX, antoine, antoine_derivative
+from .units import PASCALS_PER_MMHG
+
+KELVIN = 273.15
+MAX_PARAMETERS = 7
+
+LN_MAX = LOG10_MAX * LN10
+LN_PASCALS_PER_MMHG = np.log(PASCALS_PER_MMHG)
+
+CORRELATIONS = {}
+
+
+class Correlation:
+    def __init__(self, name, label, parameters, equation, pressure, derivative, domain):
+        self.name = name
+        self.label = label
+        self.parameters = parameters # names, in the order the kernels take them
+        self.equation = equation
+        self.pressure = pressure
+        self.derivative = derivative
+        self.domain = domain # description of where the kernel is valid
+
+
+def register_correlation(name, label, parameters, equation, derivative, domain):
+    '''Registers pressure(temps, *parameters, out=None) -> (pressure, invalid) as a correlation.'''
+    def register(pressure):
+        CORRELATIONS[name] = Correlation(name, label, tuple(parameters), equation, pressure, derivative, domain)
+        return pressure
+    return register
+
+
+def _normalise(name):
+    return ''.join(character for character in str(name).lower() if character.isalnum())
+
+
+def get_correlation(name):
+    '''Looks a correlation up by name or label, ignoring case, spaces and punctuation ("DIPPR 101" -> dippr101).'''
+    wanted = _normalise(name) or 'antoine' # empty spreadsheet cells mean Antoine
+    for correlation in CORRELATIONS.values():
+        if wanted in (_normalise(correlation.name), _normalise(correlation.label)):
+            return correlation
+    raise ValueError(f"Unknown correlation {name!r}, expected one of: {', '.join(CORRELATIONS)}")
+
+
+def _from_log(log_pressure, invalid, out):
+    '''mmHg from ln(P[Pa]) computed into out, flagging overflow and NaN.'''
+    np.subtract(log_pressure, LN_PASCALS_PER_MMHG, out=log_pressure)
+    invalid |= ~np.isfinite(log_pressure)
+    invalid |= log_pressure > LN_MAX
+    np.exp(log_pressure, out=log_pressure)
+    log_pressure[invalid] = np.nan
+    return log_pressure, invalid
+
+
+def _output(out, *arrays):
+    shape = np.broadcast_shapes(*(np.shape(array) for array in arrays))
+    if out is None:
+        return np.empty(shape, dtype=np.float64)
+    if out.shape != shape:
+        raise ValueError(f"out has shape {out.shape}, expected {shape}")
+    return out
+
+
+def _kelvin(temps):
+    return np.asarray(temps, dtype=np.float64) + KELVIN
+
+#### Antoine ####
+
+register_correlation('antoine', "Antoine", ('A', 'B', 'C'),
+    "log10 P[mmHg] = A - B/(T[°C] + C)",
+    derivative=antoine_derivative,
+    domain="T > -C",
+)(antoine)
+
+#### Extended Antoine (Aspen PLXANT) ####
+
+def _extended_antoine_slope(T, C1, C2, C3, C4, C5, C6, C7):
+    return -C2 / (T + C3)**2 + C4 + C5 / T + C6 * C7 * T**(C7 - 1)
+
+
+def extended_antoine_derivative(temps, C1, C2, C3, C4, C5, C6, C7):
+    '''dP/dT (mmHg/K) of the extended Antoine equation, returns (slope, invalid).'''
+    pressure, invalid = extended_antoine(temps, C1, C2, C3, C4, C5, C6, C7)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        slope = pressure * _extended_antoine_slope(_kelvin(temps), C1, C2, C3, C4, C5, C6, C7)
+    invalid |= ~np.isfinite(slope)
+    slope[invalid] = np.nan
+    return slope, invalid
+
+
+@register_correlation('extended_antoine', "Extended Antoine", ('C1', 'C2', 'C3', 'C4', 'C5', 'C6', 'C7'),
+    "ln P[Pa] = C1 + C2/(T + C3) + C4 T + C5 ln T + C6 T^C7 (T in K)",
+    derivative=extended_antoine_derivative,
+    domain="T > 0 K and T ≠ -C3",
+)
+def extended_antoine(temps, C1, C2, C3, C4, C5, C6, C7, out=None):
+    '''Vapour pressure (mmHg) at temps (°C) from the extended Antoine equation, returns (pressure, invalid).'''
+    T = _kelvin(temps)
+    out = _output(out, T, C1, C2, C3, C4, C5, C6, C7)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        out[...] = C1 + C2 / (T + C3) + C4 * T + C5 * np.log(T) + C6 * T**C7
+        invalid = np.broadcast_to(~(T > 0), out.shape).copy()
+        return _from_log(out, invalid, out)
+
+#### DIPPR 101 ####
+
+def dippr101_derivative(temps, A, B, C, D, E):
+    '''dP/dT (mmHg/K) of DIPPR equation 101, returns (slope, invalid).'''
+    pressure, invalid = dippr101(temps, A, B, C, D, E)
+    T = _kelvin(temps)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        slope = pressure * (-B / T**2 + C / T + D * E * T**(E - 1))
+    invalid |= ~np.isfinite(slope)
+    slope[invalid] = np.nan
+    return slope, invalid
+
+
+@register_correlation('dippr101', "DIPPR 101", ('A', 'B', 'C', 'D', 'E'),
+    "ln P[Pa] = A + B/T + C ln T + D T^E (T in K)",
+    derivative=dippr101_derivative,
+    domain="T > 0 K",
+)
+def dippr101(temps, A, B, C, D, E, out=None):
+    '''Vapour pressure (mmHg) at temps (°C) from DIPPR equation 101, returns (pressure, invalid).'''
+    T = _kelvin(temps)
+    out = _output(out, T, A, B, C, D, E)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        out[...] = A + B / T + C * np.log(T) + D * T**E
+        invalid = np.broadcast_to(~(T > 0), out.shape).copy()
+        return _from_log(out, invalid, out)
+
+#### Wagner (2.5, 5 form) ####
+
+def _wagner_terms(T, Tc, a, b, c, d):
+    reduced = T / Tc
+    tau = 1 - reduced
+    root = np.sqrt(tau)
+    series = tau * (a + root * (b + c * tau)) + d * tau**5
+    return reduced, tau, root, series
+
+
+def wagner_derivative(temps, Tc, Pc, a, b, c, d):
+    '''dP/dT (mmHg/K) of the Wagner equation, returns (slope, invalid).'''
+    pressure, invalid = wagner(temps, Tc, Pc, a, b, c, d)
+    T = _kelvin(temps)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        reduced, tau, root, series = _wagner_terms(T, Tc, a, b, c, d)
+        series_slope = a + 1.5 * b * root + 2.5 * c * tau * root + 5 * d * tau**4
+        slope = pressure * -(series_slope * reduced + series) / (Tc * reduced**2)
+    invalid |= ~np.isfinite(slope)
+    slope[invalid] = np.nan
+    return slope, invalid
+
+
+@register_correlation('wagner', "Wagner", ('Tc', 'Pc', 'a', 'b', 'c', 'd'),
+    "ln(P/Pc) = (a t + b t^1.5 + c t^2.5 + d t^5)/Tr, Tr = T/Tc, t = 1 - Tr (T, Tc in K, Pc in Pa)",
+    derivative=wagner_derivative,
+    domain="0 K < T ≤ Tc",
+)
+def wagner(temps, Tc, Pc, a, b, c, d, out=None):
+    '''Vapour pressure (mmHg) at temps (°C) from the Wagner equation, returns (pressure, invalid).'''
+    T = _kelvin(temps)
+    out = _output(out, T, Tc, Pc, a, b, c, d)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        reduced, tau, _, series = _wagner_terms(T, Tc, a, b, c, d)
+        out[...] = np.log(Pc) + series / reduced
+        invalid = np.broadcast_to(~((T > 0) & (tau >= 0)), out.shape).copy()
+        return _from_log(out, invalid, out)
+
+#### Tables of mixed correlations ####
+
+def parameter_columns(correlation, parameters):
+    '''The columns of an (n x MAX_PARAMETERS) parameter array that correlation takes, shaped (n, 1).'''
+    return [parameters[:, index, None] for index in range(len(correlation.parameters))]
+
+
+def evaluate_correlations(kinds, parameters, temps, out=None):
+    '''
+    Pressures (mmHg) of compounds with correlations kinds (names, one per
+    compound) and parameters ((compounds x MAX_PARAMETERS)) over temps (°C).
+    Compounds are grouped by correlation and each group is one array pass.
+
+    Returns (pressure, invalid) of shape (compounds, temperatures).
+    '''
+    kinds = np.asarray(kinds)
+    parameters = np.asarray(parameters, dtype=np.float64)
+    temps = np.asarray(temps, dtype=np.float64)[None, :]
+    shape = (len(kinds), temps.shape[1])
+    if out is None:
+        out = np.empty(shape, dtype=np.float64)
+    elif out.shape != shape:
+        raise ValueError(f"out has shape {out.shape}, expected {shape}")
+
+    groups = np.unique(kinds)
+    if len(groups) == 1: # the usual case, no gathering or scattering
+        correlation = get_correlation(groups[0])
+        return correlation.pressure(temps, *parameter_columns(correlation, parameters), out=out)
+
+    invalid = np.empty(shape, dtype=bool)
+    for kind in groups:
+        correlation = get_correlation(kind)
+        rows = np.flatnonzero(kinds == kind)
+        out[rows], invalid[rows] = correlation.pressure(temps, *parameter_columns(correlation, parameters[rows]))
+    return out, invalid
+
+
+def evaluate_derivatives(kinds, parameters, temps):
+    '''dP/dT (mmHg/K) for the same inputs as evaluate_correlations, returns (slope, invalid).'''
+    kinds = np.asarray(kinds)
+    parameters = np.asarray(parameters, dtype=np.float64)
+    temps = np.asarray(temps, dtype=np.float64)[None, :]
+    slope = np.empty((len(kinds), temps.shape[1]))
+    invalid = np.empty(slope.shape, dtype=bool)
+    for kind in np.unique(kinds):
+        correlation = get_correlation(kind)
+        rows = np.flatnonzero(kinds == kind)
+        slope[rows], invalid[rows] = correlation.derivative(temps, *parameter_columns(correlation, parameters[rows]))
+    return slope, invalid
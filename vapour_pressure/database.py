@@ -0,0 +1,240 @@
+'''
+Compound database backed by an on-disk columnar cache
+
+Parsing a spreadsheet through openpyxl is slow, so a coefficient table is only
+parsed the first time it is seen. Its columns are then written as one .npy file
+each (plus sorted name/formula indexes) into a cache directory keyed by the
+source file's hash and modification time. Later loads memory-map those files,
+which takes milliseconds regardless of the table size.
+
+Interpolation tables (see tables.py) built from a cached database are stored
+in the same cache entry, so they are only built once per table and settings.
+
+The cache lives in $VAPOUR_PRESSURE_CACHE, or ~/.cache/vapour_pressure when
+that isn't set.
+
+'''
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from .batch import CoefficientTable, read_coefficient_table
+
+CACHE_VERSION = 3
+
+COLUMNS = ('names', 'formulas', 'A', 'B', 'C', 't_min', 't_max', 'correlations', 'parameters')
+
+
+def default_cache_dir():
+    return os.environ.get('VAPOUR_PRESSURE_CACHE') or os.path.join(os.path.expanduser('~'), '.cache', 'vapour_pressure')
+
+
+class CompoundDatabase:
+    '''
+    Vapour pressure coefficients of a set of compounds with indexed lookups.
+
+    Compound names (case-insensitively) and formulas (case-sensitively, CO is
+    not Co) are matched through sorted key arrays (binary search), so no
+    DataFrame is ever scanned.
+    '''
+
+    def __init__(self, columns, name_keys, name_order, formula_keys, formula_order, source=None):
+        self.columns = columns
+        self.source = source
+        self.cache_entry = None # directory of the on-disk cache entry, if any
+        self.content_hash = None # sha256 of the source file's contents when loaded from one
+        self._name_keys = name_keys
+        self._name_order = name_order
+        self._formula_keys = formula_keys
+        self._formula_order = formula_order
+
+    def __len__(self):
+        return len(self.columns['names'])
+
+    def __contains__(self, name):
+        found = self._search(self._name_keys, _key(name))
+        return found.stop > found.start
+
+    @property
+    def table(self):
+        '''All compounds as a CoefficientTable (views on the memory-mapped columns).'''
+        return self.subset(slice(None))
+
+    def subset(self, rows):
+        '''The compounds at the given row indices (or slice) as a CoefficientTable.'''
+        return CoefficientTable(**{column: self.columns[column][rows] for column in COLUMNS})
+
+    def find(self, name):
+        '''Row index of the compound called name, raises KeyError if there isn't one.'''
+        found = self._search(self._name_keys, _key(name))
+        if found.stop == found.start:
+            raise KeyError(name)
+        return int(self._name_order[found.start])
+
+    def find_formula(self, formula):
+        '''Row indices of every compound with the given formula (possibly empty).'''
+        found = self._search(self._formula_keys, _formula_key(formula))
+        return np.sort(self._formula_order[found])
+
+    def coefficients(self, name):
+        '''(A, B, C) of the compound called name.'''
+        row = self.find(name)
+        return tuple(float(self.columns[column][row]) for column in ('A', 'B', 'C'))
+
+    @staticmethod
+    def _search(keys, value):
+        return slice(
+            int(np.searchsorted(keys, value, side='left')),
+            int(np.searchsorted(keys, value, side='right')),
+        )
+
+    def interpolation_tables(self, rtol=1e-6, degree=3, lower=None, upper=None):
+        '''
+        InterpolationTables of every compound (see tables.py), read from the
+        cache entry when they were built before with the same settings.
+        lower/upper (°C) are the range of compounds without T Min/T Max.
+        '''
+        from .tables import InterpolationTables
+
+        if self.cache_entry is None:
+            return InterpolationTables.build(self.table, rtol=rtol, degree=degree, lower=lower, upper=upper)
+
+        directory = os.path.join(self.cache_entry, f"tables-{rtol:g}-{degree}-{lower}-{upper}")
+        try:
+            return InterpolationTables.load(directory)
+        except (OSError, ValueError, KeyError):
+            pass
+
+        tables = InterpolationTables.build(self.table, rtol=rtol, degree=degree, lower=lower, upper=upper)
+        try:
+            staging = tempfile.mkdtemp(dir=self.cache_entry, prefix='.building-')
+        except OSError:
+            return tables # read-only cache
+        try:
+            tables.save(staging)
+            os.replace(staging, directory)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True) # another process got there first
+        return tables
+
+    #### Building and caching ####
+
+    @classmethod
+    def from_table(cls, table, source=None):
+        '''Builds an in-memory database (and its indexes) from a CoefficientTable.'''
+        columns = {column: np.asarray(getattr(table, column)) for column in COLUMNS}
+        name_keys, name_order = _index(columns['names'], _key)
+        formula_keys, formula_order = _index(columns['formulas'], _formula_key)
+        return cls(columns, name_keys, name_order, formula_keys, formula_order, source=source)
+
+    @classmethod
+    def load(cls, source, cache_dir=None):
+        '''
+        Loads a coefficient spreadsheet (.xlsx/.csv path or file-like object),
+        going through the on-disk cache.
+        '''
+        cache_dir = cache_dir or default_cache_dir()
+
+        if hasattr(source, 'read'):
+            data = source.read()
+            name = getattr(source, 'name', 'upload')
+            mtime_ns = 0
+            origin = name
+        else:
+            with open(source, 'rb') as file:
+                data = file.read()
+            name = os.path.basename(source)
+            mtime_ns = os.stat(source).st_mtime_ns
+            origin = os.path.abspath(source)
+
+        origin_hash = hashlib.sha256(origin.encode('utf-8')).hexdigest()[:12]
+        content_hash = hashlib.sha256(data).hexdigest()
+        entry = os.path.join(cache_dir, f"{origin_hash}-{content_hash[:16]}-{mtime_ns}")
+
+        database = cls._read_cache(entry, content_hash)
+        if database is None:
+            buffer = io.BytesIO(data)
+            buffer.name = name
+            database = cls.from_table(read_coefficient_table(buffer), source=origin)
+            database._write_cache(entry, content_hash, origin_hash, mtime_ns)
+        if os.path.isdir(entry):
+            database.cache_entry = entry
+        database.content_hash = content_hash
+        return database
+
+    @classmethod
+    def _read_cache(cls, entry, content_hash):
+        try:
+            with open(os.path.join(entry, 'meta.json')) as file:
+                meta = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if meta.get('version') != CACHE_VERSION or meta.get('sha256') != content_hash:
+            return None
+
+        def mapped(name):
+            return np.load(os.path.join(entry, f"{name}.npy"), mmap_mode='r')
+
+        try:
+            columns = {column: mapped(column) for column in COLUMNS}
+            return cls(
+                columns,
+                mapped('name_keys'), mapped('name_order'),
+                mapped('formula_keys'), mapped('formula_order'),
+                source=meta.get('source'),
+            )
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, entry, content_hash, origin_hash, mtime_ns):
+        cache_dir = os.path.dirname(entry)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            staging = tempfile.mkdtemp(dir=cache_dir, prefix='.building-')
+        except OSError:
+            return # A read-only cache directory only costs speed, not correctness
+
+        try:
+            arrays = dict(self.columns)
+            arrays.update(
+                name_keys=self._name_keys, name_order=self._name_order,
+                formula_keys=self._formula_keys, formula_order=self._formula_order,
+            )
+            for name, array in arrays.items():
+                np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(array))
+            with open(os.path.join(staging, 'meta.json'), 'w') as file:
+                json.dump({
+                    'version': CACHE_VERSION,
+                    'source': self.source,
+                    'sha256': content_hash,
+                    'mtime_ns': mtime_ns,
+                    'compounds': len(self),
+                }, file)
+
+            # Drop older entries for the same source file before publishing the new one
+            for old in os.listdir(cache_dir):
+                if old.startswith(f"{origin_hash}-"):
+                    shutil.rmtree(os.path.join(cache_dir, old), ignore_errors=True)
+            os.replace(staging, entry)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+
+
+def _key(value):
+    return str(value).strip().lower()
+
+
+def _formula_key(value):
+    # Element symbols are case-sensitive: CO is carbon monoxide, Co cobalt
+    return str(value).strip()
+
+
+def _index(values, key):
+    keys = np.array([key(value) for value in values], dtype=str)
+    order = np.argsort(keys, kind='stable')
+    return keys[order], order
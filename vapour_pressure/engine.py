@@ -0,0 +1,128 @@
+'''
+Vectorized evaluation of Antoine's equation
+
+    log10(P) = A - B / (T + C)
+
+with P in mmHg and T in °C (the units the app takes its coefficients in),
+and of its derivative dP/dT and its inverse T(P). Temperatures (or pressures) and coefficients can be
+any NumPy-broadcastable arrays, so one call covers a single curve, many
+compounds over a shared grid, or anything in between.
+
+'''
+import numpy as np
+
+LN10 = np.log(10.0)
+
+# Largest log10(P) that still fits in a float64, anything above overflows
+LOG10_MAX = np.log10(np.finfo(np.float64).max)
+
+
+def temperature_grid(lower, upper, step=1.0):
+    '''
+    Evenly spaced temperatures from lower to upper (inclusive) in steps of step.
+
+    Unlike np.arange the end point is kept when it lands on the grid, and the
+    values are computed as lower + i*step so they don't drift on fine steps.
+    '''
+    if step <= 0:
+        raise ValueError("The temperature step must be greater than zero.")
+    if upper < lower:
+        return np.empty(0)
+    count = int(np.floor((upper - lower) / step + 1e-9)) + 1
+    return lower + step * np.arange(count, dtype=np.float64)
+
+
+def antoine(temps, A, B, C, out=None):
+    '''
+    Vapour pressure (mmHg) for temperatures temps (°C) from Antoine's equation.
+
+    The equation is evaluated in log-space in a single pass over the broadcast
+    shape of (temps, A, B, C). When out is given the result is written into it
+    and no new pressure array is allocated, which keeps repeated calls on the
+    same grid cheap.
+
+    Returns (pressure, invalid), where invalid is a boolean mask of the points
+    that could not be evaluated (T <= -C, outside the equation's domain, or a
+    pressure too large for a float). Those points are set to NaN in pressure.
+    '''
+    temps = np.asarray(temps, dtype=np.float64)
+    A = np.asarray(A, dtype=np.float64)
+    B = np.asarray(B, dtype=np.float64)
+    C = np.asarray(C, dtype=np.float64)
+
+    shape = np.broadcast_shapes(temps.shape, A.shape, B.shape, C.shape)
+    if out is None:
+        out = np.empty(shape, dtype=np.float64)
+    elif out.shape != shape:
+        raise ValueError(f"out has shape {out.shape}, expected {shape}")
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        np.add(temps, C, out=out)
+        invalid = ~(out > 0) # T <= -C, also catches NaN
+        np.divide(B, out, out=out)
+        np.subtract(A, out, out=out) # out now holds log10(P)
+
+        invalid |= ~np.isfinite(out)
+        invalid |= out > LOG10_MAX
+
+        np.multiply(out, LN10, out=out)
+        np.exp(out, out=out)
+
+    out[invalid] = np.nan
+    return out, invalid
+
+
+def antoine_derivative(temps, A, B, C, out=None):
+    '''
+    Slope of the vapour pressure curve dP/dT (mmHg/°C) at temps (°C):
+
+        dP/dT = P * ln(10) * B / (T + C)**2
+
+    Works like antoine() and returns (slope, invalid).
+    '''
+    temps = np.asarray(temps, dtype=np.float64)
+    pressure, invalid = antoine(temps, A, B, C, out=out)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        shifted = temps + np.asarray(C, dtype=np.float64)
+        np.multiply(pressure, LN10 * np.asarray(B, dtype=np.float64) / (shifted * shifted), out=pressure)
+        invalid |= ~np.isfinite(pressure)
+    pressure[invalid] = np.nan
+    return pressure, invalid
+
+
+def antoine_temperature(pressure, A, B, C, out=None):
+    '''
+    Saturation temperature (°C) at pressure (mmHg), the closed-form inverse of
+    Antoine's equation:
+
+        T = B / (A - log10(P)) - C
+
+    Works like antoine(): inputs broadcast, out is an optional buffer, and the
+    result is (temperature, invalid). Points are invalid when P <= 0 or
+    P >= 10**A, where the equation has no solution on the physical branch
+    (T > -C).
+    '''
+    pressure = np.asarray(pressure, dtype=np.float64)
+    A = np.asarray(A, dtype=np.float64)
+    B = np.asarray(B, dtype=np.float64)
+    C = np.asarray(C, dtype=np.float64)
+
+    shape = np.broadcast_shapes(pressure.shape, A.shape, B.shape, C.shape)
+    if out is None:
+        out = np.empty(shape, dtype=np.float64)
+    elif out.shape != shape:
+        raise ValueError(f"out has shape {out.shape}, expected {shape}")
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        np.log10(pressure, out=out)
+        invalid = ~np.isfinite(out) # P <= 0
+
+        np.subtract(A, out, out=out)
+        invalid |= ~(out > 0) # also catches NaN
+
+        np.divide(B, out, out=out)
+        np.subtract(out, C, out=out)
+        invalid |= ~np.isfinite(out)
+
+    out[invalid] = np.nan
+    return out, invalid
@@ -0,0 +1,194 @@
+'''
+Exporters for tables of computed values
+
+A table is a dict of column label -> 1-D NumPy array (all the same length),
+e.g. {'Temperature (ºC)': temps, 'Vapour Pressure (mmHg)': pressure}. Every
+exporter writes straight from those arrays into a binary stream; only the
+.xlsx exporter goes through pandas, since openpyxl needs it anyway.
+
+A table can also be given as an iterable of such dicts, chunks of one larger
+table (e.g. from parallel.iter_batch_columns). Exporters registered with
+streaming=True (csv, parquet) write the chunks as they arrive; for the others
+the chunks are joined into one table first.
+
+New formats are added with the register_exporter decorator.
+
+'''
+import io
+import re
+
+import numpy as np
+
+EXCEL_MAX_ROWS = 1048576
+
+EXPORTERS = {}
+
+
+class Exporter:
+    def __init__(self, name, extension, mime, write, streaming=False):
+        self.name = name
+        self.extension = extension
+        self.mime = mime
+        self.write = write
+        self.streaming = streaming
+
+
+def register_exporter(name, extension, mime, streaming=False):
+    '''
+    Registers write(columns, stream, **options) as the exporter for a format.
+    With streaming=True write also accepts an iterable of column chunks.
+    '''
+    def register(write):
+        EXPORTERS[name] = Exporter(name, extension, mime, write, streaming)
+        return write
+    return register
+
+
+def export(fmt, columns, stream, **options):
+    '''Writes columns to a binary stream in the given format.'''
+    try:
+        exporter = EXPORTERS[fmt]
+    except KeyError:
+        raise ValueError(f"Unknown export format {fmt!r}, expected one of: {', '.join(EXPORTERS)}") from None
+    if hasattr(columns, 'items'):
+        columns = _check_columns(columns)
+    elif not exporter.streaming:
+        columns = _concatenate(columns)
+    exporter.write(columns, stream, **options)
+
+
+def export_bytes(fmt, columns, **options):
+    '''Same as export() but returns the file contents.'''
+    stream = io.BytesIO()
+    export(fmt, columns, stream, **options)
+    return stream.getvalue()
+
+
+def _check_columns(columns):
+    columns = {label: np.asarray(values) for label, values in columns.items()}
+    lengths = {len(values) for values in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError("All exported columns must have the same length.")
+    return columns
+
+
+def _concatenate(chunks):
+    chunks = [_check_columns(chunk) for chunk in chunks]
+    if not chunks:
+        return {}
+    return {label: np.concatenate([chunk[label] for chunk in chunks]) for label in chunks[0]}
+
+
+def _chunks(columns, chunk_rows):
+    rows = len(next(iter(columns.values()))) if columns else 0
+    for start in range(0, rows, chunk_rows):
+        yield {label: values[start:start + chunk_rows] for label, values in columns.items()}
+
+#### CSV ####
+
+def iter_csv(columns, chunk_rows=65536, float_format='%.10g'):
+    '''
+    Yields a CSV file as text chunks of at most chunk_rows rows each, header
+    first, so arbitrarily long tables can be streamed with bounded memory.
+
+    columns may also be an iterable of such dicts (chunks of one larger table,
+    e.g. from parallel evaluation), in which case each one is written in turn.
+    '''
+    chunks = [columns] if isinstance(columns, dict) else columns
+    header_written = False
+    for table in chunks:
+        table = _check_columns(table)
+        if not header_written:
+            yield ','.join(_csv_field(label) for label in table) + '\n'
+            header_written = True
+        numeric = all(values.dtype.kind in 'fiub' for values in table.values())
+        for chunk in _chunks(table, chunk_rows):
+            if numeric:
+                text = io.StringIO()
+                np.savetxt(text, np.column_stack(list(chunk.values())), delimiter=',', fmt=float_format)
+                yield text.getvalue()
+            else:
+                yield _format_rows(chunk, float_format)
+
+
+def _format_rows(chunk, float_format):
+    # Slower path for tables with text columns (e.g. compound names in batch results)
+    fields = []
+    for values in chunk.values():
+        if values.dtype.kind in 'fiub':
+            fields.append(np.char.mod(float_format, values))
+        else:
+            fields.append(np.array([_csv_field(value) for value in values], dtype=str))
+    rows = fields[0]
+    for field in fields[1:]:
+        rows = np.char.add(np.char.add(rows, ','), field)
+    return ''.join(row + '\n' for row in rows)
+
+
+def _csv_field(label):
+    label = str(label)
+    if any(character in label for character in ',"\n'):
+        return '"' + label.replace('"', '""') + '"'
+    return label
+
+
+@register_exporter('csv', '.csv', 'text/csv', streaming=True)
+def write_csv(columns, stream, chunk_rows=65536, float_format='%.10g'):
+    for text in iter_csv(columns, chunk_rows=chunk_rows, float_format=float_format):
+        stream.write(text.encode('utf-8'))
+
+#### NumPy ####
+
+def array_name(label):
+    '''Turns a column label such as "Vapour Pressure (mmHg)" into "vapour_pressure_mmhg".'''
+    return re.sub(r'[^0-9a-z]+', '_', str(label).lower()).strip('_') or 'column'
+
+
+@register_exporter('npz', '.npz', 'application/octet-stream')
+def write_npz(columns, stream, compressed=False):
+    arrays = {}
+    for label, values in columns.items():
+        # Labels that only differ in punctuation or case get a numbered suffix rather than overwriting each other
+        name = base = array_name(label)
+        suffix = 2
+        while name in arrays or name == 'labels':
+            name, suffix = f"{base}_{suffix}", suffix + 1
+        arrays[name] = values
+    arrays['labels'] = np.array(list(columns), dtype=str) # keeps the original column labels, in the order of the arrays
+    (np.savez_compressed if compressed else np.savez)(stream, **arrays)
+
+#### Parquet (needs pyarrow) ####
+
+@register_exporter('parquet', '.parquet', 'application/vnd.apache.parquet', streaming=True)
+def write_parquet(columns, stream, chunk_rows=1048576, compression='snappy'):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export needs pyarrow, install it with: pip install pyarrow") from None
+
+    writer = None
+    try:
+        for table in ([columns] if isinstance(columns, dict) else columns):
+            table = _check_columns(table)
+            if writer is None: # the schema comes from the first chunk
+                schema = pa.schema([(label, pa.array(values[:1]).type) for label, values in table.items()])
+                writer = pq.ParquetWriter(stream, schema, compression=compression)
+            for chunk in _chunks(table, chunk_rows): # one row group per chunk
+                writer.write_table(pa.Table.from_arrays([pa.array(values) for values in chunk.values()], schema=schema))
+        if writer is None: # no chunks at all, still write a valid (empty) file
+            writer = pq.ParquetWriter(stream, pa.schema([]), compression=compression)
+    finally:
+        if writer is not None:
+            writer.close()
+
+#### Excel ####
+
+@register_exporter('xlsx', '.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+def write_xlsx(columns, stream):
+    import pandas as pd
+
+    rows = len(next(iter(columns.values()))) if columns else 0
+    if rows >= EXCEL_MAX_ROWS:
+        raise ValueError(f"Excel files hold at most {EXCEL_MAX_ROWS - 1} rows of values, use the csv, parquet or npz export instead.")
+    pd.DataFrame(columns).to_excel(stream, index=False, header=True)
@@ -0,0 +1,260 @@
+'''
+Fitting Antoine coefficients to measured (T, P) data
+
+Antoine's equation can be rearranged into a form that is linear in A, C and
+k = A*C - B:
+
+    T * log10(P) = A*T - C*log10(P) + k
+
+which gives a starting point from one least-squares solve. That estimate is
+then refined with Levenberg-Marquardt on the residuals in log10(P). Both steps
+work on many datasets at once: the data is padded into (datasets x points)
+arrays and every dataset's 3x3 normal equations are solved together.
+For very many datasets fit_many also spreads chunks over a process pool.
+
+The fitted coefficients are in the app's units (mmHg, °C) and come with fit
+statistics and the temperature range of the data, so FitResult.table() can go
+straight into batch evaluation or the plotting pipeline.
+
+'''
+import numpy as np
+
+from .batch import CoefficientTable, read_frame
+from .units import PRESSURE_UNITS, TEMPERATURE_UNITS, Pressures, Temperature
+
+
+class FitResult:
+    '''Fitted coefficients and statistics, one entry per dataset.'''
+
+    def __init__(self, A, B, C, rmse, max_relative_error, r_squared, points, t_min, t_max, converged):
+        self.A = A
+        self.B = B
+        self.C = C
+        self.rmse = rmse # root mean square residual of log10(P)
+        self.max_relative_error = max_relative_error # largest |P_fit - P| / P
+        self.r_squared = r_squared # of log10(P)
+        self.points = points
+        self.t_min = t_min
+        self.t_max = t_max
+        self.converged = converged
+
+    def __len__(self):
+        return len(self.A)
+
+    @classmethod
+    def concatenate(cls, results):
+        fields = ('A', 'B', 'C', 'rmse', 'max_relative_error', 'r_squared', 'points', 't_min', 't_max', 'converged')
+        return cls(**{field: np.concatenate([getattr(result, field) for result in results]) for field in fields})
+
+    def table(self, names=None, formulas=None):
+        '''The coefficients as a CoefficientTable, valid over the measured temperature range.'''
+        if names is None:
+            names = [f"Dataset {index + 1}" for index in range(len(self))]
+        return CoefficientTable(names, self.A, self.B, self.C, formulas=formulas, t_min=self.t_min, t_max=self.t_max)
+
+    def columns(self, names=None):
+        '''Coefficients and statistics as label -> array, laid out as a coefficient table for export.'''
+        table = self.table(names)
+        return {
+            'Compound': table.names,
+            'A': self.A,
+            'B': self.B,
+            'C': self.C,
+            'T Min (ºC)': self.t_min, # the ordinal sign, like the headers of every other export
+            'T Max (ºC)': self.t_max,
+            'Points': self.points,
+            'RMSE log10(P)': self.rmse,
+            'Max Relative Error': self.max_relative_error,
+            'R²': self.r_squared,
+        }
+
+
+def pad_datasets(datasets):
+    '''Stacks (temps, pressure) pairs of different lengths into NaN-padded 2-D arrays.'''
+    datasets = [(np.asarray(temps, dtype=np.float64), np.asarray(pressure, dtype=np.float64)) for temps, pressure in datasets]
+    width = max((len(temps) for temps, _ in datasets), default=0)
+    temps = np.full((len(datasets), width), np.nan)
+    pressure = np.full((len(datasets), width), np.nan)
+    for row, (dataset_temps, dataset_pressure) in enumerate(datasets):
+        temps[row, :len(dataset_temps)] = dataset_temps
+        pressure[row, :len(dataset_pressure)] = dataset_pressure
+    return temps, pressure
+
+
+def _solve(matrix, vector):
+    # pinv rather than solve so a degenerate dataset gives NaNs/garbage instead of failing the whole batch
+    return (np.linalg.pinv(matrix) @ vector[..., None])[..., 0]
+
+
+def _weighted_sse(residual, weight):
+    return np.sum(np.where(weight > 0, residual, 0.0) ** 2, axis=-1)
+
+
+def _residual(A, B, C, temps, log_pressure):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shifted = temps + C[:, None]
+        residual = A[:, None] - B[:, None] / shifted - log_pressure
+    # A point at or below T = -C is on the other branch of the equation, never accept that
+    residual[~(shifted > 0)] = np.inf
+    return residual, shifted
+
+
+def fit_antoine_batch(temps, pressure, iterations=100, tol=1e-12, temperature_unit='°C', pressure_unit='mmHg'):
+    '''
+    Fits A, B, C to every row of temps/pressure ((datasets x points) arrays,
+    padded with NaN where a dataset has fewer points). Returns a FitResult.
+    '''
+    temps = Temperature(np.atleast_2d(temps), temperature_unit).to('°C')
+    pressure = Pressures(np.atleast_2d(pressure), pressure_unit).to('mmHg')
+    if temps.shape != pressure.shape:
+        raise ValueError("temps and pressure must have the same shape.")
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_pressure = np.log10(pressure)
+    weight = (np.isfinite(temps) & np.isfinite(log_pressure)).astype(np.float64)
+    temps = np.where(weight > 0, temps, 0.0)
+    log_pressure = np.where(weight > 0, log_pressure, 0.0)
+    points = weight.sum(axis=1)
+
+    #### Linearized least squares for a starting point ####
+
+    design = np.stack([temps, -log_pressure, np.ones_like(temps)], axis=-1) * weight[..., None]
+    target = temps * log_pressure * weight
+    solution = _solve(design.transpose(0, 2, 1) @ design, np.einsum('dpk,dp->dk', design, target))
+    A, C, k = solution[:, 0], solution[:, 1], solution[:, 2]
+    B = A * C - k
+
+    #### Levenberg-Marquardt refinement of the log10(P) residuals ####
+
+    residual, shifted = _residual(A, B, C, temps, log_pressure)
+    sse = _weighted_sse(residual, weight)
+    damping = np.full(len(A), 1e-3)
+    converged = np.zeros(len(A), dtype=bool)
+
+    for _ in range(iterations):
+        active = ~converged & np.isfinite(sse)
+        if not active.any():
+            break
+
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            jacobian = np.stack([np.ones_like(temps), -1 / shifted, B[:, None] / shifted**2], axis=-1)
+        jacobian = np.where(weight[..., None] > 0, jacobian, 0.0)
+        jacobian[~np.isfinite(jacobian)] = 0.0
+        safe_residual = np.where((weight > 0) & np.isfinite(residual), residual, 0.0)
+
+        normal = jacobian.transpose(0, 2, 1) @ jacobian
+        gradient = np.einsum('dpk,dp->dk', jacobian, safe_residual)
+        diagonal = np.diagonal(normal, axis1=1, axis2=2)
+        step = _solve(normal + damping[:, None, None] * (diagonal[:, :, None] * np.eye(3)), -gradient)
+        step[~active] = 0.0
+
+        trial_A, trial_B, trial_C = A + step[:, 0], B + step[:, 1], C + step[:, 2]
+        trial_residual, trial_shifted = _residual(trial_A, trial_B, trial_C, temps, log_pressure)
+        trial_sse = _weighted_sse(trial_residual, weight)
+
+        better = active & (trial_sse <= sse)
+        A = np.where(better, trial_A, A)
+        B = np.where(better, trial_B, B)
+        C = np.where(better, trial_C, C)
+        residual[better] = trial_residual[better]
+        shifted[better] = trial_shifted[better]
+
+        improvement = sse - trial_sse
+        converged |= better & (improvement <= tol * np.maximum(sse, np.finfo(np.float64).tiny))
+        converged |= active & (np.abs(step) <= tol * (np.abs(np.stack([A, B, C], axis=1)) + tol)).all(axis=1)
+        sse = np.where(better, trial_sse, sse)
+        damping = np.where(better, damping / 10, damping * 10)
+        converged |= damping > 1e12 # no step improves the fit any more
+
+    #### Statistics ####
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        rmse = np.sqrt(sse / points)
+        mean_log = np.sum(log_pressure * weight, axis=1) / points
+        total = np.sum(((log_pressure - mean_log[:, None]) * weight) ** 2, axis=1)
+        r_squared = 1 - sse / total
+        relative = np.abs(10.0 ** -residual - 1) # P_measured/P_fit = 10**-residual
+        max_relative_error = np.max(np.where(weight > 0, relative, 0.0), axis=1)
+        t_min = np.min(np.where(weight > 0, temps, np.inf), axis=1)
+        t_max = np.max(np.where(weight > 0, temps, -np.inf), axis=1)
+
+    too_few = points < 3
+    for values in (A, B, C, rmse, r_squared, max_relative_error):
+        values[too_few] = np.nan
+    converged &= ~too_few
+
+    return FitResult(A, B, C, rmse, max_relative_error, r_squared, points.astype(np.int64), t_min, t_max, converged)
+
+
+def fit_antoine(temps, pressure, **options):
+    '''Fits a single dataset, see fit_antoine_batch for the options.'''
+    return fit_antoine_batch(np.asarray(temps, dtype=np.float64)[None, :], np.asarray(pressure, dtype=np.float64)[None, :], **options)
+
+
+def _fit_chunk(arguments):
+    temps, pressure, options = arguments
+    return fit_antoine_batch(temps, pressure, **options)
+
+
+def fit_many(datasets, processes=None, chunk_size=256, **options):
+    '''
+    Fits a list of (temps, pressure) datasets. With processes > 1 chunks of
+    chunk_size datasets are fitted in a process pool, each chunk as one batch.
+    '''
+    if not len(datasets):
+        raise ValueError("There are no datasets to fit.")
+    temps, pressure = pad_datasets(datasets)
+    if not processes or processes <= 1 or len(datasets) <= chunk_size:
+        return fit_antoine_batch(temps, pressure, **options)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunks = [(temps[start:start + chunk_size], pressure[start:start + chunk_size], options)
+        for start in range(0, len(datasets), chunk_size)]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return FitResult.concatenate(list(pool.map(_fit_chunk, chunks)))
+
+
+#### Reading measurements ####
+
+def _unit_from_label(label, units, default):
+    # "Vapour Pressure (mmHg)" -> "mmHg", the spreadsheets write °C with an ordinal sign (ºC)
+    label = str(label).replace('º', '°')
+    if '(' in label and label.rstrip().endswith(')'):
+        unit = label[label.rindex('(') + 1:label.rstrip().rindex(')')].strip()
+        for known in units:
+            if known.lower() == unit.lower():
+                return known
+    return default
+
+
+def read_measurements(source):
+    '''
+    Reads measured data from an .xlsx/.csv file laid out like
+    Examples/Vapour_Pressure_Data.xlsx: a temperature and a pressure column,
+    with their units in brackets in the header, and optionally a Compound
+    column to hold several datasets in one sheet.
+
+    Returns a list of (name, temps in °C, pressure in mmHg).
+    '''
+    frame = read_frame(source)
+
+    def column(word):
+        return next((label for label in frame.columns if word in str(label).lower()), None)
+
+    temperature_column = column('temp')
+    pressure_column = column('press')
+    if temperature_column is None or pressure_column is None:
+        raise ValueError("The measurements need a temperature column and a pressure column.")
+
+    temperature_unit = _unit_from_label(temperature_column, TEMPERATURE_UNITS, '°C')
+    pressure_unit = _unit_from_label(pressure_column, PRESSURE_UNITS, 'mmHg')
+    compound_column = column('compound') or column('name')
+
+    groups = frame.groupby(compound_column, sort=False) if compound_column is not None else [('Measurements', frame)]
+    datasets = []
+    for group, rows in groups:
+        temps = Temperature(rows[temperature_column].to_numpy(dtype=np.float64), temperature_unit).to('°C')
+        pressure = Pressures(rows[pressure_column].to_numpy(dtype=np.float64), pressure_unit).to('mmHg')
+        datasets.append((str(group), temps, pressure))
+    return datasets
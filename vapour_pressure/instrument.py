@@ -0,0 +1,186 @@
+'''
+Per-stage timing and memory instrumentation
+
+A Timings object records how long each stage of one run (one Streamlit rerun,
+one CLI call) took and, when memory tracing is on, how much it allocated and
+its peak traced memory. Finished runs are added to a process-wide Metrics
+registry that aggregates every session, and can be written out as JSON lines
+or as a Prometheus text file:
+
+    timings = Timings(trace_memory=True)
+    with timings.stage('compute'):
+        ...
+    METRICS.add(timings)
+    METRICS.write('metrics.prom')   # or 'metrics.jsonl' to append this run
+
+'''
+import contextlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+
+# tracemalloc is process-wide, so it is started by the first stage that traces
+# memory and only stopped once no other thread's stage still needs it, and never
+# if something else (pytest, a profiler) was already tracing. Its peak is
+# process-wide too: it is only reset by a stage that is the sole one tracing,
+# so overlapping stages (nested, or from concurrent sessions) never clobber
+# each other's peak, they each report the shared peak since the earliest of
+# them started, an upper bound of their own.
+_tracers = 0
+_owns_tracing = False
+_tracers_lock = threading.Lock()
+
+
+def _start_tracing():
+    global _tracers, _owns_tracing
+    with _tracers_lock:
+        if _tracers == 0:
+            _owns_tracing = not tracemalloc.is_tracing()
+            if _owns_tracing:
+                tracemalloc.start()
+        _tracers += 1
+        # Python 3.9+ for reset_peak, otherwise the peak is since tracing started
+        if _tracers == 1 and _owns_tracing and hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[0]
+
+
+def _stop_tracing():
+    global _tracers, _owns_tracing
+    with _tracers_lock:
+        current, peak = tracemalloc.get_traced_memory()
+        _tracers -= 1
+        if _tracers == 0 and _owns_tracing:
+            tracemalloc.stop()
+            _owns_tracing = False
+        return current, peak
+
+
+class StageRecord:
+    __slots__ = ('stage', 'seconds', 'allocated_bytes', 'peak_bytes')
+
+    def __init__(self, stage, seconds, allocated_bytes=None, peak_bytes=None):
+        self.stage = stage
+        self.seconds = seconds
+        self.allocated_bytes = allocated_bytes
+        self.peak_bytes = peak_bytes
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Timings:
+    '''
+    Stage timings of a single run. Memory is only traced when trace_memory is
+    set, as it slows everything down; see above for how peaks of overlapping
+    stages are reported.
+    '''
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.records = []
+        self.started = time.time()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        tracing = self.trace_memory
+        if tracing:
+            memory_before = _start_tracing()
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            allocated = peak = None
+            if tracing:
+                current, peak = _stop_tracing()
+                allocated = current - memory_before
+                peak -= memory_before
+            self.records.append(StageRecord(name, seconds, allocated, peak))
+
+    @property
+    def total(self):
+        return sum(record.seconds for record in self.records)
+
+    def rows(self):
+        '''One dict per stage, in the order they ran, for display.'''
+        return [record.as_dict() for record in self.records]
+
+
+class Metrics:
+    '''Per-stage totals across every run in this process (thread-safe).'''
+
+    def __init__(self, prefix='vapour_pressure'):
+        self.prefix = prefix
+        self.runs = 0
+        self.stages = {} # stage -> {'calls', 'seconds', 'max_seconds', 'max_peak_bytes'}
+        self.gauges = {}
+        self._last_run = None
+        self._lock = threading.Lock()
+
+    def add(self, timings):
+        with self._lock:
+            self.runs += 1
+            self._last_run = timings
+            for record in timings.records:
+                totals = self.stages.setdefault(record.stage, {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'max_peak_bytes': 0})
+                totals['calls'] += 1
+                totals['seconds'] += record.seconds
+                totals['max_seconds'] = max(totals['max_seconds'], record.seconds)
+                if record.peak_bytes is not None:
+                    totals['max_peak_bytes'] = max(totals['max_peak_bytes'], record.peak_bytes)
+
+    def set_gauge(self, name, value):
+        '''Extra values to export alongside the stage metrics (e.g. cache hits).'''
+        with self._lock:
+            self.gauges[name] = value
+
+    def to_prometheus(self):
+        lines = []
+        metrics = (
+            ('stage_calls_total', 'counter', 'Number of times each stage ran', 'calls'),
+            ('stage_seconds_total', 'counter', 'Total time spent in each stage', 'seconds'),
+            ('stage_seconds_max', 'gauge', 'Slowest single run of each stage', 'max_seconds'),
+            ('stage_peak_bytes_max', 'gauge', 'Largest traced peak memory of each stage', 'max_peak_bytes'),
+        )
+        with self._lock:
+            lines.append(f"# TYPE {self.prefix}_runs_total counter")
+            lines.append(f"{self.prefix}_runs_total {self.runs}")
+            for name, kind, description, field in metrics:
+                lines.append(f"# HELP {self.prefix}_{name} {description}")
+                lines.append(f"# TYPE {self.prefix}_{name} {kind}")
+                for stage, totals in sorted(self.stages.items()):
+                    lines.append(f'{self.prefix}_{name}{{stage="{stage}"}} {totals[field]}')
+            for name, value in sorted(self.gauges.items()):
+                lines.append(f"# TYPE {self.prefix}_{name} gauge")
+                lines.append(f"{self.prefix}_{name} {value}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path, timings=None):
+        '''
+        Writes the metrics to path: a Prometheus text file (replaced atomically)
+        when it ends in .prom, otherwise timings (by default the last run added)
+        is appended as a JSON line.
+        '''
+        if path.endswith('.prom'):
+            staging = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(staging, 'w') as file:
+                file.write(self.to_prometheus())
+            os.replace(staging, path)
+            return
+
+        if timings is None:
+            with self._lock:
+                timings = self._last_run
+        if timings is None:
+            return
+        line = json.dumps({'time': timings.started, 'total_seconds': timings.total, 'stages': timings.rows()})
+        with open(path, 'a') as file:
+            file.write(line + '\n')
+
+
+METRICS = Metrics()
@@ -0,0 +1,168 @@
+'''
+Bubble and dew points of ideal mixtures (Raoult's law)
+
+For a liquid of mole fractions x (or a vapour of mole fractions y) made of
+compounds with Antoine coefficients A, B, C:
+
+    bubble point:  P = sum(x_i * Psat_i(T)),      y_i = x_i * Psat_i(T) / P
+    dew point:     1/P = sum(y_i / Psat_i(T)),    x_i = y_i * P / Psat_i(T)
+
+Pressures at a given temperature follow directly. Temperatures at a given
+pressure are solved with Newton's method on the logarithm of those sums,
+using the closed-form dP/dT of Antoine's equation, for every composition at
+once: compositions are the rows of an (n x compounds) array and each
+iteration is a handful of array operations over all of them.
+
+Units are the app's base units, mmHg and °C. Every solver returns an
+Equilibrium (temperature, pressure, x, y, invalid) with one row per
+composition.
+
+'''
+from collections import namedtuple
+
+import numpy as np
+
+from .engine import antoine, antoine_derivative, antoine_temperature
+
+Equilibrium = namedtuple('Equilibrium', 'temperature pressure x y invalid')
+
+
+def _coefficients(A, B, C):
+    A, B, C = (np.atleast_1d(np.asarray(values, dtype=np.float64)) for values in (A, B, C))
+    if not A.shape == B.shape == C.shape or A.ndim != 1:
+        raise ValueError("A, B and C must be 1-D arrays with one value per compound.")
+    return A, B, C
+
+
+def _compositions(fractions, compounds):
+    '''Mole fractions as an (n x compounds) array with rows normalised to sum to 1.'''
+    fractions = np.atleast_2d(np.asarray(fractions, dtype=np.float64))
+    if fractions.shape[1] != compounds:
+        raise ValueError(f"Compositions have {fractions.shape[1]} mole fractions, expected one per compound ({compounds}).")
+    if (fractions < 0).any():
+        raise ValueError("Mole fractions cannot be negative.")
+    totals = fractions.sum(axis=1, keepdims=True)
+    if not (totals > 0).all():
+        raise ValueError("Every composition needs at least one non-zero mole fraction.")
+    return fractions / totals
+
+
+def _rows(values, count):
+    return np.broadcast_to(np.asarray(values, dtype=np.float64), (count,)).copy()
+
+
+def bubble_pressure(x, temperature, A, B, C):
+    '''Bubble point pressures of liquids x at temperature (scalar or one per composition).'''
+    A, B, C = _coefficients(A, B, C)
+    x = _compositions(x, len(A))
+    temperature = _rows(temperature, len(x))
+
+    saturation, invalid = antoine(temperature[:, None], A, B, C)
+    partial = x * saturation
+    pressure = partial.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        y = partial / pressure[:, None]
+    invalid = (invalid & (x > 0)).any(axis=1) | ~np.isfinite(pressure)
+    return _result(temperature, pressure, x, y, invalid)
+
+
+def dew_pressure(y, temperature, A, B, C):
+    '''Dew point pressures of vapours y at temperature (scalar or one per composition).'''
+    A, B, C = _coefficients(A, B, C)
+    y = _compositions(y, len(A))
+    temperature = _rows(temperature, len(y))
+
+    saturation, invalid = antoine(temperature[:, None], A, B, C)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pressure = 1 / (y / saturation).sum(axis=1)
+        x = y * pressure[:, None] / saturation
+    invalid = (invalid & (y > 0)).any(axis=1) | ~np.isfinite(pressure)
+    return _result(temperature, pressure, x, y, invalid)
+
+
+def bubble_temperature(x, pressure, A, B, C, tol=1e-10, max_iterations=50):
+    '''Bubble point temperatures of liquids x at pressure (scalar or one per composition).'''
+    A, B, C = _coefficients(A, B, C)
+    x = _compositions(x, len(A))
+    pressure = _rows(pressure, len(x))
+
+    def residual(temperature, rows):
+        # ln(sum(x_i Psat_i) / P) and its derivative with respect to T
+        saturation, _ = antoine(temperature[:, None], A, B, C)
+        slope, _ = antoine_derivative(temperature[:, None], A, B, C)
+        total = (x[rows] * saturation).sum(axis=1)
+        return np.log(total / pressure[rows]), (x[rows] * slope).sum(axis=1) / total
+
+    temperature, converged = _newton(residual, x, pressure, A, B, C, tol, max_iterations)
+    result = bubble_pressure(x, temperature, A, B, C)
+    invalid = result.invalid | ~converged
+    return _result(result.temperature, pressure, result.x, result.y, invalid)
+
+
+def dew_temperature(y, pressure, A, B, C, tol=1e-10, max_iterations=50):
+    '''Dew point temperatures of vapours y at pressure (scalar or one per composition).'''
+    A, B, C = _coefficients(A, B, C)
+    y = _compositions(y, len(A))
+    pressure = _rows(pressure, len(y))
+
+    def residual(temperature, rows):
+        # ln(P * sum(y_i / Psat_i)) and its derivative with respect to T
+        saturation, _ = antoine(temperature[:, None], A, B, C)
+        slope, _ = antoine_derivative(temperature[:, None], A, B, C)
+        total = (y[rows] / saturation).sum(axis=1)
+        return np.log(pressure[rows] * total), -(y[rows] * slope / saturation**2).sum(axis=1) / total
+
+    temperature, converged = _newton(residual, y, pressure, A, B, C, tol, max_iterations)
+    result = dew_pressure(y, temperature, A, B, C)
+    invalid = result.invalid | ~converged
+    return _result(result.temperature, pressure, result.x, result.y, invalid)
+
+
+def _newton(residual, fractions, pressure, A, B, C, tol, max_iterations):
+    '''
+    Vectorized Newton iteration on residual(T, rows) -> (value, derivative)
+    for the compositions at the indices rows, which must increase or decrease
+    monotonically in T. Starts from the mole-fraction-weighted pure compound
+    boiling points.
+    '''
+    boiling, _ = antoine_temperature(pressure[:, None], A, B, C)
+    temperature = np.nansum(fractions * boiling, axis=1)
+    # Every compound with a non-zero fraction must stay above its asymptote T = -C
+    floor = np.max(np.where(fractions > 0, -C, -np.inf), axis=1)
+    temperature = np.where(np.isfinite(temperature) & (temperature > floor), temperature, floor + 1.0)
+
+    converged = np.zeros(len(temperature), dtype=bool)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for _ in range(max_iterations):
+            rows = np.flatnonzero(~converged)
+            if not len(rows):
+                break
+            value, slope = residual(temperature[rows], rows)
+            step = value / slope
+            updated = temperature[rows] - step
+            # Halve the way to the asymptote instead of stepping past it
+            low = floor[rows]
+            updated = np.where(updated > low, updated, (temperature[rows] + low) / 2)
+
+            failed = ~np.isfinite(updated)
+            temperature[rows] = updated
+            converged[rows[failed | (np.abs(step) <= tol * np.maximum(np.abs(updated), 1.0))]] = True
+    return temperature, converged & np.isfinite(temperature)
+
+
+def _result(temperature, pressure, x, y, invalid):
+    temperature = np.where(invalid, np.nan, temperature)
+    pressure = np.where(invalid, np.nan, pressure)
+    return Equilibrium(temperature, pressure, x, np.where(invalid[:, None], np.nan, y), invalid)
+
+
+def binary_txy(pressure, A, B, C, points=101):
+    '''
+    T-x-y diagram of a binary mixture at pressure: mole fractions x1 of the
+    first compound from 0 to 1, the bubble temperatures and the vapour mole
+    fractions y1 in equilibrium. The bubble line is (x1, T), the dew line
+    (y1, T).
+    '''
+    x1 = np.linspace(0.0, 1.0, points)
+    result = bubble_temperature(np.column_stack([x1, 1 - x1]), pressure, A, B, C)
+    return x1, result.temperature, result.y[:, 0]
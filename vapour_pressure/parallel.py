@@ -0,0 +1,159 @@
+'''
+Parallel evaluation of very large (rows x temperatures) grids
+
+Parameter sweeps (compounds x coefficient samples, over thousands of
+temperatures) easily reach hundreds of millions of pressures. Here the rows
+are split into chunks and evaluated on a process pool. Every worker writes its
+chunk straight into one output array that all processes share, so no results
+are pickled back: either a multiprocessing.shared_memory block or, when a path
+is given, a memory-mapped .npy file (which also works for results larger than
+RAM and can be reopened later with np.load(path, mmap_mode='r')).
+
+    with SharedArray((len(A), len(temps))) as output:
+        for start, stop in iter_parallel(temps, A, B, C, output, processes=4):
+            ...  # output.array[start:stop] is ready
+
+iter_batch_columns wraps that for coefficient tables (any mix of
+correlations) and yields the tidy batch columns one chunk at a time, in order, which the csv and parquet exporters
+write out as they arrive.
+
+'''
+import os
+
+import numpy as np
+
+from .batch import BatchResult
+from .correlations import evaluate_correlations
+
+# Rows per chunk are picked so a chunk holds about this many values
+CHUNK_VALUES = 2**22
+
+
+class SharedArray:
+    '''
+    A float64 array worker processes can attach to: a shared memory block, or
+    a memory-mapped .npy file when path is given (the file is kept).
+    '''
+
+    def __init__(self, shape, path=None):
+        from multiprocessing import shared_memory
+
+        self.shape = tuple(shape)
+        self.path = path
+        if path is not None:
+            self._shm = None
+            self.array = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64, shape=self.shape)
+        else:
+            size = max(int(np.prod(self.shape)) * 8, 1)
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+            self.array = np.ndarray(self.shape, dtype=np.float64, buffer=self._shm.buf)
+
+    @property
+    def spec(self):
+        '''What a worker needs to attach to the array (picklable).'''
+        if self._shm is None:
+            return ('file', self.path, self.shape)
+        return ('shm', self._shm.name, self.shape)
+
+    def close(self):
+        '''Releases the shared memory, views of array must not be used after this.'''
+        self.array = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _attach(spec):
+    kind, name, shape = spec
+    if kind == 'file':
+        return np.load(name, mmap_mode='r+'), None
+
+    from multiprocessing import shared_memory
+
+    block = shared_memory.SharedMemory(name=name)
+    return np.ndarray(shape, dtype=np.float64, buffer=block.buf), block
+
+
+def _evaluate_chunk(spec, temps, correlations, parameters, start, stop):
+    array, block = _attach(spec)
+    pressure = None
+    try:
+        pressure, invalid = evaluate_correlations(correlations, parameters, temps, out=array[start:stop])
+        if block is None:
+            array.flush()
+    finally:
+        del array, pressure
+        if block is not None:
+            block.close()
+    return start, stop, int(np.count_nonzero(invalid))
+
+
+def chunk_rows_for(columns, values=CHUNK_VALUES):
+    return max(1, values // max(columns, 1))
+
+
+def iter_parallel(temps, A, B, C, output, processes=None, chunk_rows=None):
+    '''
+    Evaluates Antoine's equation for every row of coefficients (A, B, C, 1-D
+    arrays of the same length) over temps into output (a SharedArray of shape
+    (rows, temperatures)), on a pool of processes (default: every CPU).
+
+    Yields (start, stop) for each finished chunk of rows, in row order, so the
+    chunks can be consumed while later ones are still running. Invalid points
+    are NaN, as with antoine().
+    '''
+    A, B, C = (np.asarray(values, dtype=np.float64) for values in (A, B, C))
+    return _iter_chunks(temps, np.full(len(A), 'antoine'), np.column_stack([A, B, C]), output, processes, chunk_rows)
+
+
+def _iter_chunks(temps, correlations, parameters, output, processes, chunk_rows):
+    '''iter_parallel for rows of any correlations (names) with their parameters (rows x parameters).'''
+    from concurrent.futures import ProcessPoolExecutor
+
+    temps = np.asarray(temps, dtype=np.float64)
+    rows = len(correlations)
+    if output.shape != (rows, len(temps)):
+        raise ValueError(f"output has shape {output.shape}, expected {(rows, len(temps))}")
+
+    chunk_rows = chunk_rows or chunk_rows_for(len(temps))
+    processes = processes or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(_evaluate_chunk, output.spec, temps, correlations[start:start + chunk_rows],
+                parameters[start:start + chunk_rows], start, min(start + chunk_rows, rows))
+            for start in range(0, rows, chunk_rows)]
+        try:
+            for future in futures:
+                start, stop, _ = future.result()
+                yield start, stop
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def evaluate_parallel(temps, A, B, C, output, processes=None, chunk_rows=None):
+    '''Runs iter_parallel to completion and returns output.array.'''
+    for _ in iter_parallel(temps, A, B, C, output, processes=processes, chunk_rows=chunk_rows):
+        pass
+    return output.array
+
+
+def iter_batch_columns(table, temps, processes=None, chunk_rows=None, path=None):
+    '''
+    Evaluates every compound of a CoefficientTable over temps in parallel and
+    yields the result as tidy column chunks (see BatchResult.columns), in
+    order, as soon as each chunk is done. Pass the generator to export() to
+    stream it into a file; with path the full pressure grid is also kept as a
+    .npy file.
+    '''
+    temps = np.asarray(temps, dtype=np.float64)
+    with SharedArray((len(table), len(temps)), path=path) as output:
+        for start, stop in _iter_chunks(temps, table.correlations, table.parameters, output, processes, chunk_rows):
+            pressure = output.array[start:stop].copy() # the chunk may be kept after the shared block is gone
+            yield BatchResult(table.subset(slice(start, stop)), temps, pressure, np.isnan(pressure)).columns()
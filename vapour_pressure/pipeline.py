@@ -0,0 +1,92 @@
+'''
+The render pipeline behind the app: compute -> convert -> plot -> table -> export
+
+Each stage is a plain function, so a caller can cache, skip or reuse any of
+them. Units are keys of the tables in units.py rather than separate code paths.
+The plot stage is plotting.unit_switching_figure, which converts units in the
+browser, so this module never imports Bokeh.
+
+'''
+from collections import namedtuple
+
+import numpy as np
+
+from .correlations import get_correlation
+from .engine import antoine, antoine_temperature, temperature_grid
+from .sampling import adaptive_grid
+from .units import Pressures, Temperature
+
+# Base units: temps in °C, pressure in mmHg
+Curve = namedtuple('Curve', 'temps pressure invalid')
+
+
+def compute_curve(A, B, C, lower, upper, step=1.0, decimals=4):
+    '''Evaluates Antoine's equation over [lower, upper] °C, rounded to decimals places.'''
+    temps = temperature_grid(lower, upper, step)
+    pressure, invalid = antoine(temps, A, B, C)
+    if decimals is not None:
+        np.round(pressure, decimals, out=pressure)
+    return Curve(temps, pressure, invalid)
+
+
+def compute_adaptive_curve(A, B, C, lower, upper, rtol=1e-3, max_points=2000, decimals=4):
+    '''Same as compute_curve but with temperatures placed by sampling.adaptive_grid.'''
+    temps, pressure, invalid = adaptive_grid(A, B, C, lower, upper, rtol=rtol, max_points=max_points)
+    if decimals is not None:
+        np.round(pressure, decimals, out=pressure)
+    return Curve(temps, pressure, invalid)
+
+
+def compute_correlation_curve(correlation, parameters, lower, upper, step=1.0, decimals=4, rtol=None, max_points=2000):
+    '''
+    Like compute_curve for any registered correlation (see correlations.py)
+    with its parameters in order. rtol places the temperatures adaptively as
+    in compute_adaptive_curve.
+    '''
+    correlation = get_correlation(correlation)
+    parameters = tuple(parameters)
+    if len(parameters) != len(correlation.parameters):
+        raise ValueError(f"{correlation.label} takes {len(correlation.parameters)} parameters ({', '.join(correlation.parameters)}), got {len(parameters)}")
+
+    def function(temps):
+        return correlation.pressure(temps, *parameters)
+
+    if rtol is None:
+        temps = temperature_grid(lower, upper, step)
+        pressure, invalid = function(temps)
+    else:
+        temps, pressure, invalid = adaptive_grid(None, None, None, lower, upper, rtol=rtol, max_points=max_points, function=function)
+    if decimals is not None:
+        np.round(pressure, decimals, out=pressure)
+    return Curve(temps, pressure, invalid)
+
+
+def convert_curve(curve, pressure_unit='mmHg', temperature_unit='°C'):
+    '''(temperatures, pressures) of a curve in the requested units.'''
+    return Temperature(curve.temps).to(temperature_unit), Pressures(curve.pressure).to(pressure_unit)
+
+
+def saturation_temperature(pressure, A, B, C, pressure_unit='mmHg', temperature_unit='°C'):
+    '''
+    Boiling temperatures at the given pressures (in pressure_unit), returned in
+    temperature_unit as (temperature, invalid). Coefficients broadcast against
+    the pressures, e.g. A[:, None] for every compound at every pressure.
+    '''
+    mmhg = Pressures(pressure, pressure_unit).to('mmHg')
+    temps, invalid = antoine_temperature(mmhg, A, B, C)
+    return Temperature(temps).convert_in_place(temperature_unit).values, invalid
+
+
+def axis_labels(pressure_unit, temperature_unit):
+    return f"Temperature ({temperature_unit})", f"Vapour Pressure ({pressure_unit})"
+
+
+def default_title(pressure_unit, temperature_unit):
+    return f"Vapour Pressure ({pressure_unit}) vs Temperature ({temperature_unit})"
+
+
+def table_columns(temps, pressure, pressure_unit, temperature_unit):
+    '''The table of values as label -> array, ready for st.write or the exporters.'''
+    x_label, y_label = axis_labels(pressure_unit, temperature_unit)
+    # The downloaded spreadsheets have always used the ordinal sign (º) in their headers
+    return {x_label.replace('°', 'º'): temps, y_label: pressure}
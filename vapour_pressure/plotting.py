@@ -0,0 +1,166 @@
+'''
+Bokeh plotting stage
+
+Dense curves are decimated on the server before they are sent to the browser:
+the points are split into one bucket per horizontal pixel and only the first,
+last, lowest and highest point of each bucket are kept, which draws the same
+line as the full series. The remaining columns go into a ColumnDataSource as
+float64 NumPy arrays so Bokeh transmits them in binary form, and large series
+are drawn with the WebGL backend instead of the canvas.
+
+unit_switching_figure ships a curve once in base units (°C, mmHg) along with
+the unit tables, and converts it in the browser when the unit buttons next to
+the chart are clicked, so changing units never goes back to the server.
+
+'''
+import numpy as np
+
+PLOT_WIDTH = 600 # Bokeh's default figure width in pixels
+WEBGL_THRESHOLD = 2000 # points drawn before switching to WebGL
+
+
+def minmax_decimate(y, buckets):
+    '''
+    Indices of the points of y to keep so that a line through them looks the
+    same as the full series at a resolution of buckets columns. y must be in
+    plotting order; non-finite values (gaps) are kept once per bucket.
+    '''
+    y = np.asarray(y)
+    count = len(y)
+    if buckets <= 0 or count <= 4 * buckets:
+        return np.arange(count)
+
+    bucket = (np.arange(count) * buckets) // count # non-decreasing
+    finite = np.isfinite(y)
+    order = np.lexsort((np.where(finite, y, np.inf), bucket)) # by bucket, then by value
+
+    starts = np.searchsorted(bucket, np.arange(buckets))
+    ends = np.append(starts[1:], count)
+    finite_count = np.add.reduceat(finite.astype(np.intp), starts)
+
+    lowest = order[starts]
+    highest = order[starts + np.maximum(finite_count, 1) - 1]
+    gaps = order[np.minimum(starts + finite_count, ends - 1)] # a non-finite point if the bucket has one
+
+    return np.unique(np.concatenate([starts, ends - 1, lowest, highest, gaps]))
+
+
+def curve_source(x, y, buckets=PLOT_WIDTH):
+    '''ColumnDataSource with the (decimated) x/y columns as contiguous float64 arrays.'''
+    from bokeh.models import ColumnDataSource
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if buckets:
+        keep = minmax_decimate(y, buckets)
+        if len(keep) < len(y):
+            x, y = x[keep], y[keep]
+    return ColumnDataSource(data={
+        'x': np.ascontiguousarray(x),
+        'y': np.ascontiguousarray(y),
+    })
+
+
+def line_figure(x, y, title, x_label, y_label, legend_label=None, buckets=PLOT_WIDTH, webgl_threshold=WEBGL_THRESHOLD):
+    '''
+    Line plot of y against x. buckets=None sends every point; webgl_threshold
+    is compared against the number of points actually sent.
+    '''
+    from bokeh.plotting import figure
+
+    source = curve_source(x, y, buckets=buckets)
+    graph = figure(title = title,
+        x_axis_label = x_label,
+        y_axis_label = y_label,
+        output_backend = 'webgl' if len(source.data['x']) > webgl_threshold else 'canvas')
+    graph.line('x', 'y', source=source, legend_label=legend_label or y_label, line_width = 2)
+    return graph
+
+
+def txy_figure(x1, temperature, y1, names, pressure_label, temperature_unit='°C'):
+    '''
+    T-x-y diagram of a binary mixture: the bubble line (x1, T) and the dew line
+    (y1, T), with mole fractions of the first of the two compounds in names.
+    '''
+    from bokeh.plotting import figure
+
+    graph = figure(title = f"T-x-y diagram of {names[0]} / {names[1]} at {pressure_label}",
+        x_axis_label = f"Mole fraction of {names[0]}",
+        y_axis_label = f"Temperature ({temperature_unit})",
+        x_range = (0, 1))
+    graph.line(np.asarray(x1, dtype=np.float64), np.asarray(temperature, dtype=np.float64),
+        legend_label="Bubble point (liquid, x)", line_width = 2)
+    graph.line(np.asarray(y1, dtype=np.float64), np.asarray(temperature, dtype=np.float64),
+        legend_label="Dew point (vapour, y)", line_width = 2, line_dash = 'dashed', color = 'firebrick')
+    return graph
+
+#### Client-side unit switching ####
+
+# Converts one column in the browser with the (scale, offset) of the unit picked in a button group
+CONVERT_JS = """
+const [scale, offset] = units[buttons.labels[buttons.active]];
+const converted = new Float64Array(xs.length);
+for (let i = 0; i < xs.length; i++) {
+    converted[i] = xs[i] * scale + offset;
+}
+return converted;
+"""
+
+# Relabels the chart after a unit button is clicked and redraws it through the transforms
+RELABEL_JS = """
+const pressure_unit = pressure_buttons.labels[pressure_buttons.active];
+const temperature_unit = temperature_buttons.labels[temperature_buttons.active];
+const y_label = `Vapour Pressure (${pressure_unit})`;
+x_axis.axis_label = `Temperature (${temperature_unit})`;
+y_axis.axis_label = y_label;
+legend_item.label = {value: y_label};
+if (title.text == title.tags[0]) { // still the default title, keep it in sync
+    title.text = `Vapour Pressure (${pressure_unit}) vs Temperature (${temperature_unit})`;
+    title.tags = [title.text];
+}
+source.change.emit();
+"""
+
+
+def unit_switching_figure(temps, pressure, title=None, buckets=PLOT_WIDTH, webgl_threshold=WEBGL_THRESHOLD,
+        pressure_unit='mmHg', temperature_unit='°C'):
+    '''
+    Layout of a curve (temps in °C, pressure in mmHg) with pressure and
+    temperature unit buttons that convert it client-side. pressure_unit and
+    temperature_unit are the units it is first shown in.
+    '''
+    from bokeh.layouts import column
+    from bokeh.models import CustomJS, CustomJSTransform, RadioButtonGroup
+    from bokeh.plotting import figure
+    from bokeh.transform import transform
+
+    from .units import PRESSURE_UNITS, TEMPERATURE_UNITS
+
+    pressure_buttons = RadioButtonGroup(labels=list(PRESSURE_UNITS), active=list(PRESSURE_UNITS).index(pressure_unit))
+    temperature_buttons = RadioButtonGroup(labels=list(TEMPERATURE_UNITS), active=list(TEMPERATURE_UNITS).index(temperature_unit))
+
+    def conversion(buttons, units):
+        table = {unit: list(factors) for unit, factors in units.items()}
+        return CustomJSTransform(args=dict(buttons=buttons, units=table), v_func=CONVERT_JS)
+
+    default = f"Vapour Pressure ({pressure_unit}) vs Temperature ({temperature_unit})"
+    y_label = f"Vapour Pressure ({pressure_unit})"
+    source = curve_source(temps, pressure, buckets=buckets)
+    graph = figure(title = title or default,
+        x_axis_label = f"Temperature ({temperature_unit})",
+        y_axis_label = y_label,
+        output_backend = 'webgl' if len(source.data['x']) > webgl_threshold else 'canvas')
+    graph.title.tags = [default]
+    graph.line(
+        x=transform('x', conversion(temperature_buttons, TEMPERATURE_UNITS)),
+        y=transform('y', conversion(pressure_buttons, PRESSURE_UNITS)),
+        source=source, legend_label=y_label, line_width = 2)
+
+    relabel = CustomJS(code=RELABEL_JS, args=dict(
+        pressure_buttons=pressure_buttons, temperature_buttons=temperature_buttons,
+        x_axis=graph.xaxis[0], y_axis=graph.yaxis[0], legend_item=graph.legend[0].items[0],
+        title=graph.title, source=source))
+    pressure_buttons.js_on_change('active', relabel)
+    temperature_buttons.js_on_change('active', relabel)
+
+    return column(pressure_buttons, temperature_buttons, graph)
@@ -0,0 +1,194 @@
+'''
+Headless bulk chart rendering for reports (no Streamlit)
+
+Renders one vapour pressure chart per compound of a coefficient table into a
+single standalone HTML file: BokehJS is loaded once in the page head and every
+chart is embedded as its own document (bokeh.embed.json_item). Optionally each
+chart is also saved as a PNG, which needs selenium and a browser driver.
+
+Building and serializing a Bokeh figure is the slow part of a chart, so each
+worker builds one figure as a template and serializes it once with
+placeholder data and title, then only fills in those slots for every
+compound. Chunks of compounds are rendered on a process pool and the HTML is
+written in compound order as the chunks come back.
+
+    python -m vapour_pressure report Examples/Antoine_Coefficients.xlsx -o report.html
+
+'''
+import html
+import json
+import os
+import time
+
+import numpy as np
+
+from .correlations import evaluate_correlations
+from .units import Pressures, Temperature
+
+PAGE_HEAD = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+{resources}
+</head>
+<body>
+<h1>{title}</h1>
+"""
+
+PAGE_TAIL = """<script>
+document.querySelectorAll('script[data-chart]').forEach(function (data) {
+    Bokeh.embed.embed_item(JSON.parse(data.textContent), data.dataset.chart);
+});
+</script>
+</body>
+</html>
+"""
+
+
+def _chart_range(table, row, lower, upper):
+    low = table.t_min[row] if np.isfinite(table.t_min[row]) else lower
+    high = table.t_max[row] if np.isfinite(table.t_max[row]) else upper
+    return low, high
+
+
+def _json_list(values):
+    listed = np.asarray(values, dtype=np.float64).tolist()
+    for index in np.flatnonzero(~np.isfinite(values)):
+        listed[index] = None # gaps, NaN is not valid JSON
+    return listed
+
+
+class ChartTemplate:
+    '''
+    A chart serialized once (bokeh.embed.json_item) with placeholder x/y
+    columns and title, so each chart only costs filling those in and a
+    json.dumps rather than serializing every Bokeh model again.
+    '''
+
+    X, Y, TITLE = -7.5e307, -8.5e307, '\x00title\x00' # placeholders no real chart contains
+
+    def __init__(self, x_label, y_label):
+        from bokeh.embed import json_item
+
+        from .plotting import line_figure
+
+        self.graph = line_figure(np.empty(0), np.empty(0), self.TITLE, x_label, y_label, buckets=None)
+        self.source = self.graph.renderers[0].data_source
+        self.source.data = {'x': [self.X], 'y': [self.Y]}
+        self.item = json_item(self.graph, 'chart')
+
+        self.slots = {}
+        self._find_slots(self.item['doc'])
+        if len(self.slots) != 3:
+            raise RuntimeError("Could not find the data and title of the chart template in Bokeh's JSON.")
+
+    def _find_slots(self, node):
+        pairs = node.items() if isinstance(node, dict) else enumerate(node)
+        for key, value in pairs:
+            if value == [self.X]:
+                self.slots['x'] = value # the column lists are filled in place, they may sit in tuples
+            elif value == [self.Y]:
+                self.slots['y'] = value
+            elif value == self.TITLE:
+                self.slots['title'] = (node, key)
+            elif isinstance(value, (dict, list, tuple)):
+                self._find_slots(value)
+
+    def render(self, target, x, y, title):
+        '''The chart as a json_item string for Bokeh.embed.embed_item into the element with id target.'''
+        self.slots['x'][:] = _json_list(x)
+        self.slots['y'][:] = _json_list(y)
+        container, key = self.slots['title']
+        container[key] = title
+        self.item['target_id'] = target
+        return json.dumps(self.item)
+
+    def figure(self, x, y, title):
+        '''The Bokeh figure itself with this chart's data, for image export.'''
+        self.source.data = {'x': np.asarray(x, dtype=np.float64), 'y': np.asarray(y, dtype=np.float64)}
+        self.graph.title.text = title
+        return self.graph
+
+
+def _render_chunk(table, first_row, lower, upper, points, pressure_unit, temperature_unit, images_dir):
+    '''
+    Renders every compound of table (rows first_row... of the full table) from
+    one chart template, returns their json items.
+    '''
+    from .pipeline import axis_labels
+
+    template = ChartTemplate(*axis_labels(pressure_unit, temperature_unit))
+    if images_dir is not None:
+        from bokeh.io import export_png
+
+    rendered = []
+    for row in range(len(table)):
+        low, high = _chart_range(table, row, lower, upper)
+        temps = np.linspace(low, high, points)
+        pressure, _ = evaluate_correlations(table.correlations[row:row + 1], table.parameters[row:row + 1], temps)
+        pressure = pressure[0]
+        x = Temperature(temps).to(temperature_unit)
+        y = Pressures(pressure).convert_in_place(pressure_unit).values
+        name = table.names[row] or f"Compound {first_row + row + 1}"
+        title = f"{name} {table.formulas[row]}".strip()
+
+        rendered.append(template.render(f"chart-{first_row + row}", x, y, title))
+        if images_dir is not None:
+            export_png(template.figure(x, y, title), filename=os.path.join(images_dir, f"{first_row + row + 1:05d}.png"))
+    return rendered
+
+
+def render_report(table, stream, lower=None, upper=None, points=200, pressure_unit='mmHg', temperature_unit='°C',
+        title="Vapour Pressure Report", processes=None, chunk_size=50, images_dir=None, inline=False):
+    '''
+    Writes an HTML report with a chart of every compound of a CoefficientTable
+    to a text stream. Each chart covers the compound's T Min..T Max, or
+    lower..upper (°C) where the table has no bounds. images_dir also saves one
+    PNG per chart; inline embeds BokehJS instead of loading it from the CDN.
+
+    Returns {'charts', 'seconds', 'charts_per_second'}.
+    '''
+    from bokeh.resources import CDN, INLINE
+
+    for row in range(len(table)):
+        low, high = _chart_range(table, row, lower, upper)
+        if low is None or high is None:
+            raise ValueError(f"{table.names[row] or f'Compound {row + 1}'} has no T Min/T Max, give lower and upper for the chart range.")
+    if images_dir is not None:
+        try:
+            import selenium # noqa: F401
+        except ImportError:
+            raise ImportError("PNG charts need selenium and a browser driver (geckodriver or chromedriver), install them with: pip install selenium") from None
+        os.makedirs(images_dir, exist_ok=True)
+
+    started = time.perf_counter()
+    stream.write(PAGE_HEAD.format(title=html.escape(title), resources=(INLINE if inline else CDN).render()))
+
+    starts = range(0, len(table), chunk_size)
+    chunks = [(table.subset(slice(start, start + chunk_size)), start) for start in starts]
+    arguments = (lower, upper, points, pressure_unit, temperature_unit, images_dir)
+    pool = None
+    if len(chunks) > 1 and (processes is None or processes > 1):
+        from concurrent.futures import ProcessPoolExecutor
+
+        pool = ProcessPoolExecutor(max_workers=processes)
+        results = pool.map(_render_chunk, *zip(*(chunk + arguments for chunk in chunks)))
+    else:
+        results = (_render_chunk(*chunk, *arguments) for chunk in chunks)
+
+    charts = 0
+    try:
+        for start, rendered in zip(starts, results):
+            for row, item in enumerate(rendered, start):
+                item = item.replace('</', '<\\/') # would end the script element early
+                stream.write(f'<div class="chart" id="chart-{row}"></div>\n')
+                stream.write(f'<script type="application/json" data-chart="chart-{row}">{item}</script>\n')
+                charts += 1
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    stream.write(PAGE_TAIL)
+    seconds = time.perf_counter() - started
+    return {'charts': charts, 'seconds': seconds, 'charts_per_second': charts / seconds if seconds else 0.0}
@@ -0,0 +1,67 @@
+'''
+Adaptive temperature sampling
+
+Instead of a fixed step, points are placed where the curve needs them: a
+segment is split in two whenever straight-line interpolation between its end
+points misses the true pressure at its midpoint by more than rtol (relative).
+Flat stretches end up with few points and steep ones, such as the approach to
+the singularity at T = -C, with many, up to a total budget of max_points.
+
+'''
+import numpy as np
+
+from .engine import antoine
+
+
+def adaptive_grid(A, B, C, lower, upper, rtol=1e-3, max_points=2000, initial_points=17, min_step=None, function=None):
+    '''
+    Temperatures (°C) between lower and upper at which linear interpolation of
+    Antoine's equation stays within rtol of the exact pressure, using at most
+    max_points points. Segments narrower than min_step are never split.
+    function(temps) -> (pressure, invalid) samples another curve instead, A, B
+    and C are then ignored.
+
+    Returns (temps, pressure, invalid) with the pressures already evaluated.
+    '''
+    if function is None:
+        def function(temps):
+            return antoine(temps, A, B, C)
+
+    if upper < lower:
+        return np.empty(0), np.empty(0), np.empty(0, dtype=bool)
+    if max_points < 2 or upper == lower:
+        temps = np.unique([lower, upper])
+        return (temps,) + tuple(function(temps))
+    if min_step is None:
+        min_step = (upper - lower) * 1e-9
+
+    temps = np.linspace(lower, upper, min(initial_points, max_points))
+    pressure, invalid = function(temps)
+
+    while len(temps) < max_points:
+        mids = 0.5 * (temps[:-1] + temps[1:])
+        mid_pressure, mid_invalid = function(mids)
+
+        with np.errstate(invalid='ignore', over='ignore'):
+            interpolated = 0.5 * (pressure[:-1] + pressure[1:])
+            error = np.abs(interpolated - mid_pressure) / np.maximum(np.abs(mid_pressure), np.finfo(np.float64).tiny)
+        # Segments on the edge of a region that can't be evaluated are refined to find
+        # where the curve breaks down, the inside of such a region is left alone
+        edge = invalid[:-1] != invalid[1:]
+        error[edge | (mid_invalid & ~invalid[:-1])] = np.inf
+        error[invalid[:-1] & invalid[1:]] = 0
+        error[(mid_pressure == 0) & (interpolated == 0)] = 0
+        error[np.diff(temps) < 2 * min_step] = 0
+
+        split = np.flatnonzero(error > rtol)
+        if not len(split):
+            break
+        budget = max_points - len(temps)
+        if len(split) > budget: # keep the worst segments
+            split = np.sort(split[np.argpartition(error[split], -budget)[-budget:]])
+
+        temps = np.insert(temps, split + 1, mids[split])
+        pressure = np.insert(pressure, split + 1, mid_pressure[split])
+        invalid = np.insert(invalid, split + 1, mid_invalid[split])
+
+    return temps, pressure, invalid
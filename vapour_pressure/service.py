@@ -0,0 +1,397 @@
+'''
+Local HTTP service for the computation layer (standard library + NumPy only)
+
+    python -m vapour_pressure serve --port 8000
+
+    GET /antoine?A=8.10765&B=1750.286&C=235&T=20,50,80&pressure_unit=kPa
+    GET /antoine?A=8.10765&B=1750.286&C=235&lower=0&upper=100&step=0.5&format=csv
+    GET /boiling?A=8.10765&B=1750.286&C=235&P=1,2&pressure_unit=atm
+    GET /convert?kind=pressure&values=760,1520&from=mmHg&to=kPa
+    GET /stats
+    POST any of the above with the parameters as a JSON object body instead
+
+Responses are JSON ({"temperature": [...], "pressure": [...], ...}, with null
+for points that could not be computed), or a file from the export stage when
+format is csv, npz, parquet or xlsx. Connections are kept alive (HTTP/1.1)
+and responses are gzipped when the client accepts it.
+
+Many clients asking for a few points each is the expected load, so /antoine
+and /boiling requests are not evaluated one by one: every request that arrives
+within the same event loop tick (or batch window) is queued and the whole
+queue is evaluated by one vectorized call, with per-point coefficients.
+
+'''
+import asyncio
+import gzip
+import json
+import logging
+import urllib.parse
+from http import HTTPStatus
+
+import numpy as np
+
+from .engine import antoine, antoine_temperature, temperature_grid
+from .units import PRESSURE_UNITS, TEMPERATURE_UNITS, Pressures, Temperature, convert
+
+logger = logging.getLogger(__name__)
+
+MAX_HEADERS = 100
+MAX_LINE_BYTES = 2**20 # request line or header, large point lists belong in a POST body
+MAX_BODY_BYTES = 16 * 2**20
+MAX_POINTS = 10**7 # per request
+GZIP_MIN_BYTES = 1024
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Batcher:
+    '''
+    Coalesces calls of function(values, A, B, C) -> (result, invalid) (an
+    engine function) from concurrent requests into one evaluation per tick.
+    '''
+
+    def __init__(self, function, window=0.0):
+        self.function = function
+        self.window = window
+        self.pending = []
+        self.scheduled = False
+        self.requests = 0
+        self.batches = 0
+        self.points = 0
+
+    def submit(self, values, A, B, C):
+        '''Queues one request, returns a future of its (result, invalid).'''
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((np.asarray(values, dtype=np.float64).ravel(), float(A), float(B), float(C), future))
+        if not self.scheduled:
+            self.scheduled = True
+            if self.window:
+                loop.call_later(self.window, self._flush)
+            else:
+                loop.call_soon(self._flush)
+        return future
+
+    def _flush(self):
+        pending, self.pending = self.pending, []
+        self.scheduled = False
+        pending = [request for request in pending if not request[-1].cancelled()]
+        if not pending:
+            return
+
+        sizes = [len(request[0]) for request in pending]
+        values = np.concatenate([request[0] for request in pending])
+        A, B, C = (np.repeat([request[index] for request in pending], sizes) for index in (1, 2, 3))
+        try:
+            result, invalid = self.function(values, A, B, C)
+        except Exception as error: # noqa: BLE001, handed to every waiting request
+            for request in pending:
+                request[-1].set_exception(error)
+            return
+
+        self.requests += len(pending)
+        self.batches += 1
+        self.points += len(values)
+        bounds = np.cumsum(sizes)[:-1]
+        for request, part, part_invalid in zip(pending, np.split(result, bounds), np.split(invalid, bounds)):
+            if not request[-1].cancelled():
+                request[-1].set_result((part, part_invalid))
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'batches': self.batches,
+            'points': self.points,
+            'requests_per_batch': self.requests / self.batches if self.batches else 0.0,
+        }
+
+#### Parameters ####
+
+def _numbers(params, *names):
+    for name in names:
+        if name in params:
+            value = params[name]
+            if isinstance(value, (int, float)):
+                return np.array([value], dtype=np.float64)
+            if isinstance(value, str):
+                value = [part for part in value.split(',') if part.strip()]
+            try:
+                return np.asarray(value, dtype=np.float64).ravel()
+            except (TypeError, ValueError):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, f"{name} must be numbers separated by commas") from None
+    return None
+
+
+def _number(params, name, default=None):
+    values = _numbers(params, name)
+    if values is None:
+        if default is None:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"missing parameter {name}")
+        return default
+    if len(values) != 1:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"{name} must be a single number")
+    return float(values[0])
+
+
+def _text(params, name, default):
+    # JSON bodies can hold anything, a list or object here would be unhashable further on
+    value = params.get(name, default)
+    if not isinstance(value, str):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"{name} must be a string")
+    return value
+
+
+def _unit(params, name, units, default):
+    unit = _text(params, name, default)
+    if unit not in units and f"°{unit}" in units: # C, F and R without the degree sign
+        unit = f"°{unit}"
+    if unit not in units:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"unknown {name} {unit!r}, expected one of: {', '.join(units)}")
+    return unit
+
+
+def _json_values(values, invalid=None):
+    values = np.asarray(values, dtype=np.float64)
+    missing = ~np.isfinite(values) if invalid is None else (invalid | ~np.isfinite(values))
+    listed = values.tolist()
+    for index in np.flatnonzero(missing):
+        listed[index] = None # NaN is not valid JSON
+    return listed
+
+
+def _limit(count):
+    if count > MAX_POINTS:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"at most {MAX_POINTS} points per request")
+
+#### Service ####
+
+class VapourPressureService:
+    def __init__(self, window=0.0):
+        self.antoine = Batcher(antoine, window)
+        self.boiling = Batcher(antoine_temperature, window)
+        self.routes = {
+            '/antoine': self.handle_antoine,
+            '/boiling': self.handle_boiling,
+            '/convert': self.handle_convert,
+            '/stats': self.handle_stats,
+            '/health': self.handle_health,
+        }
+        self.connections = 0
+        self.responses = 0
+
+    async def handle_antoine(self, params):
+        A, B, C = (_number(params, name) for name in ('A', 'B', 'C'))
+        pressure_unit = _unit(params, 'pressure_unit', PRESSURE_UNITS, 'mmHg')
+        temperature_unit = _unit(params, 'temperature_unit', TEMPERATURE_UNITS, '°C')
+
+        temps = _numbers(params, 'T', 'temperatures')
+        if temps is None:
+            lower, upper = _number(params, 'lower'), _number(params, 'upper')
+            step = _number(params, 'step', 1.0)
+            if step <= 0:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "step must be greater than zero")
+            _limit((upper - lower) / step)
+            temps = temperature_grid(lower, upper, step)
+        _limit(len(temps))
+
+        # Temperatures come in (and go out) in temperature_unit, the engine works in °C/mmHg
+        celcius = Temperature(temps, temperature_unit).to('°C')
+        pressure, invalid = await self.antoine.submit(celcius, A, B, C)
+        pressure = Pressures(pressure).convert_in_place(pressure_unit).values
+        return {
+            f"Temperature ({temperature_unit})".replace('°', 'º'): temps,
+            f"Vapour Pressure ({pressure_unit})": pressure,
+        }, {
+            'temperature_unit': temperature_unit,
+            'pressure_unit': pressure_unit,
+            'temperature': _json_values(temps),
+            'pressure': _json_values(pressure, invalid),
+        }
+
+    async def handle_boiling(self, params):
+        A, B, C = (_number(params, name) for name in ('A', 'B', 'C'))
+        pressure_unit = _unit(params, 'pressure_unit', PRESSURE_UNITS, 'mmHg')
+        temperature_unit = _unit(params, 'temperature_unit', TEMPERATURE_UNITS, '°C')
+        pressure = _numbers(params, 'P', 'pressures')
+        if pressure is None:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "missing parameter P")
+        _limit(len(pressure))
+
+        temps, invalid = await self.boiling.submit(Pressures(pressure, pressure_unit).to('mmHg'), A, B, C)
+        temps = Temperature(temps).convert_in_place(temperature_unit).values
+        return {
+            f"Pressure ({pressure_unit})": pressure,
+            f"Boiling Temperature ({temperature_unit})".replace('°', 'º'): temps,
+        }, {
+            'temperature_unit': temperature_unit,
+            'pressure_unit': pressure_unit,
+            'pressure': _json_values(pressure),
+            'temperature': _json_values(temps, invalid),
+        }
+
+    async def handle_convert(self, params):
+        kind = _text(params, 'kind', 'pressure')
+        units = {'pressure': PRESSURE_UNITS, 'temperature': TEMPERATURE_UNITS}.get(kind)
+        if units is None:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "kind must be pressure or temperature")
+        default = 'mmHg' if kind == 'pressure' else '°C'
+        from_unit, to_unit = _unit(params, 'from', units, default), _unit(params, 'to', units, default)
+        values = _numbers(params, 'values')
+        if values is None:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "missing parameter values")
+        _limit(len(values))
+
+        converted = convert(values, units, from_unit, to_unit)
+        return {f"{kind} ({from_unit})": values, f"{kind} ({to_unit})": converted}, {
+            'from': from_unit,
+            'to': to_unit,
+            'values': _json_values(converted),
+        }
+
+    async def handle_stats(self, params):
+        return None, {
+            'connections': self.connections,
+            'responses': self.responses,
+            'antoine': self.antoine.stats(),
+            'boiling': self.boiling.stats(),
+        }
+
+    async def handle_health(self, params):
+        return None, {'status': 'ok'}
+
+    async def respond(self, method, target, body):
+        '''(status, content type, body bytes) for one request.'''
+        url = urllib.parse.urlsplit(target)
+        params = dict(urllib.parse.parse_qsl(url.query))
+        try:
+            handler = self.routes.get(url.path)
+            if handler is None:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"no such endpoint {url.path}")
+            if method not in ('GET', 'POST'):
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "only GET and POST are supported")
+            if method == 'POST' and body:
+                try:
+                    posted = json.loads(body)
+                except ValueError:
+                    raise HTTPError(HTTPStatus.BAD_REQUEST, "the request body must be a JSON object") from None
+                if not isinstance(posted, dict):
+                    raise HTTPError(HTTPStatus.BAD_REQUEST, "the request body must be a JSON object")
+                params.update(posted)
+
+            columns, document = await handler(params)
+            fmt = _text(params, 'format', 'json')
+            if fmt == 'json' or columns is None:
+                return HTTPStatus.OK, 'application/json', json.dumps(document).encode('utf-8')
+
+            from .export import EXPORTERS, export_bytes
+
+            if fmt not in EXPORTERS:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, f"unknown format {fmt!r}, expected json or one of: {', '.join(EXPORTERS)}")
+            try:
+                return HTTPStatus.OK, EXPORTERS[fmt].mime, export_bytes(fmt, columns)
+            except ImportError as error:
+                raise HTTPError(HTTPStatus.NOT_IMPLEMENTED, str(error)) from None
+        except HTTPError as error:
+            return error.status, 'application/json', json.dumps({'error': str(error)}).encode('utf-8')
+        except ValueError as error:
+            return HTTPStatus.BAD_REQUEST, 'application/json', json.dumps({'error': str(error)}).encode('utf-8')
+        except Exception: # noqa: BLE001, the client still gets an answer and the connection survives
+            logger.exception("%s %s failed", method, target)
+            return HTTPStatus.INTERNAL_SERVER_ERROR, 'application/json', json.dumps({'error': "internal error"}).encode('utf-8')
+
+    #### HTTP/1.1 ####
+
+    async def handle_connection(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    request_line = await reader.readline()
+                except ValueError: # longer than MAX_LINE_BYTES
+                    await self._write(writer, HTTPStatus.REQUEST_URI_TOO_LONG, 'text/plain', b'request line too long', {}, False)
+                    break
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._write(writer, HTTPStatus.BAD_REQUEST, 'text/plain', b'malformed request line', {}, False)
+                    break
+
+                headers = {}
+                try:
+                    for _ in range(MAX_HEADERS):
+                        line = await reader.readline()
+                        if line in (b'\r\n', b'\n', b''):
+                            break
+                        name, _, value = line.decode('latin-1').partition(':')
+                        headers[name.strip().lower()] = value.strip()
+                except ValueError:
+                    await self._write(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, 'text/plain', b'header line too long', {}, False)
+                    break
+
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._write(writer, HTTPStatus.BAD_REQUEST, 'text/plain', b'invalid Content-Length', headers, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._write(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, 'text/plain', b'request body too large', headers, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+                status, content_type, payload = await self.respond(method.upper(), target, body)
+                await self._write(writer, status, content_type, payload, headers, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _write(self, writer, status, content_type, payload, headers, keep_alive):
+        extra = []
+        if len(payload) >= GZIP_MIN_BYTES and 'gzip' in headers.get('accept-encoding', ''):
+            payload = gzip.compress(payload, compresslevel=5)
+            extra.append('Content-Encoding: gzip')
+        head = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(payload)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+            *extra,
+        ]
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + payload)
+        await writer.drain()
+        self.responses += 1
+
+
+async def start_server(host='127.0.0.1', port=8000, window=0.0):
+    '''Starts the service on host:port, returns the asyncio server.'''
+    service = VapourPressureService(window=window)
+    return await asyncio.start_server(service.handle_connection, host, port, limit=MAX_LINE_BYTES)
+
+
+def serve(host='127.0.0.1', port=8000, window=0.0):
+    '''Runs the service until interrupted.'''
+    async def run():
+        server = await start_server(host, port, window)
+        addresses = ', '.join(f"http://{address[0]}:{address[1]}" for address in (socket.getsockname() for socket in server.sockets))
+        print(f"Serving vapour pressures on {addresses}", flush=True)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -0,0 +1,232 @@
+'''
+Interpolation tables for callers that evaluate vapour pressures in hot loops
+
+ln(P) is close to linear in u = 1/T (T in K, Clausius-Clapeyron), so a
+piecewise polynomial in u reproduces it with only a few segments. A table
+splits its range into equal segments in u, so finding a point's segment is
+arithmetic rather than a search, and fits a polynomial of the given degree
+through Chebyshev nodes of each segment. The number of segments is doubled
+until the relative pressure error, checked on a dense sample of every
+segment, is within half of rtol, which leaves margin for the error between the
+sample points.
+
+Tables of many compounds are stored as flat arrays (one row per segment plus
+per-compound offsets), which can be saved as .npy files next to a
+CompoundDatabase cache entry and memory-mapped back, so they are built once
+per compound rather than once per process:
+
+    tables = InterpolationTables.build(table, rtol=1e-6)
+    pressure, invalid = tables.evaluate(row, temps)   # vectorized, mmHg
+    tables[row].pressure(25.0)                        # scalar fast path
+
+Temperatures outside the range a table was built for are invalid (NaN), the
+error bound says nothing about extrapolation.
+
+'''
+import json
+import math
+import os
+
+import numpy as np
+
+from .correlations import get_correlation
+
+KELVIN = 273.15
+TABLE_VERSION = 1
+
+# Per segment, the error is checked at this many points per polynomial coefficient
+CHECKS_PER_COEFFICIENT = 8
+MAX_SPLITS = 16
+
+
+def _nodes(degree):
+    '''Chebyshev nodes on [0, 1] and the matrix turning values there into monomial coefficients.'''
+    nodes = 0.5 - 0.5 * np.cos((2 * np.arange(degree + 1) + 1) * np.pi / (2 * degree + 2))
+    return nodes, np.linalg.inv(np.vander(nodes, increasing=True))
+
+
+def _horner(coefficients, s):
+    result = coefficients[..., -1]
+    for column in range(coefficients.shape[-1] - 2, -1, -1):
+        result = result * s + coefficients[..., column]
+    return result
+
+
+def build_segments(log_pressure, lower, upper, rtol=1e-6, degree=3):
+    '''
+    Equal segments in u = 1/T_K covering lower..upper °C for
+    log_pressure(temps in °C) -> ln(P), vectorized over temperatures.
+    Returns (origin, step, coefficients): segment i starts at
+    u = origin + i*step and has polynomial coefficients[i] in s = 0..1.
+    '''
+    if not (np.isfinite(lower) and np.isfinite(upper) and -KELVIN < lower < upper):
+        raise ValueError(f"An interpolation table needs a finite temperature range above absolute zero, got {lower} to {upper}.")
+    nodes, inverse = _nodes(degree)
+    checks = np.linspace(0.0, 1.0, CHECKS_PER_COEFFICIENT * (degree + 1))
+    tolerance = np.log1p(rtol / 2) # relative error of P is |exp(error of ln P) - 1|
+
+    origin = 1 / (upper + KELVIN)
+    span = 1 / (lower + KELVIN) - origin
+    for splits in range(MAX_SPLITS + 1):
+        count = 2**splits
+        step = span / count
+        left = origin + step * np.arange(count)
+        coefficients = log_pressure(1 / (left[:, None] + step * nodes) - KELVIN) @ inverse.T
+        exact = log_pressure(1 / (left[:, None] + step * checks) - KELVIN)
+        if not np.isfinite(exact).all():
+            raise ValueError("The vapour pressure is not finite everywhere in the table's temperature range.")
+        if np.max(np.abs(_horner(coefficients[:, None, :], checks) - exact)) <= tolerance:
+            return origin, step, coefficients
+    raise ValueError(f"Could not reach a relative error of {rtol:g} with {2**MAX_SPLITS} segments.")
+
+
+def correlation_log_pressure(name, parameters):
+    '''ln(P) of a registered correlation with the given parameters as a function of temps (°C).'''
+    correlation = get_correlation(name)
+    parameters = tuple(parameters[:len(correlation.parameters)])
+
+    def log_pressure(temps):
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            return np.log(correlation.pressure(temps, *parameters)[0])
+    return log_pressure
+
+
+class InterpolationTable:
+    '''One compound's segments, with a scalar evaluation path that avoids NumPy.'''
+
+    def __init__(self, origin, step, coefficients):
+        self.origin = float(origin)
+        self.step = float(step)
+        self.coefficients = coefficients
+        self._columns = None
+        self._scalar = None
+
+    @property
+    def lower(self):
+        '''Lowest temperature (°C) covered, at the largest u.'''
+        return 1 / (self.origin + self.step * len(self.coefficients)) - KELVIN
+
+    @property
+    def upper(self):
+        return 1 / self.origin - KELVIN
+
+    def evaluate(self, temps, out=None):
+        '''Vapour pressure (mmHg) at temps (°C) as (pressure, invalid), like engine.antoine.'''
+        if self._columns is None: # one contiguous array per power of s gathers faster than rows
+            self._columns = [np.ascontiguousarray(self.coefficients[:, column]) for column in range(self.coefficients.shape[1])]
+        count = len(self.coefficients)
+
+        temps = np.asarray(temps, dtype=np.float64)
+        scalar = temps.ndim == 0 # computed as one element and handed back 0-d, like engine.antoine
+        if scalar:
+            temps = temps.reshape(1)
+            out = None if out is None else out.reshape(1)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            position = (1 / (temps + KELVIN) - self.origin) / self.step
+            invalid = ~((position >= 0) & (position <= count))
+            position[invalid] = 0.0
+            segment = np.minimum(position.astype(np.intp), count - 1)
+            s = position - segment
+
+            pressure = np.take(self._columns[-1], segment, out=out)
+            for column in self._columns[-2::-1]:
+                pressure *= s
+                pressure += np.take(column, segment)
+            np.exp(pressure, out=pressure)
+        pressure[invalid] = np.nan
+        if scalar:
+            return pressure.reshape(()), invalid[0]
+        return pressure, invalid
+
+    def pressure(self, temp):
+        '''Vapour pressure (mmHg) at a single temperature (°C) with plain floats, NaN outside the table.'''
+        if self._scalar is None:
+            self._scalar = [row[::-1] for row in self.coefficients.tolist()]
+        position = (1 / (temp + KELVIN) - self.origin) / self.step
+        if not 0 <= position <= len(self._scalar):
+            return math.nan
+        segment = min(int(position), len(self._scalar) - 1)
+        s = position - segment
+        result = 0.0
+        for coefficient in self._scalar[segment]:
+            result = result * s + coefficient
+        return math.exp(result)
+
+
+class InterpolationTables:
+    '''Interpolation tables of many compounds in flat arrays, row k is compound k of the table they were built from.'''
+
+    ARRAYS = ('origin', 'step', 'coefficients', 'offsets')
+
+    def __init__(self, origin, step, coefficients, offsets, rtol, degree):
+        self.origin = origin
+        self.step = step
+        self.coefficients = coefficients
+        self.offsets = offsets # segments of compound k are offsets[k]:offsets[k + 1]
+        self.rtol = rtol
+        self.degree = degree
+        self._tables = {} # row -> InterpolationTable, made on first use so their scalar caches are kept
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row):
+        row = range(len(self))[row] # IndexError for rows that don't exist, negative rows count from the end
+        table = self._tables.get(row)
+        if table is None:
+            table = self._tables[row] = InterpolationTable(
+                self.origin[row], self.step[row], self.coefficients[self.offsets[row]:self.offsets[row + 1]])
+        return table
+
+    def evaluate(self, row, temps, out=None):
+        '''Vapour pressure (mmHg) of compound row at temps (°C), as (pressure, invalid).'''
+        return self[row].evaluate(temps, out=out)
+
+    @property
+    def segments(self):
+        return len(self.coefficients)
+
+    @classmethod
+    def build(cls, table, rtol=1e-6, degree=3, lower=None, upper=None):
+        '''
+        Builds tables for every compound of a CoefficientTable over its
+        T Min..T Max range, or lower..upper (°C) where the table has no bounds.
+        '''
+        parts = []
+        offsets = [0]
+        for row in range(len(table)):
+            low = table.t_min[row] if np.isfinite(table.t_min[row]) else lower
+            high = table.t_max[row] if np.isfinite(table.t_max[row]) else upper
+            if low is None or high is None:
+                raise ValueError(f"{table.names[row] or f'Compound {row + 1}'} has no T Min/T Max, give lower and upper for the table range.")
+            log_pressure = correlation_log_pressure(table.correlations[row], table.parameters[row])
+            parts.append(build_segments(log_pressure, low, high, rtol=rtol, degree=degree))
+            offsets.append(offsets[-1] + len(parts[-1][2]))
+
+        return cls(
+            np.array([part[0] for part in parts], dtype=np.float64),
+            np.array([part[1] for part in parts], dtype=np.float64),
+            np.concatenate([part[2] for part in parts]) if parts else np.empty((0, degree + 1)),
+            np.array(offsets, dtype=np.int64),
+            rtol, degree,
+        )
+
+    #### Serialization ####
+
+    def save(self, directory):
+        '''Writes the tables as one .npy file per array plus meta.json into directory.'''
+        os.makedirs(directory, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(getattr(self, name)))
+        with open(os.path.join(directory, 'meta.json'), 'w') as file:
+            json.dump({'version': TABLE_VERSION, 'rtol': self.rtol, 'degree': self.degree, 'compounds': len(self)}, file)
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        '''Reads tables written by save(), memory-mapped by default. Raises OSError/ValueError if they can't be used.'''
+        with open(os.path.join(directory, 'meta.json')) as file:
+            meta = json.load(file)
+        if meta.get('version') != TABLE_VERSION:
+            raise ValueError(f"Unsupported interpolation table version {meta.get('version')}")
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode) for name in cls.ARRAYS}
+        return cls(rtol=meta['rtol'], degree=meta['degree'], **arrays)
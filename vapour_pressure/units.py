@@ -0,0 +1,137 @@
+'''
+Pressure and temperature units
+
+Every unit is a (scale, offset) pair relative to the base unit the engine
+works in (mmHg for pressure, °C for temperature):
+
+    value_in_unit = value_in_base * scale + offset
+
+so a conversion is a single vectorized multiply-add and a new unit is just
+another entry in the table.
+
+'''
+import numpy as np
+
+PASCALS_PER_MMHG = 101325 / 760 # the tables take 1 mmHg as exactly 1/760 atm
+PASCALS_PER_PSI = 6894.757293168
+
+PRESSURE_UNITS = {
+    'mmHg': (1.0, 0.0),
+    'atm': (1 / 760, 0.0),
+    'Bar': (1.01325 / 760, 0.0),
+    'kPa': (101.325 / 760, 0.0),
+    'Pa': (PASCALS_PER_MMHG, 0.0),
+    'psi': (PASCALS_PER_MMHG / PASCALS_PER_PSI, 0.0),
+    'torr': (1.0, 0.0), # same as mmHg with the definition above
+}
+
+TEMPERATURE_UNITS = {
+    '°C': (1.0, 0.0),
+    'K': (1.0, 273.15),
+    '°F': (9 / 5, 32.0),
+    '°R': (9 / 5, 491.67),
+}
+
+
+def conversion(units, from_unit, to_unit):
+    '''(scale, offset) taking values in from_unit to to_unit.'''
+    try:
+        from_scale, from_offset = units[from_unit]
+        to_scale, to_offset = units[to_unit]
+    except KeyError as error:
+        raise ValueError(f"Unknown unit {error.args[0]!r}, expected one of: {', '.join(units)}") from None
+    scale = to_scale / from_scale
+    return scale, to_offset - from_offset * scale
+
+
+def convert(values, units, from_unit, to_unit, out=None):
+    '''Converts values between two units of the same table in one pass.'''
+    scale, offset = conversion(units, from_unit, to_unit)
+    values = np.asarray(values, dtype=np.float64)
+    if out is None:
+        out = np.empty_like(values)
+    np.multiply(values, scale, out=out)
+    if offset:
+        np.add(out, offset, out=out)
+    return out
+
+
+class Quantity:
+    '''
+    A float64 array tagged with the unit its values are in.
+
+    Values are only converted when asked for, either into a new array, into a
+    caller-supplied buffer (out=) or in place (convert_in_place).
+    '''
+    __slots__ = ('values', 'unit')
+
+    UNITS = {}
+    BASE_UNIT = None
+
+    def __init__(self, values, unit=None):
+        unit = unit or self.BASE_UNIT
+        if unit not in self.UNITS:
+            raise ValueError(f"Unknown unit {unit!r}, expected one of: {', '.join(self.UNITS)}")
+        self.values = np.asarray(values, dtype=np.float64)
+        self.unit = unit
+
+    def __len__(self):
+        return len(self.values)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.values if dtype is None else self.values.astype(dtype)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.values!r}, unit={self.unit!r})"
+
+    def to(self, unit, out=None):
+        '''The values in unit, written into out if given. Same unit and no out returns the buffer itself.'''
+        if unit == self.unit and out is None:
+            return self.values
+        return convert(self.values, self.UNITS, self.unit, unit, out=out)
+
+    def as_unit(self, unit):
+        '''A new quantity of the same kind holding the values in unit.'''
+        return type(self)(self.to(unit), unit)
+
+    def convert_in_place(self, unit):
+        '''Rewrites the buffer in unit without allocating, returns self.'''
+        if unit != self.unit:
+            convert(self.values, self.UNITS, self.unit, unit, out=self.values)
+            self.unit = unit
+        return self
+
+
+class Pressures(Quantity):
+    __slots__ = ()
+
+    UNITS = PRESSURE_UNITS
+    BASE_UNIT = 'mmHg'
+
+    def mmhg(self):
+        return self.to('mmHg')
+
+    def atm(self):
+        return self.to('atm')
+
+    def bar(self):
+        return self.to('Bar')
+
+    def kpa(self):
+        return self.to('kPa')
+
+
+class Temperature(Quantity):
+    __slots__ = ()
+
+    UNITS = TEMPERATURE_UNITS
+    BASE_UNIT = '°C'
+
+    def celcius(self):
+        return self.to('°C')
+
+    def kelvin(self):
+        return self.to('K')
+
+    def fahrenheit(self):
+        return self.to('°F')